@@ -0,0 +1,404 @@
+"""Benchmark the neural module engine, the parsers, neural systems, and package import time."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import synaptiflux as sf
+import synaptiflux.modules.module_sequence
+import synaptiflux.modules.module_print_symbols
+import synaptiflux.systems.system_print_sequence
+
+
+def set_benchmark_defaults(NM):
+    """Set the default functions used by our synthetic modules."""
+    NM.add_source('#OFF#', sf.source_off())
+    NM.add_source('#ALT-2#', sf.source_alt_N(2))
+    NM.set_default_trigger(sf.trigger_dot_product_threshold, {'threshold': 1})
+    NM.set_default_pooling(sf.pooling_or, {})
+    NM.set_default_synapse(sf.synapse_identity, {'sign': 1})
+    NM.set_default_action(sf.action_null, {})
+
+def add_benchmark_neuron(NM, name, layer, synapse_labels):
+    """Add a neuron and its S0 synapse, reading the given synapse labels."""
+    NM.add_default_neuron(name, layer, [1] * len(synapse_labels), synapse_labels)
+    NM.add_default_synapse(f"{name} S0", name)
+
+def build_chain(size, seed, fan_in=4):
+    """Build a chain of neurons, each reading the previous one."""
+    NM = sf.NeuralModule('chain')
+    set_benchmark_defaults(NM)
+    add_benchmark_neuron(NM, 'n0', 0, ['#ALT-2#'])
+    for k in range(1, size):
+        add_benchmark_neuron(NM, f"n{k}", k, [f"n{k-1} S0"])
+    NM.patch_in_new_synapses()
+    return NM
+
+def build_fan_in(size, seed, fan_in=4):
+    """Build a tree of neurons, each reading fan_in neurons from the level below."""
+    NM = sf.NeuralModule('fan-in')
+    set_benchmark_defaults(NM)
+    leaves = max(1, size // 2)
+    level = []
+    for k in range(leaves):
+        add_benchmark_neuron(NM, f"n{k}", 0, ['#ALT-2#'])
+        level.append(f"n{k}")
+    count = leaves
+    layer = 1
+    while len(level) > 1 and count < size:
+        next_level = []
+        for idx in range(0, len(level), fan_in):
+            if count >= size:
+                break
+            name = f"n{count}"
+            add_benchmark_neuron(NM, name, layer, [f"{x} S0" for x in level[idx:idx + fan_in]])
+            next_level.append(name)
+            count += 1
+        level = next_level
+        layer += 1
+    NM.patch_in_new_synapses()
+    return NM
+
+def build_random_sparse(size, seed, fan_in=4):
+    """Build neurons that each read fan_in randomly chosen neurons, allowing cycles."""
+    rng = random.Random(seed)
+    NM = sf.NeuralModule('random sparse')
+    set_benchmark_defaults(NM)
+    inputs = max(1, size // 10)
+    for k in range(size):
+        if k < inputs:
+            labels = ['#ALT-2#']
+        else:
+            labels = [f"n{rng.randrange(size)} S0" for _ in range(fan_in)]
+        add_benchmark_neuron(NM, f"n{k}", 0, labels)
+    NM.patch_in_new_synapses()
+    return NM
+
+def build_deep_layered(size, seed, fan_in=4, depth=10):
+    """Build depth layers of neurons, each reading fan_in random neurons from the previous layer."""
+    rng = random.Random(seed)
+    NM = sf.NeuralModule('deep layered')
+    set_benchmark_defaults(NM)
+    width = max(1, size // depth)
+    previous = []
+    count = 0
+    for layer in range(depth):
+        current = []
+        for _ in range(width):
+            name = f"n{count}"
+            if layer == 0:
+                labels = ['#ALT-2#']
+            else:
+                labels = [f"{rng.choice(previous)} S0" for _ in range(fan_in)]
+            add_benchmark_neuron(NM, name, layer, labels)
+            current.append(name)
+            count += 1
+        previous = current
+    NM.patch_in_new_synapses()
+    return NM
+
+topology_map = {
+    'chain': build_chain,
+    'fan_in': build_fan_in,
+    'random_sparse': build_random_sparse,
+    'deep_layered': build_deep_layered,
+}
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process, in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin': # bytes on macOS, kilobytes on Linux
+        return rss / (1024 * 1024)
+    return rss / 1024
+
+def bench_engine(topology, size, steps, seed):
+    """Time update_system() on a synthetic module."""
+    start = time.perf_counter()
+    NM = topology_map[topology](size, seed)
+    build_seconds = time.perf_counter() - start
+    neuron_count = len(NM.neurons)
+    start = time.perf_counter()
+    NM.update_system(steps)
+    seconds = time.perf_counter() - start
+    return {
+        'neurons': neuron_count,
+        'synapses': len(NM.synapses),
+        'steps': steps,
+        'build_seconds': build_seconds,
+        'run_seconds': seconds,
+        'steps_per_sec': steps / seconds,
+        'neuron_evals_per_sec': steps * neuron_count / seconds,
+    }
+
+def bench_module_sequence(size, steps, seed):
+    """Time the sequence module with size digits."""
+    start = time.perf_counter()
+    NM = sf.modules.module_sequence.module_sequence('sequence module', size)
+    build_seconds = time.perf_counter() - start
+    NM.poke_neuron('init flag')
+    start = time.perf_counter()
+    for _ in range(steps):
+        NM.poke_neuron('carry flag')
+        NM.update_system(1)
+    seconds = time.perf_counter() - start
+    return {
+        'neurons': len(NM.neurons),
+        'steps': steps,
+        'build_seconds': build_seconds,
+        'run_seconds': seconds,
+        'steps_per_sec': steps / seconds,
+        'neuron_evals_per_sec': steps * len(NM.neurons) / seconds,
+    }
+
+def bench_print_symbols(size, steps, seed):
+    """Time the print symbols module with size symbols, poking a random symbol each step."""
+    rng = random.Random(seed)
+    symbols = [f"s{k}" for k in range(size)]
+    start = time.perf_counter()
+    NM = sf.modules.module_print_symbols.module_print_symbols('print symbols module', symbols, append_newline=True)
+    build_seconds = time.perf_counter() - start
+    NM.set_output_sink(sf.NullSink())
+    start = time.perf_counter()
+    for _ in range(steps):
+        NM.poke_neuron(f"print {rng.choice(symbols)}")
+        NM.update_system(1)
+    seconds = time.perf_counter() - start
+    return {
+        'neurons': len(NM.neurons),
+        'steps': steps,
+        'build_seconds': build_seconds,
+        'run_seconds': seconds,
+        'steps_per_sec': steps / seconds,
+        'neuron_evals_per_sec': steps * len(NM.neurons) / seconds,
+    }
+
+def bench_symbol_sequence(size, steps, seed):
+    """Time the symbol sequence system printing a string of length size."""
+    rng = random.Random(seed)
+    symbol_sequence = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz ') for _ in range(size - 1)) + '.'
+    start = time.perf_counter()
+    NS = sf.systems.system_print_sequence.system_symbol_sequence('print sequence', symbol_sequence, ['.'])
+    build_seconds = time.perf_counter() - start
+    NS.set_output_sink(sf.NullSink())
+    steps = size + 4
+    start = time.perf_counter()
+    NS.update_system(steps)
+    seconds = time.perf_counter() - start
+    neuron_count = sum(len(module.neurons) for module in NS.modules.values())
+    return {
+        'neurons': neuron_count,
+        'steps': steps,
+        'build_seconds': build_seconds,
+        'run_seconds': seconds,
+        'steps_per_sec': steps / seconds,
+        'neuron_evals_per_sec': steps * neuron_count / seconds,
+    }
+
+def bench_parse(kind, size, seed):
+    """Time loading a generated workload with load_from_map(), load_from_chunk() or load_from_json()."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, f"workload.{kind}")
+        with open(filename, 'w') as f:
+            if kind == 'map':
+                sf.write_workload_map(f, size, fan_in=3, max_delay=2, alias_density=0.05, seed=seed)
+            elif kind == 'chunk':
+                sf.write_workload_chunk(f, size, fan_in=3, max_delay=2, seed=seed)
+            else:
+                sf.write_workload_json(f, size, fan_in=3, max_delay=2, seed=seed)
+        nbytes = os.path.getsize(filename)
+        NM = sf.NeuralModule('parse')
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if kind == 'map':
+                NM.load_from_map(filename)
+            elif kind == 'chunk':
+                NM.load_from_chunk(filename)
+            else:
+                NM.load_from_json(filename)
+        seconds = time.perf_counter() - start
+    return {
+        'neurons': len(NM.neurons),
+        'bytes': nbytes,
+        'load_seconds': seconds,
+        'load_mb_per_sec': nbytes / (1024 * 1024) / seconds,
+    }
+
+import_statements = {
+    'package': 'import synaptiflux',
+    'neural_module': 'import synaptiflux as sf; sf.NeuralModule',
+    'star': 'from synaptiflux import *',
+}
+
+def bench_import(target, runs=20):
+    """Time importing the package in a fresh interpreter, keeping the best of runs, excluding interpreter start up."""
+    code = f"import time; start = time.perf_counter(); {import_statements[target]}; print(time.perf_counter() - start)"
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True, check=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    seconds = min(times)
+    return {
+        'runs': runs,
+        'import_seconds': seconds,
+        'imports_per_sec': 1 / seconds,
+    }
+
+def build_cases(sizes, steps, seed, suites):
+    """Return the list of (name, fn, args) benchmark cases."""
+    cases = []
+    for size in sizes:
+        if 'engine' in suites:
+            for topology in topology_map:
+                cases.append((f"engine/{topology}/{size}", bench_engine, (topology, size, steps, seed)))
+        if 'modules' in suites:
+            cases.append((f"module_sequence/{size}", bench_module_sequence, (size, steps, seed)))
+            cases.append((f"module_print_symbols/{size}", bench_print_symbols, (size, steps, seed)))
+        if 'system' in suites:
+            cases.append((f"system_symbol_sequence/{size}", bench_symbol_sequence, (size, steps, seed)))
+        if 'parse' in suites:
+            for kind in ['map', 'chunk', 'json']:
+                cases.append((f"parse_{kind}/{size}", bench_parse, (kind, size, seed)))
+    if 'import' in suites:
+        for target in import_statements:
+            cases.append((f"import/{target}", bench_import, (target,)))
+    return cases
+
+def run_case_in_child(fn, args, queue):
+    """Run a benchmark case in a child process, and put the result on the queue."""
+    try:
+        result = fn(*args)
+        result['peak_rss_mb'] = peak_rss_mb()
+        queue.put(result)
+    except Exception as e:
+        queue.put({'error': repr(e)})
+
+def run_case(fn, args, isolate):
+    """Run a benchmark case, in a fresh process if isolate is True, so peak RSS is per case."""
+    if not isolate:
+        result = fn(*args)
+        result['peak_rss_mb'] = peak_rss_mb()
+        return result
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    process = ctx.Process(target=run_case_in_child, args=(fn, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def best_result(results):
+    """Merge repeated runs of a case, keeping the best value of each metric."""
+    best = dict(results[0])
+    for result in results[1:]:
+        for metric, value in result.items():
+            if metric.endswith('_per_sec'):
+                best[metric] = max(best[metric], value)
+            elif metric.endswith('_seconds') or metric == 'peak_rss_mb':
+                best[metric] = min(best[metric], value)
+    best['repeat'] = len(results)
+    return best
+
+def git_commit():
+    """Return the current git commit, or None if not available."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def metric_higher_is_better(metric):
+    """Return True if a larger value of the metric is an improvement."""
+    return metric.endswith('_per_sec')
+
+def compare_results(old_results, new_results, threshold):
+    """Print a comparison of two result files, and return the number of regressions beyond threshold."""
+    regressions = 0
+    old_cases = old_results['cases']
+    print(f"Comparing {old_results.get('commit')} -> {new_results.get('commit')}:")
+    for name, new in new_results['cases'].items():
+        if name not in old_cases or 'error' in new or 'error' in old_cases[name]:
+            continue
+        old = old_cases[name]
+        for metric in sorted(new.keys()):
+            if not (metric.endswith('_per_sec') or metric == 'peak_rss_mb'):
+                continue
+            if metric not in old or old[metric] == 0:
+                continue
+            ratio = new[metric] / old[metric]
+            change = ratio - 1 if metric_higher_is_better(metric) else 1 - ratio
+            flag = ''
+            if change < -threshold:
+                flag = '    REGRESSION'
+                regressions += 1
+            print(f"    {name} {metric}: {old[metric]:.4g} -> {new[metric]:.4g} ({100 * change:+.1f}%){flag}")
+    print(f"{regressions} regressions beyond {100 * threshold:.0f}%")
+    return regressions
+
+def main():
+    """The main body of code."""
+    parser = argparse.ArgumentParser(description='Benchmark the SynaptiFlux engine, parsers and systems.')
+    parser.add_argument('--sizes', default='100,1000,10000', help='comma separated sizes, eg, 100,1000,10000,100000,1000000')
+    parser.add_argument('--steps', type=int, default=50, help='time steps per engine benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the synthetic modules')
+    parser.add_argument('--suites', default='engine,modules,system,parse,import', help='comma separated suites to run')
+    parser.add_argument('--output', help='write machine readable results to this JSON file')
+    parser.add_argument('--compare', help='compare against this earlier JSON results file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative change that counts as a regression')
+    parser.add_argument('--repeat', type=int, default=1, help='run each case this many times, and keep the best')
+    parser.add_argument('--no-isolate', action='store_true', help='run all cases in this process')
+    args = parser.parse_args()
+
+    sizes = [int(x) for x in args.sizes.split(',') if x]
+    suites = set(args.suites.split(','))
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': sizes,
+        'steps': args.steps,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'cases': {},
+    }
+    for name, fn, fn_args in build_cases(sizes, args.steps, args.seed, suites):
+        runs = [run_case(fn, fn_args, not args.no_isolate) for _ in range(max(1, args.repeat))]
+        errors = [result for result in runs if 'error' in result]
+        if errors:
+            results['cases'][name] = errors[0]
+            print(f"{name}: {errors[0]['error']}")
+            continue
+        result = best_result(runs)
+        results['cases'][name] = result
+        s = f"{name}:"
+        for metric in ['steps_per_sec', 'neuron_evals_per_sec', 'load_mb_per_sec', 'import_seconds', 'peak_rss_mb']:
+            if metric in result:
+                s += f"    {metric}: {result[metric]:.4g}"
+        print(s, flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            old_results = json.load(f)
+        if compare_results(old_results, results, args.threshold) > 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Generate synthetic map, chunk and JSON workloads for benchmarking and capacity planning."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import sys
+import argparse
+import synaptiflux as sf
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic neural module workloads.')
+    parser.add_argument('-t', '--type', choices=['map', 'chunk', 'json', 'flat-json'], default='map', help='output format')
+    parser.add_argument('-o', '--output', help='output file, defaults to stdout')
+    parser.add_argument('-n', '--neurons', type=int, default=1000, help='number of neurons')
+    parser.add_argument('-p', '--patterns', type=int, default=1, help='patterns per neuron')
+    parser.add_argument('-f', '--fan-in', type=int, default=3, help='inputs per pattern')
+    parser.add_argument('-d', '--max-delay', type=int, default=0, help='maximum synapse delay')
+    parser.add_argument('--delay-distribution', choices=sf.workload_delay_distributions, default='uniform', help='distribution of synapse delays')
+    parser.add_argument('-l', '--layers', type=int, default=4, help='layer depth')
+    parser.add_argument('-a', '--alias-density', type=float, default=0.0, help='alias neurons per neuron, map format only')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args()
+
+    f = sys.stdout if args.output is None else open(args.output, 'w')
+    try:
+        params = (args.neurons, args.patterns, args.fan_in, args.max_delay, args.delay_distribution, args.layers)
+        if args.type == 'map':
+            sf.write_workload_map(f, *params, alias_density=args.alias_density, seed=args.seed)
+        elif args.type == 'chunk':
+            sf.write_workload_chunk(f, *params, seed=args.seed)
+        else:
+            sf.write_workload_json(f, *params, seed=args.seed, grouped=(args.type == 'json'))
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,64 +1,251 @@
 """Load and run map files given on the command line."""
 # Author: Garry Morrison
 # Created: 2024-11-6
-# Updated: 2024-11-14
+# Updated: 2026-10-19
 
+import io
+import os
 import sys
 import ast
+import time
+import argparse
+import resource
+import traceback
+import tracemalloc
+import signal
+import threading
+import socketserver
+import multiprocessing
+from contextlib import redirect_stdout
 from pathlib import Path
 import synaptiflux as sf
 
+def process_line(NM, line, filename):
+    """Process a single line of a map script, returning False if we should exit the script."""
+    line = line.strip()
+    if len(line) == 0 or line.startswith('--'): # either empty or comment line, so continue the loop
+        return True
+    # print(f'line: {line}')
+    if line == 'print:': # print an empty line
+        print()
+    elif line.startswith('print: '): # print a string
+        print(line[7:])
+    elif line.startswith('poke: '): # poke list in SDB sequence style
+        poke_list = sf.parse_sdb_sequence_to_poke_list(line[6:])
+        # print(f'poke: {line[6:]}')
+        print(f'poke-list: {poke_list}')
+        NM.poke_neuron_sequence(poke_list)
+    elif line.startswith('poke-list: '): # poke list in Python list style
+        poke_list = ast.literal_eval(line[11:])
+        print(f'poke-list: {poke_list}')
+        NM.poke_neuron_sequence(poke_list)
+    elif line.startswith('poke-string: '): # poke a string, converted to a list of characters
+        poke_list = list(line[13:])
+        print(f'poke-list: {poke_list}')
+        NM.poke_neuron_sequence(poke_list)
+    elif line.startswith('update: '): # update the system by the given integer number of time steps
+        try:
+            steps = int(line[8:])
+        except Exception as e:
+            print(e)
+            return True
+        print(f'update: {steps}')
+        NM.update_system(steps)
+    elif line == 'print-global-sequences:': # print our NM global sequences
+        NM.print_global_sequences(layers=None) # None param for now
+    elif line == 'print-neural-module:': # print out our full neural module
+        print(NM)
+    elif line == 'exit:': # exit the current map file
+        print(f'Exiting {filename}')
+        return False
+    else:
+        NM.from_map(line, verbose=False)
+    return True
+
+def run_map_file(filename):
+    """Load and run a single map file, in a fresh neural module."""
+    filepath = Path(filename)
+    stem = filepath.stem
+    print(f'Loading {filename}')
+    # print(f'stem: {stem}')
+    NM = sf.NeuralModule(stem) # initialize our neural module
+    with open(filename, 'r') as f:
+        for line in f:
+            if not process_line(NM, line, filename):
+                break
+    NM.flush_output()
+
+def run_map_file_captured(filename, trace_memory=False):
+    """Run a single map file with its output captured, returning a dictionary of output, timing and memory."""
+    output = io.StringIO()
+    error = None
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with redirect_stdout(output):
+        try:
+            run_map_file(filename)
+        except Exception:
+            error = traceback.format_exc()
+    seconds = time.perf_counter() - start
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    else:
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {'filename': filename, 'output': output.getvalue(), 'error': error, 'seconds': seconds, 'peak_memory_mb': peak_memory}
+
+def run_map_file_worker(args):
+    """Unpack the arguments for run_map_file_captured(), for use with Pool.imap()."""
+    return run_map_file_captured(*args)
+
+def run_batch(filenames, jobs, trace_memory=False, summary_stream=sys.stderr):
+    """Run the map files across a pool of worker processes, emitting each file's output in order, then a summary."""
+    start = time.perf_counter()
+    results = []
+    tasks = [(filename, trace_memory) for filename in filenames]
+    with multiprocessing.Pool(jobs) as pool:
+        for result in pool.imap(run_map_file_worker, tasks, chunksize=1):
+            sys.stdout.write(result['output'])
+            if result['error'] is not None:
+                sys.stdout.write(result['error'])
+            sys.stdout.flush()
+            results.append(result)
+    elapsed = time.perf_counter() - start
+    memory_type = 'peak traced memory' if trace_memory else 'worker peak RSS'
+    errors = [result for result in results if result['error'] is not None]
+    s = f"\nBatch summary: {len(results)} files, {jobs} workers, {elapsed:.3f} s wall time\n"
+    for result in results:
+        status = 'ERROR' if result['error'] is not None else 'ok'
+        s += f"    {result['filename']}: {status}, {result['seconds']:.3f} s, {memory_type}: {result['peak_memory_mb']:.1f} MB\n"
+    total = sum(result['seconds'] for result in results)
+    s += f"    total cpu time: {total:.3f} s, speedup: {total / elapsed if elapsed > 0 else 0:.2f}x\n"
+    s += f"    errors: {len(errors)}\n"
+    for result in sorted(results, key=lambda x: x['seconds'], reverse=True)[:5]:
+        s += f"    slowest: {result['filename']}: {result['seconds']:.3f} s\n"
+    summary_stream.write(s)
+    return len(errors)
+
+class MapServer:
+    """Holds neural modules loaded from map files, and processes map script commands against them."""
+    def __init__(self):
+        self.modules = {}
+        self.lock = threading.Lock() # neural modules are not thread safe, and stdout capture is process wide
+
+    def load(self, filename):
+        """Load and run a map file into a new neural module, returning the captured output."""
+        output = io.StringIO()
+        with self.lock, redirect_stdout(output):
+            stem = Path(filename).stem
+            NM = sf.NeuralModule(stem)
+            with open(filename, 'r') as f:
+                for line in f:
+                    if not process_line(NM, line, filename):
+                        break
+            NM.flush_output()
+            self.modules[stem] = NM
+        return output.getvalue()
+
+    def process_request(self, line, session):
+        """Process a single request line for the given session, returning the response."""
+        line = line.strip()
+        if line == 'modules:':
+            return ''.join(f"{name}\n" for name in self.modules)
+        if line.startswith('use: '):
+            name = line[5:]
+            if name not in self.modules:
+                return f"Unknown module: {name}\n"
+            session['module'] = name
+            return ''
+        if line.startswith('load: '):
+            try:
+                return self.load(line[6:])
+            except Exception as e:
+                return f"{e}\n"
+        if line == 'exit:':
+            session['exit'] = True
+            return ''
+        name = session.get('module')
+        if name not in self.modules:
+            return 'No module selected\n'
+        output = io.StringIO()
+        with self.lock, redirect_stdout(output):
+            try:
+                process_line(self.modules[name], line, name)
+                self.modules[name].flush_output()
+            except Exception as e:
+                print(e)
+        return output.getvalue()
+
+    def new_session(self):
+        """Return a new session, using the first loaded module."""
+        return {'module': next(iter(self.modules), None), 'exit': False}
+
+    def serve_stream(self, rfile, wfile, binary=False):
+        """Serve requests, one per line, writing each response followed by an 'end:' line."""
+        session = self.new_session()
+        for line in rfile:
+            if binary:
+                line = line.decode('utf-8')
+            response = self.process_request(line, session) + 'end:\n'
+            wfile.write(response.encode('utf-8') if binary else response)
+            wfile.flush()
+            if session['exit']:
+                break
+
+class MapRequestHandler(socketserver.StreamRequestHandler):
+    """Serve a single Unix socket client connection."""
+    def handle(self):
+        self.server.map_server.serve_stream(self.rfile, self.wfile, binary=True)
+
+class MapSocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """A Unix socket server, with one thread per client connection."""
+    daemon_threads = True
+
+def run_server(filenames, socket_path=None):
+    """Load the map files, then serve map script commands over stdin/stdout or a Unix socket."""
+    map_server = MapServer()
+    for filename in filenames:
+        sys.stderr.write(map_server.load(filename))
+    sys.stderr.write(f"Loaded modules: {list(map_server.modules)}\n")
+    if socket_path is None:
+        map_server.serve_stream(sys.stdin, sys.stdout)
+        return
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with MapSocketServer(socket_path, MapRequestHandler) as server:
+        server.map_server = map_server
+        sys.stderr.write(f"Listening on {socket_path}\n")
+        signal.signal(signal.SIGTERM, signal.default_int_handler) # so kill shuts down cleanly, and removes the socket
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
 def main():
     """The main body of code."""
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description='Load and run map files.')
+    parser.add_argument('filenames', nargs='*', help='map files to process')
+    parser.add_argument('-j', '--jobs', type=int, help='run in batch mode with this many worker processes, 0 for one per CPU')
+    parser.add_argument('--trace-memory', action='store_true', help='in batch mode, measure per file peak memory with tracemalloc')
+    parser.add_argument('--server', action='store_true', help='load the map files once, then serve commands over stdin, or a Unix socket')
+    parser.add_argument('--socket', help='in server mode, listen on this Unix socket path rather than stdin')
+    args = parser.parse_args()
+    if args.server:
+        run_server(args.filenames, args.socket)
+        return
+    if len(args.filenames) < 1:
         print('Please provide at least one map file to process.')
         sys.exit(1)
-    for filename in sys.argv[1:]:
-        filepath = Path(filename)
-        stem = filepath.stem
-        print(f'Loading {filename}')
-        # print(f'stem: {stem}')
-        NM = sf.NeuralModule(stem) # initialize our neural module
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if len(line) == 0 or line.startswith('--'): # either empty or comment line, so continue the loop
-                    continue
-                # print(f'line: {line}')
-                if line == 'print:': # print an empty line
-                    print()
-                elif line.startswith('print: '): # print a string
-                    print(line[7:])
-                elif line.startswith('poke: '): # poke list in SDB sequence style
-                    poke_list = sf.parse_sdb_sequence_to_poke_list(line[6:])
-                    # print(f'poke: {line[6:]}')
-                    print(f'poke-list: {poke_list}')
-                    NM.poke_neuron_sequence(poke_list)
-                elif line.startswith('poke-list: '): # poke list in Python list style
-                    poke_list = ast.literal_eval(line[11:])
-                    print(f'poke-list: {poke_list}')
-                    NM.poke_neuron_sequence(poke_list)
-                elif line.startswith('poke-string: '): # poke a string, converted to a list of characters
-                    poke_list = list(line[13:])
-                    print(f'poke-list: {poke_list}')
-                    NM.poke_neuron_sequence(poke_list)
-                elif line.startswith('update: '): # update the system by the given integer number of time steps
-                    try:
-                        steps = int(line[8:])
-                    except Exception as e:
-                        print(e)
-                        continue
-                    print(f'update: {steps}')
-                    NM.update_system(steps)
-                elif line == 'print-global-sequences:': # print our NM global sequences
-                    NM.print_global_sequences(layers=None) # None param for now
-                elif line == 'print-neural-module:': # print out our full neural module
-                    print(NM)
-                elif line == 'exit:': # exit the current map file
-                    print(f'Exiting {filename}')
-                    break
-                else:
-                    NM.from_map(line, verbose=False)
+    if args.jobs is not None:
+        jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+        if run_batch(args.filenames, jobs, args.trace_memory) > 0:
+            sys.exit(1)
+        return
+    for filename in args.filenames:
+        run_map_file(filename)
 
 
 if __name__ == '__main__':
@@ -1,18 +1,118 @@
-# import synaptiflux.source_fn
-# import synaptiflux.action_fn
-from .neuron import *
-from .synapse import *
-from .neural_module import *
-from .neural_system import *
-from .source_fn import *
-from .synapse_fn import *
-from .action_fn import *
-from .trigger_fn import *
-from .pooling_fn import *
-from .buffer import *
-from .fn_buffer import *
-from .parse_simple_sdb import *
-from .misc import *
-from .counter import *
-from .operator_fn import *
+"""The synaptiflux package.
 
+Submodules are imported lazily, on first access of one of their names, eg sf.NeuralModule only imports neural_module and
+its dependencies. So short scripts don't pay for asyncio, multiprocessing, and the rest, unless they use them.
+"""
+# Author: Garry Morrison
+# Created: 2024-9-18
+# Updated: 2026-10-19
+
+import importlib
+
+# the public names of each submodule, in the order they used to be star imported:
+submodule_names = {
+    'neuron': ['Neuron'],
+    'synapse': ['Synapse'],
+    'neural_module': [
+        'duplicate_pattern_modes', 'pattern_key', 'process_layers', 'display_layer_synapse_dict', 'NeuralModule'
+    ],
+    'neural_system': ['NeuralSystem'],
+    'source_fn': ['source_off', 'source_on', 'source_init', 'source_init_N', 'source_alt_2', 'source_alt_N'],
+    'synapse_fn': [
+        'synapse_identity', 'synapse_delayed_identity', 'synapse_delayed_not', 'synapse_delayed_min',
+        'synapse_delayed_max', 'synapse_sum', 'synapse_average', 'synapse_delta_plus', 'synapse_delta_minus',
+        'synapse_delta', 'synapse_fn_map', 'synapse_inverse_fn_map'
+    ],
+    'action_fn': [
+        'output_sink_of', 'action_null', 'action_println', 'action_print', 'action_print_buffer',
+        'action_print_to_buffer', 'action_print_to_buffers', 'action_print_to_buffer_flush',
+        'action_init_store_buffer', 'action_store_buffer', 'action_counter_println', 'action_time_step_println',
+        'action_time_step_coeff_println', 'action_layer_time_step_coeff_println',
+        'action_layer_time_step_coeff_println_global_sequence', 'action_fn_map', 'action_inverse_fn_map',
+        'ACTION_NEVER', 'ACTION_POSITIVE', 'ACTION_ALWAYS', 'action_noop_set', 'action_positive_set',
+        'action_dispatch_mode', 'action_println_render', 'action_print_render', 'action_time_step_println_render',
+        'action_time_step_coeff_println_render', 'action_layer_time_step_coeff_println_render', 'action_render_fn_map',
+        'action_render_fn'
+    ],
+    'trigger_fn': [
+        'trigger_dot_product_threshold', 'trigger_list_simm_threshold', 'trigger_list_min_simm_threshold',
+        'trigger_fn_map', 'trigger_inverse_fn_map'
+    ],
+    'pooling_fn': [
+        'pooling_or', 'pooling_xor', 'pooling_sum', 'pooling_sum_mod2', 'pooling_or_decided', 'pooling_sum_decided',
+        'pooling_fn_map', 'pooling_inverse_fn_map', 'pooling_short_circuit_fn_map'
+    ],
+    'buffer': ['Buffer'],
+    'fn_buffer': ['FnBuffer'],
+    'parse_simple_sdb': [
+        'strip_delay', 'strip_synapse', 'extract_delay_number', 'extract_synapse_number', 'clean_ket_coeff',
+        'parse_ket', 'parse_sp', 'parse_superposition', 'coeff_labels_to_sp', 'list_to_sp', 'parse_sp_to_dict',
+        'sp_dict_to_sp', 'parse_sdb_sequence_to_poke_list', 'parse_seq', 'parse_learn_rule',
+        'parse_traditional_if_then_machine', 'process_functions', 'process_if_then_machine_learn_rule',
+        'parse_if_then_machine', 'parse_sf_if_then_machine', 'process_default_chunk_line', 'process_neuron_chunk_line',
+        'process_synapse_chunk_line'
+    ],
+    'misc': ['cast_value_broken', 'cast_value'],
+    'counter': ['Counter'],
+    'operator_fn': [
+        'operator_clean', 'operator_normalize', 'operator_rescale', 'operator_drop_below', 'operator_add',
+        'operator_or', 'sp_operator_clean', 'sp_operator_normalize', 'sp_operator_rescale', 'sp_operator_drop_below',
+        'sp_operator_add', 'sp_operator_or', 'operator_fn_map', 'operator_superposition_map'
+    ],
+    'output_sink': ['StdoutSink', 'BufferedSink', 'ListSink', 'FileSink', 'NullSink', 'default_output_sink'],
+    'sequence_store': ['LayerSequence', 'SequenceStore'],
+    'profiler': ['Profiler'],
+    'workload': [
+        'workload_delay_distributions', 'workload_delay', 'workload_layer_range', 'generate_neurons',
+        'generate_aliases', 'pattern_to_seq', 'write_workload_map', 'write_workload_chunk', 'workload_defaults_dict',
+        'workload_neuron_dict', 'workload_synapse_dict', 'write_json_list', 'write_workload_json'
+    ],
+    'async_driver': ['AsyncDriver'],
+    'sharded_module': [
+        'SHARD_STEP', 'SHARD_STOP', 'VALUE_FLOAT', 'VALUE_INT', 'VALUE_BOOL', 'encode_value', 'decode_value',
+        'resolve_label', 'neuron_graph', 'neuron_cost', 'partition_neurons', 'max_pattern_delay', 'ShardClock',
+        'SharedSynapseReader', 'ShardedModule'
+    ],
+    'capacity': ['capacity_policies', 'log_add', 'neuron_memory_estimate', 'CapacityTracker'],
+    'activation_tracker': ['ActivationBucket', 'ActivationTracker'],
+    'similarity_index': [
+        'similarity_measures', 'query_to_dict', 'pattern_to_dict', 'pattern_dict_scores', 'rank_pattern_scores', 'SimilarityIndex'
+    ],
+    'superposition': ['label_ids', 'id_labels', 'intern_label', 'Superposition', 'as_superposition'],
+    'fn_registry': [
+        'fn_kinds', 'fn_kind_maps', 'fn_kind_arguments', 'fn_param_names', 'FnInfo', 'registered_fns', 'register_fn',
+        'get_fn_info', 'lookup_fn', 'get_batch_fn', 'register_builtin_fns'
+    ],
+    'module_codec': [
+        'codec_fn_maps', 'fn_arg_kinds', 'structure_change_ops', 'codec_object_types', 'ObjectTable', 'encode_fn', 'decode_fn',
+        'encode_param', 'decode_param', 'encode_synapse', 'decode_synapse', 'encode_neuron', 'decode_neuron', 'encode_change',
+        'apply_change', 'history_window', 'encode_defaults', 'encode_module', 'decode_module'
+    ],
+    'recorder': ['target_modules', 'disable_print_actions', 'Recorder', 'read_records', 'Replayer'],
+    'journal': ['journal_paths', 'read_journal', 'load_journaled_module', 'ModuleJournal'],
+    'sqlite_store': ['store_schema', 'sqlite_max_params', 'chunked', 'map_line_names', 'SQLiteStore'],
+    'memory_report': [
+        'memory_components', 'scalar_types', 'value_size', 'container_types', 'sampled_size', 'deep_size', 'neuron_sizes',
+        'synapse_sizes', 'sequence_store_size', 'MemoryReport', 'module_memory_report', 'system_memory_report'
+    ],
+}
+
+name_submodules = {name: submodule for submodule, names in submodule_names.items() for name in names}
+
+__all__ = list(name_submodules)
+
+def __getattr__(name):
+    """Import the submodule that defines name, and cache all its public names in the package namespace."""
+    submodule = name_submodules.get(name)
+    if submodule is None:
+        if name in submodule_names:
+            return importlib.import_module(f".{name}", __name__)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{submodule}", __name__)
+    namespace = globals()
+    for submodule_name in submodule_names[submodule]:
+        namespace[submodule_name] = getattr(module, submodule_name)
+    return namespace[name]
+
+def __dir__():
+    return sorted(set(globals()) | set(name_submodules) | set(submodule_names))
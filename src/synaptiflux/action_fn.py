@@ -1,11 +1,16 @@
 """Define some toy actions."""
 # Author: Garry Morrison
 # Created: 2024-9-18
-# Updated: 2024-11-10
+# Updated: 2026-10-19
 
 from .trigger_fn import trigger_dot_product_threshold, trigger_list_simm_threshold
 from .pooling_fn import pooling_or
-from .synapse_fn import *
+from .synapse_fn import synapse_delayed_identity
+from .output_sink import default_output_sink
+
+def output_sink_of(synapse):
+    """Return the output sink of the synapse, or the default output sink if it doesn't have one."""
+    return getattr(synapse, 'output_sink', default_output_sink)
 
 def action_null(synapse, value):
     """Do nothing action."""
@@ -14,17 +19,17 @@ def action_null(synapse, value):
 def action_println(synapse, value, s):
     """Print string action, with new line, if value > 0."""
     if value > 0:
-        print(s)
+        output_sink_of(synapse).write(f'{s}\n')
 
 def action_print(synapse, value, s):
     """Print string action, without new line, if value > 0."""
     if value > 0:
-        print(s, end='')
+        output_sink_of(synapse).write(f'{s}')
 
 def action_print_buffer(synapse, value, buffer):
     """Print the buffer, but leave it unchanged, if value > 0."""
     if value > 0:
-        print(buffer)
+        output_sink_of(synapse).write(f'{buffer}\n')
 
 def action_print_to_buffer(synapse, value, buffer, s):
     """Append the given string to the given buffer, if value > 0."""
@@ -41,7 +46,7 @@ def action_print_to_buffer_flush(synapse, value, buffer, s):
     """Append the given string to the given buffer, then print the buffer, if value > 0."""
     if value > 0:
         buffer.append(s)
-        print(buffer)
+        output_sink_of(synapse).write(f'{buffer}\n')
         buffer.erase()
 
 def action_init_store_buffer(synapse, value, NM, buffer):
@@ -63,7 +68,14 @@ def action_store_buffer(synapse, value, NM, buffer, verbose=False):
         # layer = sorted(layer_synapse_dict.keys())[-1] # errors out if layers_synapse_dict is empty!
         layer = 1 # hardwire in for now
         pattern = sorted(layer_synapse_dict[layer])
-        neurons = NM.get_test_neurons(pattern) # doesn't currently work!
+        pattern_len = len(pattern)
+        compare_pattern = [1] * pattern_len
+        trigger_params = {'threshold': 0.98}
+        duplicate = NM.find_duplicate_pattern(compare_pattern, pattern, trigger_list_simm_threshold, trigger_params) if pattern_len > 0 else None
+        if duplicate is not None: # an exact duplicate, found without testing every neuron
+            neurons = [duplicate]
+        else:
+            neurons = NM.get_test_neurons(pattern) # doesn't currently work!
         s = "To store:\n"
         s += f"    name: {name}\n"
         s += f"    delay: {delay}\n"
@@ -81,13 +93,15 @@ def action_store_buffer(synapse, value, NM, buffer, verbose=False):
         if len(neurons) > 0:
             if verbose:
                 print("That pattern already triggers a neuron.\n")
+            if duplicate is not None and NM.duplicate_patterns == 'merge':
+                NM.neurons[duplicate].increment_activation_count()
+                if NM.activation_tracker is not None:
+                    NM.activation_tracker.record(duplicate, NM.neurons[duplicate].activation_count, NM.time_step_counter)
             return
         # print("Will store a neuron and synapse!\n")
-        pattern_len = len(pattern)
-        compare_pattern = [1] * pattern_len
         threshold = pattern_len
         # NM.add_neuron(name, layer + 1, compare_pattern, pattern, trigger_dot_product_threshold, {'threshold': threshold}, pooling_or, {})
-        NM.add_neuron(name, layer + 1, compare_pattern, pattern, trigger_list_simm_threshold, {'threshold': 0.98}, pooling_or, {})
+        NM.add_neuron(name, layer + 1, compare_pattern, pattern, trigger_list_simm_threshold, trigger_params, pooling_or, {})
         # NM.print_neuron(name)
         prefix = "stored sequence: "
         NM.add_synapse(synapse_name, name, synapse_delayed_identity, {'sign': 1, 'delay': 0}, action_println, {'s': prefix + str(buffer)})
@@ -95,6 +109,8 @@ def action_store_buffer(synapse, value, NM, buffer, verbose=False):
             print("Will store a neuron and synapse!\n")
             NM.print_neuron(name)
             NM.print_synapse(synapse_name)
+        if NM.capacity_tracker is not None: # evict learned neurons if we are over capacity
+            NM.capacity_tracker.add(NM, name)
         NM.reset_delay_counter()
         buffer.erase()
 
@@ -106,29 +122,29 @@ def action_store_buffer(synapse, value, NM, buffer, verbose=False):
 def action_counter_println(synapse, value, s, counter):
     """Print string action, and counter, with new line, if value > 0."""
     if value > 0:
-        print(f'{counter.get()}) {s}')
+        output_sink_of(synapse).write(f'{counter.get()}) {s}\n')
         counter.increment()
 
 def action_time_step_println(synapse, value, s, NM):
     """Print string action, and NM time step, with new line, if value > 0."""
     if value > 0:
-        print(f'{NM.get_time_step()}) {s}')
+        output_sink_of(synapse).write(f'{NM.get_time_step()}) {s}\n')
 
 def action_time_step_coeff_println(synapse, value, s, NM):
     """Print string action, and NM time step, with new line, if value > 0."""
     if value > 0:
         if value == 1:
-            print(f'{NM.get_time_step()})    {s}')
+            output_sink_of(synapse).write(f'{NM.get_time_step()})    {s}\n')
         else:
-            print(f'{NM.get_time_step()})    {value}, {s}')
+            output_sink_of(synapse).write(f'{NM.get_time_step()})    {value}, {s}\n')
 
 def action_layer_time_step_coeff_println(synapse, value, s, NM):
     """Print string action, layer, and NM time step, with new line, if value > 0."""
     if value > 0:
         if value == 1:
-            print(f'{synapse.get_layer()}: {NM.get_time_step()})    {s}')
+            output_sink_of(synapse).write(f'{synapse.get_layer()}: {NM.get_time_step()})    {s}\n')
         else:
-            print(f'{synapse.get_layer()}: {NM.get_time_step()})    {value}, {s}')
+            output_sink_of(synapse).write(f'{synapse.get_layer()}: {NM.get_time_step()})    {value}, {s}\n')
 
 def action_layer_time_step_coeff_println_global_sequence(synapse, value, s, NM):
     """Print string action, layer, and NM time step, with new line, if value > 0."""
@@ -136,9 +152,9 @@ def action_layer_time_step_coeff_println_global_sequence(synapse, value, s, NM):
         layer = synapse.get_layer()
         time_step = NM.get_time_step()
         if value == 1:
-            print(f'{layer}: {time_step})    {s}')
+            output_sink_of(synapse).write(f'{layer}: {time_step})    {s}\n')
         else:
-            print(f'{layer}: {time_step})    {value}, {s}')
+            output_sink_of(synapse).write(f'{layer}: {time_step})    {value}, {s}\n')
         NM.append_to_global_sequence(layer, time_step, s)
 
 
@@ -175,3 +191,81 @@ action_inverse_fn_map = {
     'action_layer_time_step_coeff_println': 'layer_time_step_coeff_println',
     'action_layer_time_step_coeff_println_global_sequence': 'layer_time_step_coeff_println_global_sequence',
 }
+
+
+# Action dispatch modes:
+ACTION_NEVER = 0     # no-op actions, never invoked
+ACTION_POSITIVE = 1  # actions that only act when value > 0
+ACTION_ALWAYS = 2    # actions invoked every time step, eg, user defined actions
+
+action_noop_set = {
+    'action_null',
+}
+
+action_positive_set = {
+    'action_println',
+    'action_print',
+    'action_print_buffer',
+    'action_print_to_buffer',
+    'action_print_to_buffers',
+    'action_print_to_buffer_flush',
+    'action_init_store_buffer',
+    'action_store_buffer',
+    'action_counter_println',
+    'action_time_step_println',
+    'action_time_step_coeff_println',
+    'action_layer_time_step_coeff_println',
+    'action_layer_time_step_coeff_println_global_sequence',
+}
+
+def action_dispatch_mode(action_fn):
+    """Return the dispatch mode for the given action function."""
+    if action_fn is None:
+        return ACTION_NEVER
+    name = action_fn.__name__
+    if name in action_noop_set:
+        return ACTION_NEVER
+    if name in action_positive_set:
+        return ACTION_POSITIVE
+    return ACTION_ALWAYS
+
+
+def action_println_render(synapse, value, s):
+    """Render the println action to a string."""
+    return f'{s}\n'
+
+def action_print_render(synapse, value, s):
+    """Render the print action to a string."""
+    return f'{s}'
+
+def action_time_step_println_render(synapse, value, s, NM):
+    """Render the time step println action to a string."""
+    return f'{NM.get_time_step()}) {s}\n'
+
+def action_time_step_coeff_println_render(synapse, value, s, NM):
+    """Render the time step coeff println action to a string."""
+    if value == 1:
+        return f'{NM.get_time_step()})    {s}\n'
+    return f'{NM.get_time_step()})    {value}, {s}\n'
+
+def action_layer_time_step_coeff_println_render(synapse, value, s, NM):
+    """Render the layer time step coeff println action to a string."""
+    if value == 1:
+        return f'{synapse.get_layer()}: {NM.get_time_step()})    {s}\n'
+    return f'{synapse.get_layer()}: {NM.get_time_step()})    {value}, {s}\n'
+
+# Print actions with no other side effects, mapped to functions that render their output as a string.
+# Consecutive firings of these actions are written to the output sink in one go:
+action_render_fn_map = {
+    'action_println': action_println_render,
+    'action_print': action_print_render,
+    'action_time_step_println': action_time_step_println_render,
+    'action_time_step_coeff_println': action_time_step_coeff_println_render,
+    'action_layer_time_step_coeff_println': action_layer_time_step_coeff_println_render,
+}
+
+def action_render_fn(action_fn):
+    """Return the render function for the given action function, or None if it doesn't have one."""
+    if action_fn is None:
+        return None
+    return action_render_fn_map.get(action_fn.__name__)
@@ -0,0 +1,235 @@
+"""Implement an activation tracker, that keeps the neurons of a neural module ordered by activation count, and optionally by decayed activation rate."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import heapq
+from math import log, exp, inf
+from .capacity import log_add
+
+class ActivationBucket:
+    """The neurons with a given activation count, linked to the buckets with the next lower and next higher counts."""
+    def __init__(self, count):
+        self.count = count
+        self.names = {} # neuron name -> None, a set that keeps insertion order
+        self.lower = None
+        self.higher = None
+
+class ActivationTracker:
+    """Tracks the activation counts of a neural module's neurons, so activation reports and pruning only visit the neurons they return.
+
+    Neurons are kept in buckets, one per distinct activation count, linked in order of count. When a neuron fires it moves to the
+    next bucket up, in O(1), and top k, at least and below queries walk the buckets from either end, in O(k).
+
+    If half_life is given, we also keep each neuron's activation rate, decayed with that half life in time steps, and scaled so a
+    neuron that fires every time step has rate 1. Rates are stored as log scores that only increase, see CapacityTracker,
+    so a firing costs O(1), and a lazy min heap finds the neurons below a rate without visiting the rest.
+
+    Counts are updated by NM.update_neurons(), and by the merging of duplicate patterns. Call rebuild() after setting
+    activation counts directly.
+    """
+    def __init__(self, NM, half_life=None):
+        self.NM = NM
+        self.half_life = half_life
+        self.decay = None if half_life is None else log(2) / half_life
+        self.clear()
+
+    def __len__(self):
+        return len(self.counts)
+
+    def clear(self):
+        """Stop tracking all neurons."""
+        self.counts = {} # neuron name -> activation count
+        self.buckets = {} # activation count -> bucket
+        self.lowest = None
+        self.highest = None
+        self.scores = {} # neuron name -> log of the sum of exp(decay * time step) over its activations
+        self.heap = []
+        self.heap_entries = {} # neuron name -> insert count of its current heap entry
+        self.insert_count = 0
+
+    def rebuild(self):
+        """Track all the neurons of our module from scratch."""
+        self.clear()
+        neurons = [(neuron.activation_count, name) for name, neuron in self.NM.neurons.items() if neuron.valid]
+        for count, name in sorted(neurons, key=lambda x: x[0]): # in order of count, so each new bucket goes on the end
+            self.track(name, count)
+
+    def bucket_for(self, count, near=None):
+        """Return the bucket for count, linking in a new one if needed, searching from the bucket near it."""
+        bucket = self.buckets.get(count)
+        if bucket is not None:
+            return bucket
+        if near is None:
+            near = self.highest if self.highest is not None and count > self.highest.count else self.lowest
+        lower, higher = None, None
+        if near is not None and near.count < count:
+            lower, higher = near, near.higher
+            while higher is not None and higher.count < count:
+                lower, higher = higher, higher.higher
+        elif near is not None:
+            lower, higher = near.lower, near
+            while lower is not None and lower.count > count:
+                lower, higher = lower.lower, lower
+        bucket = ActivationBucket(count)
+        bucket.lower = lower
+        bucket.higher = higher
+        if lower is None:
+            self.lowest = bucket
+        else:
+            lower.higher = bucket
+        if higher is None:
+            self.highest = bucket
+        else:
+            higher.lower = bucket
+        self.buckets[count] = bucket
+        return bucket
+
+    def discard_name(self, name, bucket):
+        """Remove a name from its bucket, and unlink the bucket if it is now empty."""
+        del bucket.names[name]
+        if bucket.names:
+            return
+        if bucket.lower is None:
+            self.lowest = bucket.higher
+        else:
+            bucket.lower.higher = bucket.higher
+        if bucket.higher is None:
+            self.highest = bucket.lower
+        else:
+            bucket.higher.lower = bucket.lower
+        del self.buckets[bucket.count]
+
+    def push_score(self, name):
+        """Push a new heap entry for the neuron, replacing any earlier one."""
+        self.insert_count += 1
+        self.heap_entries[name] = self.insert_count
+        heapq.heappush(self.heap, (self.scores[name], self.insert_count, name))
+        if len(self.heap) > 2 * len(self.heap_entries) + 64: # drop the entries of untracked neurons
+            self.heap = [entry for entry in self.heap if self.heap_entries.get(entry[2]) == entry[1]]
+            heapq.heapify(self.heap)
+
+    def track(self, name, count):
+        """Start tracking a neuron with the given activation count, counting any past activations as happening now."""
+        if name in self.counts:
+            self.untrack(name)
+        self.counts[name] = count
+        self.bucket_for(count).names[name] = None
+        if self.decay is not None:
+            self.scores[name] = log(count) + self.decay * self.NM.time_step_counter if count > 0 else -inf
+            self.push_score(name)
+
+    def untrack(self, name):
+        """Stop tracking a neuron. Its heap entry is discarded when it reaches the top."""
+        count = self.counts.pop(name, None)
+        if count is None:
+            return
+        self.discard_name(name, self.buckets[count])
+        self.scores.pop(name, None)
+        self.heap_entries.pop(name, None)
+
+    def record(self, name, count, time_step):
+        """Record that the neuron's activation count changed to count, at the given time step."""
+        old_count = self.counts.get(name)
+        if old_count is None:
+            self.track(name, count)
+            return
+        if count == old_count:
+            return
+        old_bucket = self.buckets[old_count]
+        self.bucket_for(count, old_bucket).names[name] = None
+        self.discard_name(name, old_bucket)
+        self.counts[name] = count
+        if self.decay is not None and count > old_count:
+            self.scores[name] = log_add(self.scores[name], log(count - old_count) + self.decay * time_step)
+
+    def get_count(self, name):
+        """Return the tracked activation count of a neuron, or None if it is not tracked."""
+        return self.counts.get(name)
+
+    def top(self, k):
+        """Return the k most active neurons, as (name, activation count) pairs, most active first."""
+        result = []
+        bucket = self.highest
+        while bucket is not None and len(result) < k:
+            for name in bucket.names:
+                if len(result) == k:
+                    break
+                result.append((name, bucket.count))
+            bucket = bucket.lower
+        return result
+
+    def at_least(self, activation_threshold):
+        """Return a list of (activation count, neuron names) pairs with count at least the threshold, most active first."""
+        result = []
+        bucket = self.highest
+        while bucket is not None and bucket.count >= activation_threshold:
+            result.append((bucket.count, list(bucket.names)))
+            bucket = bucket.lower
+        return result
+
+    def below(self, activation_threshold):
+        """Return the names of the neurons with activation count less than the threshold."""
+        result = []
+        bucket = self.lowest
+        while bucket is not None and bucket.count < activation_threshold:
+            result.extend(bucket.names)
+            bucket = bucket.higher
+        return result
+
+    def rate(self, name):
+        """Return the decayed activation rate of a neuron, at the current time step, or None if rates are not tracked."""
+        if self.decay is None or name not in self.scores:
+            return None
+        return (1 - exp(-self.decay)) * exp(self.scores[name] - self.decay * self.NM.time_step_counter)
+
+    def top_rates(self, k):
+        """Return the k neurons with the highest decayed activation rates, as (name, rate) pairs, highest first.
+        Rates change order over time, so unlike top(), this is a single pass over the scores, in O(n log k).
+        """
+        if self.decay is None:
+            return []
+        scale = 1 - exp(-self.decay)
+        offset = self.decay * self.NM.time_step_counter
+        return [(name, scale * exp(score - offset)) for name, score in heapq.nlargest(k, self.scores.items(), key=lambda x: x[1])]
+
+    def below_rate(self, rate_threshold):
+        """Return the names of the neurons with a decayed activation rate less than the threshold, lowest first."""
+        if self.decay is None or rate_threshold <= 0:
+            return []
+        cutoff = log(rate_threshold / (1 - exp(-self.decay))) + self.decay * self.NM.time_step_counter
+        found = []
+        while self.heap and self.heap[0][0] < cutoff:
+            score, number, name = heapq.heappop(self.heap)
+            if self.heap_entries.get(name) != number:
+                continue
+            current = self.scores[name]
+            if current > score: # it has fired since the entry was pushed
+                heapq.heappush(self.heap, (current, number, name))
+                continue
+            found.append((score, number, name))
+        for entry in found:
+            heapq.heappush(self.heap, entry)
+        return [name for _, _, name in found]
+
+    def activation_report(self, activation_threshold):
+        """Return an activation report as a string, the same as NM.activation_report()."""
+        s = "Activation report:\n"
+        for count, names in self.at_least(activation_threshold):
+            s += f"    {count}    {sorted(names)}\n"
+        return s
+
+    def rate_report(self, k=10):
+        """Return a report of the k neurons with the highest decayed activation rates, as a string."""
+        s = f"Activation rate report, half life {self.half_life}:\n"
+        for name, rate in self.top_rates(k):
+            s += f"    {rate:.4f}    {name}\n"
+        return s
+
+    def __str__(self):
+        s = "Activation tracker:\n"
+        s += f"    half life: {self.half_life}\n"
+        s += f"    tracked neurons: {len(self.counts)}\n"
+        s += f"    distinct counts: {len(self.buckets)}\n"
+        s += f"    top 5: {self.top(5)}\n"
+        return s
@@ -0,0 +1,166 @@
+"""Implement an asyncio driver for neural systems, with external pokes and output subscribers."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import asyncio
+from time import perf_counter
+
+class AsyncDriver:
+    """Ticks a neural system from an asyncio event loop, injecting queued channel pokes and publishing output changes."""
+    def __init__(self, system, rate=None, max_queued=1024, max_catch_up=1):
+        self.system = system
+        self.rate = rate                 # ticks per second, or None for as fast as possible
+        self.max_queued = max_queued
+        self.max_catch_up = max_catch_up # ticks behind schedule before the schedule is reset
+        self.queue = None
+        self.loop = None
+        self.subscribers = []
+        self.running = False
+        self.tick_count = 0
+        self.last_outputs = dict(system.current_outputs_state)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the tick and backpressure statistics."""
+        self.stats_dict = {
+            'ticks': 0,
+            'tick_time': 0.0,
+            'max_tick_time': 0.0,
+            'overruns': 0,
+            'max_lateness': 0.0,
+            'schedule_resets': 0,
+            'events_received': 0,
+            'events_dropped': 0,
+            'max_queue_depth': 0,
+            'published': 0,
+            'subscriber_drops': 0,
+        }
+
+    def get_queue(self):
+        """Return the poke queue, creating it in the running event loop if needed."""
+        if self.queue is None:
+            self.queue = asyncio.Queue(self.max_queued)
+            self.loop = asyncio.get_running_loop()
+        return self.queue
+
+    async def poke(self, channel, value=1):
+        """Queue a poke of the given channel, waiting if the queue is full."""
+        await self.get_queue().put((channel, value))
+
+    def poke_nowait(self, channel, value=1):
+        """Queue a poke of the given channel from the event loop thread, returning False if it was dropped."""
+        try:
+            self.get_queue().put_nowait((channel, value))
+            return True
+        except asyncio.QueueFull:
+            self.stats_dict['events_dropped'] += 1
+            return False
+
+    def poke_threadsafe(self, channel, value=1):
+        """Queue a poke of the given channel from another thread, once run() has started."""
+        if self.loop is None:
+            print("AsyncDriver is not running")
+            return
+        self.loop.call_soon_threadsafe(self.poke_nowait, channel, value)
+
+    def subscribe(self, channels=None, max_queued=1024):
+        """Return an asyncio queue that receives (tick, channel, value) when one of the given output channels changes.
+        If channels is None, subscribe to all output channels.
+        """
+        queue = asyncio.Queue(max_queued)
+        channel_set = None if channels is None else set(channels)
+        self.subscribers.append((channel_set, queue))
+        return queue
+
+    def unsubscribe(self, queue):
+        """Remove the given subscriber queue."""
+        self.subscribers = [(channel_set, q) for channel_set, q in self.subscribers if q is not queue]
+
+    def drain_pokes(self):
+        """Move all the queued pokes into the system."""
+        queue = self.get_queue()
+        depth = queue.qsize()
+        if depth > self.stats_dict['max_queue_depth']:
+            self.stats_dict['max_queue_depth'] = depth
+        while not queue.empty():
+            channel, value = queue.get_nowait()
+            self.system.poke_channel(channel, value)
+            self.stats_dict['events_received'] += 1
+
+    def publish_outputs(self):
+        """Send changed output channels to our subscribers, dropping the oldest event when a subscriber falls behind."""
+        current_outputs = self.system.current_outputs_state
+        for channel, value in current_outputs.items():
+            if self.last_outputs.get(channel) == value:
+                continue
+            self.last_outputs[channel] = value
+            event = (self.tick_count, channel, value)
+            for channel_set, queue in self.subscribers:
+                if channel_set is not None and channel not in channel_set:
+                    continue
+                if queue.full():
+                    queue.get_nowait()
+                    self.stats_dict['subscriber_drops'] += 1
+                queue.put_nowait(event)
+                self.stats_dict['published'] += 1
+
+    def tick(self):
+        """Inject pokes, update the system by one time step, and publish the output changes."""
+        start = perf_counter()
+        self.drain_pokes()
+        self.system.update_system(1)
+        self.tick_count += 1
+        self.publish_outputs()
+        seconds = perf_counter() - start
+        self.stats_dict['ticks'] += 1
+        self.stats_dict['tick_time'] += seconds
+        if seconds > self.stats_dict['max_tick_time']:
+            self.stats_dict['max_tick_time'] = seconds
+
+    async def run(self, ticks=None):
+        """Tick the system at our rate until stop() is called, or for the given number of ticks."""
+        self.get_queue()
+        self.running = True
+        period = None if self.rate is None else 1 / self.rate
+        deadline = perf_counter()
+        count = 0
+        while self.running and (ticks is None or count < ticks):
+            self.tick()
+            count += 1
+            if period is None:
+                await asyncio.sleep(0) # let the producers and subscribers run
+                continue
+            deadline += period
+            lateness = perf_counter() - deadline
+            if lateness > 0:
+                self.stats_dict['overruns'] += 1
+                if lateness > self.stats_dict['max_lateness']:
+                    self.stats_dict['max_lateness'] = lateness
+                if lateness > self.max_catch_up * period: # too far behind, so drop the missed ticks
+                    deadline = perf_counter()
+                    self.stats_dict['schedule_resets'] += 1
+                await asyncio.sleep(0)
+            else:
+                await asyncio.sleep(-lateness)
+        self.running = False
+        self.system.flush_output()
+
+    def stop(self):
+        """Stop run() after the current tick."""
+        self.running = False
+
+    def stats(self):
+        """Return the tick and backpressure statistics as a Python dictionary."""
+        stats_dict = dict(self.stats_dict)
+        ticks = stats_dict['ticks']
+        stats_dict['mean_tick_time'] = stats_dict['tick_time'] / ticks if ticks > 0 else 0.0
+        stats_dict['queue_depth'] = 0 if self.queue is None else self.queue.qsize()
+        return stats_dict
+
+    def __str__(self):
+        s = f"Async driver for: {self.system.name}\n"
+        s += f"    rate: {self.rate}\n"
+        for key, value in self.stats().items():
+            s += f"    {key}: {value}\n"
+        return s
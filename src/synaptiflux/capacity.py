@@ -0,0 +1,169 @@
+"""Implement a capacity tracker, that bounds the number of learned neurons in a neural module by evicting the least useful."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import sys
+import heapq
+from math import log, exp, inf
+
+capacity_policies = ['lru', 'lfu', 'rate']
+
+def log_add(a, b):
+    """Return log(exp(a) + exp(b)), without overflow."""
+    if a < b:
+        a, b = b, a
+    if b == -inf:
+        return a
+    return a + log(1 + exp(b - a))
+
+def neuron_memory_estimate(neuron, synapse_count=1):
+    """Return a rough estimate, in bytes, of the memory used by a neuron's patterns and its synapses, excluding their histories."""
+    size = sys.getsizeof(neuron) + sys.getsizeof(neuron.__dict__)
+    for k in neuron.pattern:
+        size += sys.getsizeof(neuron.pattern[k]) + sys.getsizeof(neuron.pattern_labels[k])
+        size += sum(sys.getsizeof(label) for label in neuron.pattern_labels[k])
+    return size + 1024 * synapse_count # roughly one synapse object and its dictionaries
+
+class CapacityTracker:
+    """Tracks the recency and activation of learned neurons, and evicts them once over capacity.
+
+    policy is one of:
+        'lru': evict the neuron that was least recently active.
+        'lfu': evict the neuron with the lowest activation count.
+        'rate': evict the neuron with the lowest activation rate, decayed with a half life of window time steps.
+
+    Candidates are kept in a lazy min heap. A neuron's score only ever increases, so a popped entry with a stale score is
+    pushed back with its current score, and the first entry whose score is current is the true minimum.
+    """
+    def __init__(self, max_neurons=None, max_memory_mb=None, policy='lru', window=100):
+        if policy not in capacity_policies:
+            print(f"Unknown capacity policy: {policy}, using lru")
+            policy = 'lru'
+        self.max_neurons = max_neurons
+        self.max_memory = None if max_memory_mb is None else max_memory_mb * 1024 * 1024
+        self.policy = policy
+        self.window = window
+        self.decay = log(2) / window
+        self.heap = []
+        self.tracked = {} # neuron name -> [axon time offset, activation count seen, score, memory estimate]
+        self.memory = 0
+        self.insert_count = 0
+        self.newest = None # the most recently learned neuron is never evicted
+        self.evictions = 0
+        self.evicted = []
+
+    def __len__(self):
+        return len(self.tracked)
+
+    def activation_time(self, neuron, offset):
+        """Return the time step of the neuron's last activation."""
+        return offset + neuron.last_activation
+
+    def score(self, NM, name):
+        """Bring the neuron's score up to date, and return it."""
+        state = self.tracked[name]
+        offset, seen, score, _ = state
+        neuron = NM.neurons[name]
+        if self.policy == 'lru':
+            score = max(score, self.activation_time(neuron, offset))
+        elif self.policy == 'lfu':
+            score = neuron.activation_count
+        else:
+            delta = neuron.activation_count - seen
+            if delta > 0: # credit the new activations at the last activation time
+                score = log_add(score, log(delta) + self.decay * self.activation_time(neuron, offset))
+        state[1] = neuron.activation_count
+        state[2] = score
+        return score
+
+    def add(self, NM, name):
+        """Start tracking a learned neuron.
+        Eviction is left to the start of the next time step, see NM.enforce_capacity(), since we may be called from inside a synapse action.
+        """
+        if name not in NM.neurons:
+            return
+        neuron = NM.neurons[name]
+        time_step = NM.get_time_step()
+        offset = time_step - len(neuron.axon) # converts positions in the neuron's axon into module time steps
+        if self.policy == 'lru':
+            score = time_step
+        elif self.policy == 'lfu':
+            score = neuron.activation_count
+        else:
+            score = self.decay * time_step # count learning the pattern as one activation
+        memory = neuron_memory_estimate(neuron, len(NM.get_neuron_synapses(name)) + 1)
+        self.remove(name)
+        self.tracked[name] = [offset, neuron.activation_count, score, memory]
+        self.memory += memory
+        self.insert_count += 1
+        heapq.heappush(self.heap, (score, self.insert_count, name))
+        self.newest = name
+
+    def remove(self, name):
+        """Stop tracking a neuron. Its heap entry is discarded when it reaches the top."""
+        state = self.tracked.pop(name, None)
+        if state is not None:
+            self.memory -= state[3]
+
+    def is_over_capacity(self):
+        """Return True if we are tracking too many neurons, or too much memory."""
+        if self.max_neurons is not None and len(self.tracked) > self.max_neurons:
+            return True
+        if self.max_memory is not None and self.memory > self.max_memory:
+            return True
+        return False
+
+    def pop_candidate(self, NM, keep=None):
+        """Pop and return the name of the neuron with the lowest current score, or None if there are none."""
+        deferred = []
+        candidate = None
+        while self.heap:
+            score, count, name = heapq.heappop(self.heap)
+            if name not in self.tracked:
+                continue
+            if name not in NM.neurons: # erased by someone else
+                self.remove(name)
+                continue
+            if name == keep:
+                deferred.append((score, count, name))
+                continue
+            current = self.score(NM, name)
+            if current > score:
+                heapq.heappush(self.heap, (current, count, name))
+                continue
+            candidate = name
+            break
+        for entry in deferred:
+            heapq.heappush(self.heap, entry)
+        return candidate
+
+    def evict(self, NM):
+        """Evict neurons, and the synapses on their axons, until we are back under capacity."""
+        while self.is_over_capacity():
+            name = self.pop_candidate(NM, self.newest)
+            if name is None:
+                return
+            self.remove(name)
+            NM.remove_neuron(name)
+            self.evictions += 1
+            self.evicted.append(name)
+
+    def get_evicted(self, clear=True):
+        """Return the list of evicted neuron names, since the last call."""
+        evicted = self.evicted
+        if clear:
+            self.evicted = []
+        return evicted
+
+    def __str__(self):
+        s = "Capacity tracker:\n"
+        s += f"    policy: {self.policy}\n"
+        if self.policy == 'rate':
+            s += f"    window: {self.window}\n"
+        s += f"    max neurons: {self.max_neurons}\n"
+        s += f"    max memory: {self.max_memory}\n"
+        s += f"    tracked neurons: {len(self.tracked)}\n"
+        s += f"    estimated memory: {self.memory}\n"
+        s += f"    evictions: {self.evictions}\n"
+        return s
@@ -0,0 +1,148 @@
+"""Implement a registry of trigger, pooling, synapse and action functions, and their metadata."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+from .trigger_fn import trigger_fn_map, trigger_inverse_fn_map
+from .pooling_fn import pooling_fn_map, pooling_inverse_fn_map, pooling_short_circuit_fn_map
+from .synapse_fn import synapse_fn_map, synapse_inverse_fn_map
+from .action_fn import action_fn_map, action_inverse_fn_map, action_noop_set, action_positive_set, action_render_fn_map
+
+fn_kinds = ['trigger', 'pooling', 'synapse', 'action']
+
+# the lookup maps used by the rest of the engine, for each kind of function. register_fn() keeps them up to date:
+fn_kind_maps = {
+    'trigger': (trigger_fn_map, trigger_inverse_fn_map),
+    'pooling': (pooling_fn_map, pooling_inverse_fn_map),
+    'synapse': (synapse_fn_map, synapse_inverse_fn_map),
+    'action': (action_fn_map, action_inverse_fn_map),
+}
+
+# the leading arguments supplied by the engine, rather than by the function parameters:
+fn_kind_arguments = {
+    'trigger': ['list1', 'list2'],
+    'pooling': ['list1'],
+    'synapse': ['axon'],
+    'action': ['synapse', 'value'],
+}
+
+def fn_param_names(kind, fn):
+    """Return the names of the parameters of fn, excluding the leading arguments supplied by the engine."""
+    code = fn.__code__
+    return list(code.co_varnames[len(fn_kind_arguments[kind]):code.co_argcount])
+
+class FnInfo:
+    """The metadata of a registered function.
+
+    kind: one of fn_kinds.
+    name: the short name used when saving neural modules, eg 'simm' for trigger_list_simm_threshold.
+    params: the list of parameter names, after the leading arguments supplied by the engine.
+    pure: True if the result only depends on the arguments, with no side effects.
+    short_circuit_fn: for pooling functions, a function of (partial_sum, remaining, **pooling_params) that returns True
+        once the pooled result is decided, so the remaining trigger functions can be skipped.
+    positive_only: for actions, True if the action does nothing when value <= 0.
+    noop: for actions, True if the action never does anything.
+    render_fn: for print actions with no other side effects, a function that renders their output as a string.
+    batch_fn: an optional batched implementation, for engines that evaluate many calls at once.
+    """
+    def __init__(self, kind, name, fn, params=None, pure=True, short_circuit_fn=None, positive_only=False, noop=False, render_fn=None, batch_fn=None):
+        self.kind = kind
+        self.name = name
+        self.fn = fn
+        self.params = fn_param_names(kind, fn) if params is None else list(params)
+        self.pure = pure
+        self.short_circuit_fn = short_circuit_fn
+        self.positive_only = positive_only
+        self.noop = noop
+        self.render_fn = render_fn
+        self.batch_fn = batch_fn
+
+    def check_params(self, params):
+        """Return True if params has exactly the parameters of the function, else print the difference and return False."""
+        missing = [name for name in self.params if name not in params]
+        unknown = [name for name in params if name not in self.params]
+        if missing or unknown:
+            print(f"{self.kind} function {self.name}: missing params {missing}, unknown params {unknown}")
+            return False
+        return True
+
+    def __str__(self):
+        flags = [flag for flag, value in [('pure', self.pure), ('short circuit', self.short_circuit_fn is not None),
+            ('positive only', self.positive_only), ('no-op', self.noop), ('render', self.render_fn is not None),
+            ('batch', self.batch_fn is not None)] if value]
+        return f"{self.kind} {self.name}: {self.fn.__name__}({', '.join(fn_kind_arguments[self.kind] + self.params)}) [{', '.join(flags)}]"
+
+registered_fns = {kind: {} for kind in fn_kinds} # kind -> function __name__ -> FnInfo
+
+def register_fn(kind, name, fn, params=None, pure=None, short_circuit_fn=None, positive_only=False, noop=False, render_fn=None, batch_fn=None):
+    """Register a trigger, pooling, synapse or action function under the short name, and return its FnInfo.
+    The lookup maps used by the engine, eg trigger_fn_map and trigger_inverse_fn_map, are updated too,
+    so the function can be used in, and saved from, neural modules.
+    pure defaults to True, except for actions.
+    """
+    if kind not in fn_kinds:
+        print(f"Unknown function kind: {kind}")
+        return None
+    if pure is None:
+        pure = kind != 'action'
+    info = FnInfo(kind, name, fn, params, pure, short_circuit_fn, positive_only, noop, render_fn, batch_fn)
+    fn_map, inverse_fn_map = fn_kind_maps[kind]
+    fn_map[name] = fn
+    inverse_fn_map[fn.__name__] = name
+    registered_fns[kind][fn.__name__] = info
+    if kind == 'pooling':
+        if short_circuit_fn is not None:
+            pooling_short_circuit_fn_map[fn.__name__] = short_circuit_fn
+        else:
+            pooling_short_circuit_fn_map.pop(fn.__name__, None)
+    if kind == 'action':
+        action_noop_set.discard(fn.__name__)
+        action_positive_set.discard(fn.__name__)
+        if noop:
+            action_noop_set.add(fn.__name__)
+        elif positive_only:
+            action_positive_set.add(fn.__name__)
+        if render_fn is not None:
+            action_render_fn_map[fn.__name__] = render_fn
+        else:
+            action_render_fn_map.pop(fn.__name__, None)
+    return info
+
+def get_fn_info(kind, fn):
+    """Return the FnInfo of a function, given the function or its short name, or None if it is not registered."""
+    if kind not in fn_kinds:
+        print(f"Unknown function kind: {kind}")
+        return None
+    if isinstance(fn, str):
+        fn = fn_kind_maps[kind][0].get(fn)
+        if fn is None:
+            return None
+    return registered_fns[kind].get(fn.__name__)
+
+def lookup_fn(kind, name):
+    """Return the function registered under the short name, or None."""
+    info = get_fn_info(kind, name)
+    if info is None:
+        return None
+    return info.fn
+
+def get_batch_fn(kind, fn):
+    """Return the batched implementation of a function, or None if it doesn't have one."""
+    info = get_fn_info(kind, fn)
+    if info is None:
+        return None
+    return info.batch_fn
+
+def register_builtin_fns():
+    """Register the functions already in the lookup maps, with the metadata the engine already knows about them."""
+    for kind in fn_kinds:
+        fn_map, _ = fn_kind_maps[kind]
+        for name, fn in list(fn_map.items()):
+            fn_name = fn.__name__
+            register_fn(kind, name, fn,
+                short_circuit_fn=pooling_short_circuit_fn_map.get(fn_name) if kind == 'pooling' else None,
+                positive_only=fn_name in action_positive_set,
+                noop=fn_name in action_noop_set,
+                render_fn=action_render_fn_map.get(fn_name) if kind == 'action' else None)
+
+register_builtin_fns()
@@ -0,0 +1,174 @@
+"""Implement journaled persistence of neural modules: a snapshot, plus an append only journal of structure changes."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import os
+import json
+import threading
+from .module_codec import ObjectTable, encode_change, apply_change, encode_module, decode_module
+
+def journal_paths(path):
+    """Return the snapshot, journal, and compacting journal filenames for the given base path."""
+    return path + '.snapshot.json', path + '.journal', path + '.journal.old'
+
+def read_journal(filename):
+    """Read the change records of a journal, ignoring a partly written last line."""
+    records = []
+    if not os.path.exists(filename):
+        return records
+    with open(filename, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Ignoring a partial journal record in {filename}")
+                break
+    return records
+
+def load_journaled_module(NM, path):
+    """Load the snapshot and replay the journal at the given base path into the module.
+    Return the sequence number of the last change applied, or None if there is nothing to load.
+    """
+    snapshot_file, journal_file, old_journal_file = journal_paths(path)
+    if not any(os.path.exists(filename) for filename in journal_paths(path)):
+        return None
+    table = ObjectTable()
+    seq = 0
+    if os.path.exists(snapshot_file):
+        with open(snapshot_file, 'r') as f:
+            snapshot = json.load(f)
+        decode_module(NM, snapshot['state'], table)
+        seq = snapshot['seq']
+    for record in read_journal(old_journal_file) + read_journal(journal_file):
+        if record['seq'] <= seq: # already in the snapshot
+            continue
+        apply_change(NM, record, table)
+        NM.neuron_name_index = record['neuron_name_index']
+        seq = record['seq']
+    return seq
+
+class ModuleJournal:
+    """Persists a neural module incrementally, by appending its structure changes to a journal as they happen.
+
+    Saving is then proportional to the number of changes, rather than the size of the module. Every compact_interval
+    changes, the journal is compacted into a new snapshot, with the file writing done in a background thread if
+    background is True. Changes are flushed every flush_interval changes, so a crash loses at most that many.
+    flush_interval == 0 means only flush on flush(), compact() and close(). If sync is True, flushes also fsync.
+
+    If the path already has a snapshot or journal, it is loaded into the module first, and compacted.
+    Only the structure is saved, as in save_as_json(), not axons or spike histories, and activation counts are those at
+    the last compaction.
+    """
+    def __init__(self, NM, path, flush_interval=1, compact_interval=1000, background=True, sync=False):
+        self.NM = NM
+        self.path = path
+        self.snapshot_file, self.journal_file, self.old_journal_file = journal_paths(path)
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self.background = background
+        self.sync = sync
+        self.pending = []
+        self.changes_since_compact = 0
+        self.compact_thread = None
+        self.compact_count = 0
+        seq = load_journaled_module(NM, path)
+        self.seq = 0 if seq is None else seq
+        self.table = ObjectTable() # object numbers start again, so compact now, rather than mix numberings in one journal
+        self.f = None
+        self.compact(wait=True)
+        NM.add_structure_listener(self.record_change)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record_change(self, NM, op, args):
+        """Append a structure change to the journal, as a structure listener."""
+        self.seq += 1
+        record = {'seq': self.seq, 'neuron_name_index': NM.neuron_name_index} # so learning after a load continues the neuron names
+        record.update(encode_change(NM, op, args, self.table))
+        self.pending.append(json.dumps(record, separators=(',', ':')) + '\n')
+        self.changes_since_compact += 1
+        if self.compact_interval and self.changes_since_compact >= self.compact_interval:
+            self.compact()
+        elif self.flush_interval and len(self.pending) >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write the pending changes to the journal."""
+        if not self.pending:
+            return
+        self.f.write(''.join(self.pending))
+        self.pending = []
+        self.f.flush()
+        if self.sync:
+            os.fsync(self.f.fileno())
+
+    def wait(self):
+        """Wait for a background compaction to finish."""
+        if self.compact_thread is not None:
+            self.compact_thread.join()
+            self.compact_thread = None
+
+    def compact(self, wait=False):
+        """Write a new snapshot of the module, and start a new journal.
+        The snapshot is encoded now, and written in a background thread if background is True, unless wait is True.
+        Until it is written, loading uses the old snapshot, plus the old and new journals.
+        """
+        self.wait()
+        if self.f is not None:
+            self.flush()
+            self.f.close()
+        if os.path.exists(self.journal_file):
+            if os.path.exists(self.old_journal_file): # an earlier compaction didn't finish, so keep its journal too
+                with open(self.journal_file, 'r') as f:
+                    changes = f.read()
+                with open(self.old_journal_file, 'a') as f:
+                    f.write(changes)
+                os.remove(self.journal_file)
+            else:
+                os.replace(self.journal_file, self.old_journal_file)
+        self.f = open(self.journal_file, 'a')
+        snapshot = json.dumps({'seq': self.seq, 'state': encode_module(self.NM, self.table)}) # encode now, before the module changes
+        self.changes_since_compact = 0
+        self.compact_count += 1
+        if self.background and not wait:
+            self.compact_thread = threading.Thread(target=self.write_snapshot, args=(snapshot,), daemon=True)
+            self.compact_thread.start()
+        else:
+            self.write_snapshot(snapshot)
+
+    def write_snapshot(self, snapshot):
+        """Write the encoded snapshot, replacing the old one, then remove the old journal."""
+        tmp_file = self.snapshot_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            f.write(snapshot)
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+        if os.path.exists(self.old_journal_file):
+            os.remove(self.old_journal_file)
+
+    def close(self):
+        """Flush the journal, wait for any compaction, and stop recording changes."""
+        if self.f is None:
+            return
+        self.NM.remove_structure_listener(self.record_change)
+        self.flush()
+        self.wait()
+        self.f.close()
+        self.f = None
+
+    def __str__(self):
+        s = f"Module journal: {self.path}\n"
+        s += f"    sequence number: {self.seq}\n"
+        s += f"    pending changes: {len(self.pending)}\n"
+        s += f"    changes since compaction: {self.changes_since_compact}\n"
+        s += f"    compactions: {self.compact_count}\n"
+        return s
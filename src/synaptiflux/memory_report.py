@@ -0,0 +1,202 @@
+"""Implement memory accounting reports for neural modules and neural systems."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import sys
+import heapq
+from array import array
+from collections import defaultdict, deque
+
+memory_components = [
+    'neurons', 'patterns', 'axons', 'synapses', 'spike histories', 'synapse aliases', 'indexes', 'global sequences',
+    'poke buffers', 'latent neurons', 'variable histories', 'input histories', 'output histories', 'active synapse strings',
+]
+
+scalar_types = {int, float, str, bool, type(None)}
+
+def value_size(value, strings=True):
+    """Return the size of a scalar, or 0 if it is shared, eg None, True, False and the cached small ints."""
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, int) and -5 <= value <= 256:
+        return 0
+    if isinstance(value, str) and not strings:
+        return 0
+    return sys.getsizeof(value)
+
+container_types = (list, tuple, deque, set, frozenset, dict)
+
+def sampled_size(elements, sample, strings=True):
+    """Estimate the total deep size of a list of elements, from about sample of them, spread evenly.
+    For containers, eg the sets in an index, every shallow size and length is measured, and only the bytes per
+    contained element are estimated, since a few big containers would throw out a plain average.
+    """
+    n = len(elements)
+    step = n // sample
+    sampled = elements[0:step * sample:step]
+    if all(isinstance(elt, container_types) for elt in sampled) and all(isinstance(elt, container_types) for elt in elements):
+        shallow = sum(map(sys.getsizeof, elements))
+        inner_count = sum(map(len, elements))
+        sampled_count = sum(map(len, sampled))
+        if sampled_count == 0:
+            return shallow
+        inner_bytes = sum(deep_size(elt, sample, strings) - sys.getsizeof(elt) for elt in sampled)
+        return shallow + inner_bytes * inner_count // sampled_count
+    return sum(deep_size(elt, sample, strings) for elt in sampled) * n // len(sampled)
+
+def deep_size(value, sample=None, strings=True):
+    """Return an estimate of the bytes used by value, and the lists, dictionaries, sets and scalars it contains.
+    Other objects, eg functions, modules and buffers, are taken to be shared, and not counted.
+    If sample is given, containers with more elements than that are estimated from a sample, see sampled_size().
+    If strings is False, strings are taken to be shared too, eg the neuron names in indexes.
+    """
+    value_type = type(value)
+    if value_type is int:
+        return 0 if -5 <= value <= 256 else sys.getsizeof(value)
+    if value_type is float:
+        return sys.getsizeof(value)
+    if value_type in scalar_types:
+        return value_size(value, strings)
+    if isinstance(value, array):
+        return sys.getsizeof(value)
+    if not isinstance(value, container_types):
+        return 0
+    size = sys.getsizeof(value)
+    if sample is not None and len(value) > sample:
+        if isinstance(value, dict):
+            return size + sampled_size(list(value), sample, strings) + sampled_size(list(value.values()), sample, strings)
+        return size + sampled_size(value if isinstance(value, (list, tuple)) else list(value), sample, strings)
+    if isinstance(value, dict):
+        return size + sum(deep_size(key, sample, strings) + deep_size(elt, sample, strings) for key, elt in value.items())
+    return size + sum(deep_size(elt, sample, strings) for elt in value)
+
+def neuron_sizes(neuron, sample=None):
+    """Return the bytes used by a neuron object, its patterns, and its axon."""
+    size = sys.getsizeof(neuron) + sys.getsizeof(neuron.__dict__) + value_size(neuron.name)
+    size += deep_size(neuron.trigger_fn) + deep_size(neuron.trigger_params) + deep_size(neuron.pooling_params)
+    pattern_size = sys.getsizeof(neuron.pattern) + sys.getsizeof(neuron.pattern_labels)
+    for k in neuron.pattern:
+        pattern_size += deep_size(neuron.pattern[k]) + deep_size(neuron.pattern_labels[k])
+    return size, pattern_size, deep_size(neuron.axon, sample)
+
+def synapse_sizes(synapse, sample=None):
+    """Return the bytes used by a synapse object, and its spike history."""
+    size = sys.getsizeof(synapse) + sys.getsizeof(synapse.__dict__) + value_size(synapse.name) + value_size(synapse.axon_name)
+    size += deep_size(synapse.params) + deep_size(synapse.action_params)
+    return size, deep_size(synapse.spike_history, sample)
+
+def sequence_store_size(store):
+    """Return the bytes used by a global sequence store, and the bytes used per layer."""
+    size = sys.getsizeof(store) + deep_size(store.label_ids) + sys.getsizeof(store.labels) + sys.getsizeof(store.layers)
+    layer_sizes = {}
+    for layer, layer_sequence in store.layers.items():
+        layer_sizes[layer] = (sys.getsizeof(layer_sequence) + sys.getsizeof(layer_sequence.time_steps) + sys.getsizeof(layer_sequence.label_ids)
+            + deep_size(layer_sequence.groups) + deep_size(layer_sequence.rendered))
+    return size, layer_sizes
+
+class MemoryReport:
+    """The bytes used by a neural module or neural system, by component, by module and layer, and by entity.
+
+    Sizes are estimates from sys.getsizeof(), counting the containers and scalars each part owns.
+    Entities are neurons, including their patterns and axons, and synapses, including their spike histories.
+    """
+    def __init__(self, name, top_n=10):
+        self.name = name
+        self.top_n = top_n
+        self.components = defaultdict(int) # component -> bytes
+        self.module_layers = defaultdict(lambda: defaultdict(int)) # module name -> layer -> bytes
+        self.entities = {} # (kind, module name, entity name) -> bytes
+        self.counts = defaultdict(int) # 'neurons', 'synapses', ... -> number counted
+
+    def add(self, component, size, module_name=None, layer=None):
+        """Add size bytes to a component, and to a module layer if given."""
+        self.components[component] += size
+        if layer is not None:
+            self.module_layers[module_name][layer] += size
+
+    def total(self):
+        """Return the total bytes."""
+        return sum(self.components.values())
+
+    def top_entities(self, n=None):
+        """Return the n biggest entities, as (kind, module name, entity name, bytes), biggest first."""
+        n = self.top_n if n is None else n
+        return [key + (size,) for key, size in heapq.nlargest(n, self.entities.items(), key=lambda x: (x[1], x[0]))]
+
+    def as_dict(self):
+        """Return the report as a dictionary."""
+        return {
+            'name': self.name,
+            'total': self.total(),
+            'components': dict(self.components),
+            'layers': {module_name: dict(layers) for module_name, layers in self.module_layers.items()},
+            'top': [list(entity) for entity in self.top_entities()],
+            'counts': dict(self.counts),
+        }
+
+    def __str__(self):
+        s = f"Memory report: {self.name}\n"
+        s += f"    total: {self.total()} bytes\n"
+        s += f"    counts: {dict(self.counts)}\n"
+        s += "\n    components:\n"
+        for component in memory_components:
+            if component in self.components:
+                s += f"        {component}: {self.components[component]}\n"
+        for module_name, layers in self.module_layers.items():
+            s += f"\n    layers of {module_name}:\n"
+            for layer in sorted(layers):
+                s += f"        {layer}: {layers[layer]}\n"
+        s += f"\n    top {self.top_n}:\n"
+        for kind, module_name, name, size in self.top_entities():
+            s += f"        {size}    {kind} {module_name}: {name}\n"
+        return s
+
+def module_memory_report(NM, top_n=10, sample=None, report=None):
+    """Return a memory report of a neural module, or add it to report.
+    Time is linear in the number of neurons, synapses and pattern labels. With sample, eg 16, axons, spike histories,
+    indexes and other containers are sampled rather than measured, so reports are cheap enough to take every so many time steps.
+    """
+    if report is None:
+        report = MemoryReport(NM.name, top_n)
+    module_name = NM.name
+    entities = report.entities
+    for name, neuron in NM.neurons.items():
+        size, pattern_size, axon_size = neuron_sizes(neuron, sample)
+        report.add('neurons', size, module_name, neuron.layer)
+        report.add('patterns', pattern_size, module_name, neuron.layer)
+        report.add('axons', axon_size, module_name, neuron.layer)
+        entities[('neuron', module_name, name)] = size + pattern_size + axon_size
+    for synapses in [NM.synapses, NM.new_synapses]:
+        for name, synapse in synapses.items():
+            size, history_size = synapse_sizes(synapse, sample)
+            report.add('synapses', size, module_name, synapse.layer)
+            report.add('spike histories', history_size, module_name, synapse.layer)
+            entities[('synapse', module_name, name)] = size + history_size
+    report.counts['neurons'] += len(NM.neurons)
+    report.counts['synapses'] += len(NM.synapses) + len(NM.new_synapses)
+    report.add('synapse aliases', deep_size(NM.synapse_alias_dict, sample, strings=False))
+    index_size = sum(deep_size(index, sample, strings=False) for index in [NM.synapse_alias_reverse_dict, NM.neuron_synapses, NM.synapse_consumers, NM.pattern_index])
+    if NM.similarity_index is not None:
+        similarity_index = NM.similarity_index
+        index_size += sum(deep_size(index, sample, strings=False) for index in [similarity_index.postings, similarity_index.patterns, similarity_index.sizes, similarity_index.neuron_patterns])
+    report.add('indexes', index_size)
+    size, layer_sizes = sequence_store_size(NM.global_sequences)
+    report.add('global sequences', size)
+    for layer, layer_size in layer_sizes.items():
+        report.add('global sequences', layer_size, module_name, layer)
+    report.add('poke buffers', deep_size(NM.current_poked_neurons, strings=False) + deep_size(NM.poke_neuron_sequence_buffer, sample))
+    report.add('latent neurons', deep_size(NM.latent_neurons, sample))
+    return report
+
+def system_memory_report(NS, top_n=10, sample=None):
+    """Return a memory report of a neural system, including all its modules."""
+    report = MemoryReport(NS.name, top_n)
+    for module in NS.modules.values():
+        module_memory_report(module, top_n, sample, report)
+    report.counts['modules'] = len(NS.modules)
+    report.add('variable histories', deep_size(NS.variables_history, sample, strings=False))
+    report.add('input histories', deep_size(NS.module_inputs_history, sample, strings=False))
+    report.add('output histories', deep_size(NS.module_outputs_history, sample, strings=False))
+    report.add('active synapse strings', deep_size(NS.active_synapses_strings))
+    return report
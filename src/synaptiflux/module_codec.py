@@ -0,0 +1,311 @@
+"""Encode and decode neural module changes and state as JSON safe values, for the recorder and the journal."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import copy
+from collections import deque
+from .neuron import Neuron
+from .synapse import Synapse
+from .buffer import Buffer
+from .counter import Counter
+from .trigger_fn import trigger_fn_map, trigger_inverse_fn_map
+from .pooling_fn import pooling_fn_map, pooling_inverse_fn_map
+from .synapse_fn import synapse_fn_map, synapse_inverse_fn_map
+from .action_fn import action_fn_map, action_inverse_fn_map
+from .operator_fn import operator_fn_map
+from .parse_simple_sdb import extract_delay_number
+
+codec_fn_maps = {
+    'trigger': (trigger_fn_map, trigger_inverse_fn_map),
+    'pooling': (pooling_fn_map, pooling_inverse_fn_map),
+    'synapse': (synapse_fn_map, synapse_inverse_fn_map),
+    'action': (action_fn_map, action_inverse_fn_map),
+}
+
+# the kind of function passed in each argument of the structure change methods:
+fn_arg_kinds = {
+    'trigger_fn': 'trigger',
+    'pooling_fn': 'pooling',
+    'synapse_fn': 'synapse',
+    'synapse_fn_type': 'synapse',
+    'action_fn': 'action',
+    'synapse_action_type': 'action',
+}
+
+# the NeuralModule methods that notify structure listeners, and can be applied from a saved change:
+structure_change_ops = [
+    'set_default_layer', 'set_default_trigger', 'set_default_pooling', 'set_default_synapse', 'set_default_action',
+    'add_neuron', 'append_neuron_pattern', 'update_neuron_pooling', 'update_neuron_trigger',
+    'add_synapse', 'update_synapse_fn', 'update_synapse_action', 'add_synapse_alias',
+    'erase_neuron', 'erase_synapse', 'remove_neuron', 'apply_operator_all', 'set_neuron', 'set_synapse',
+]
+
+# mutable objects that can be used as parameters, and are shared between synapses:
+codec_object_types = {
+    'Buffer': Buffer,
+    'Counter': Counter,
+}
+
+class ObjectTable:
+    """Numbers the mutable objects used as parameters, such as buffers, so objects shared by several synapses stay shared once decoded.
+    Each encoded object carries its state at the time, and decoding an object updates the state of its decoded copy.
+    """
+    def __init__(self, next_number=0):
+        self.ids = {} # id(object) -> (object number, object)
+        self.objects = {} # object number -> decoded object
+        self.next_number = next_number # start above the numbers already saved, when adding to saved objects
+
+    def encode(self, value):
+        """Encode a mutable object."""
+        entry = self.ids.get(id(value))
+        if entry is None:
+            entry = (self.next_number, value) # keep a reference, so the id is not reused
+            self.ids[id(value)] = entry
+            self.next_number += 1
+        return {'$object': type(value).__name__, 'id': entry[0], 'state': copy.deepcopy(vars(value))}
+
+    def decode(self, value):
+        """Decode a mutable object, returning the same object for the same object number."""
+        number = value['id']
+        obj = self.objects.get(number)
+        if obj is None:
+            cls = codec_object_types.get(value['$object'])
+            if cls is None:
+                print(f"Unknown object type: {value['$object']}")
+                return None
+            obj = cls.__new__(cls)
+            self.objects[number] = obj
+            self.ids[id(obj)] = (number, obj) # so encoding it again keeps its number
+            self.next_number = max(self.next_number, number + 1)
+        obj.__dict__.update(copy.deepcopy(value['state']))
+        return obj
+
+def encode_fn(kind, fn):
+    """Encode a trigger, pooling, synapse or action function as its short name."""
+    if fn is None:
+        return None
+    name = codec_fn_maps[kind][1].get(fn.__name__)
+    if name is None:
+        print(f"Unregistered {kind} function: {fn.__name__}, see register_fn()")
+        return fn.__name__
+    return name
+
+def decode_fn(kind, name):
+    """Decode a short function name back into the function."""
+    if name is None:
+        return None
+    fn = codec_fn_maps[kind][0].get(name)
+    if fn is None:
+        print(f"Unknown {kind} function: {name}")
+    return fn
+
+def encode_param(value, NM, table):
+    """Encode a parameter value. The module itself is encoded as '$module', and buffers and counters using the object table."""
+    if value is NM:
+        return '$module'
+    if isinstance(value, str):
+        if value.startswith('$'): # escape strings that look like our markers
+            return {'$str': value}
+        return value
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple, deque)):
+        return [encode_param(elt, NM, table) for elt in value]
+    if isinstance(value, dict):
+        return {str(key): encode_param(elt, NM, table) for key, elt in value.items()}
+    if type(value).__name__ in codec_object_types:
+        return table.encode(value)
+    print(f"Unable to encode parameter: {value!r}")
+    return {'$unknown': repr(value)}
+
+def decode_param(value, NM, table):
+    """Decode a parameter value encoded by encode_param()."""
+    if value == '$module':
+        return NM
+    if isinstance(value, list):
+        return [decode_param(elt, NM, table) for elt in value]
+    if isinstance(value, dict):
+        if '$str' in value:
+            return value['$str']
+        if '$object' in value:
+            return table.decode(value)
+        if '$unknown' in value:
+            return None
+        return {key: decode_param(elt, NM, table) for key, elt in value.items()}
+    return value
+
+def encode_synapse(synapse, NM, table):
+    """Encode a synapse, without its spike history."""
+    return {
+        'name': synapse.name,
+        'axon': synapse.axon_name,
+        'layer': synapse.layer,
+        'synapse_fn': encode_fn('synapse', synapse.synapse_fn),
+        'params': encode_param(synapse.params, NM, table),
+        'action_fn': encode_fn('action', synapse.action_fn),
+        'action_params': encode_param(synapse.action_params, NM, table),
+    }
+
+def decode_synapse(synapse_dict, NM, table):
+    """Decode a synapse encoded by encode_synapse()."""
+    synapse = Synapse(synapse_dict['name'], synapse_dict['axon'], decode_fn('synapse', synapse_dict['synapse_fn']),
+        decode_param(synapse_dict['params'], NM, table), decode_fn('action', synapse_dict['action_fn']),
+        decode_param(synapse_dict['action_params'], NM, table))
+    synapse.set_layer(synapse_dict['layer'])
+    synapse.set_output_sink(NM.output_sink)
+    return synapse
+
+def encode_neuron(neuron):
+    """Encode a neuron, without its axon."""
+    return neuron.as_dict()
+
+def decode_neuron(neuron_dict):
+    """Decode a neuron encoded by encode_neuron()."""
+    return Neuron.from_dict(copy.deepcopy(neuron_dict)) # from_dict() consumes parts of its input
+
+def encode_change(NM, op, args, table):
+    """Encode a structure change, as passed to a structure listener, as a dictionary."""
+    encoded = {}
+    for key, value in args.items():
+        if key in fn_arg_kinds:
+            encoded[key] = encode_fn(fn_arg_kinds[key], value)
+        elif key == 'fn' and op.startswith('set_default_'):
+            encoded[key] = encode_fn(op[len('set_default_'):], value)
+        elif key == 'operator':
+            encoded[key] = value.__name__
+        elif key == 'neuron':
+            encoded[key] = encode_neuron(value)
+        elif key == 'synapse':
+            encoded[key] = encode_synapse(value, NM, table)
+        else:
+            encoded[key] = encode_param(value, NM, table)
+    return {'op': op, 'args': encoded}
+
+def apply_change(NM, change, table):
+    """Apply a structure change encoded by encode_change() to the module. Return True on success."""
+    op = change['op']
+    if op not in structure_change_ops:
+        print(f"Unknown structure change: {op}")
+        return False
+    args = {}
+    for key, value in change['args'].items():
+        if key in fn_arg_kinds:
+            args[key] = decode_fn(fn_arg_kinds[key], value)
+        elif key == 'fn' and op.startswith('set_default_'):
+            args[key] = decode_fn(op[len('set_default_'):], value)
+        elif key == 'operator':
+            args[key] = operator_fn_map.get(value)
+        elif key == 'neuron':
+            args[key] = decode_neuron(value)
+        elif key == 'synapse':
+            args[key] = decode_synapse(value, NM, table)
+        else:
+            args[key] = decode_param(value, NM, table)
+    try:
+        if op == 'set_neuron':
+            NM[args['name']] = args['neuron']
+        elif op == 'set_synapse':
+            NM[args['name']] = args['synapse']
+        else:
+            getattr(NM, op)(**args)
+    except Exception as e:
+        print(f"Unable to apply {op} to {NM.name}: {e!r}")
+        return False
+    return True
+
+def history_window(NM):
+    """Return how many of the most recent axon and spike history values the module can still read."""
+    window = NM.get_delay_counter() + 1 # action_store_buffer() reads back delay_counter steps
+    for synapse in list(NM.synapses.values()) + list(NM.new_synapses.values()):
+        for key in ['delay', 'width']:
+            value = synapse.params.get(key)
+            if isinstance(value, int) and value + 1 > window:
+                window = value + 1
+    for neuron in NM.neurons.values():
+        if not neuron.valid:
+            continue
+        for labels in neuron.pattern_labels.values():
+            for label in labels:
+                delay = extract_delay_number(label)
+                if delay is not None and delay + 1 > window:
+                    window = delay + 1
+    return window + 2 # some synapse functions compare the last two axon values
+
+def encode_defaults(NM, table):
+    """Encode the module defaults."""
+    defaults = {'layer': NM.default_layer}
+    for kind in ['trigger', 'pooling', 'synapse', 'action']:
+        defaults[kind] = [encode_fn(kind, getattr(NM, f"default_{kind}_fn")), encode_param(getattr(NM, f"default_{kind}_params"), NM, table)]
+    return defaults
+
+def encode_module(NM, table, window=None):
+    """Encode the structure of the module: defaults, neurons, synapses and aliases.
+    If window is not None, also encode its state, with the last window values of each axon and spike history, so it can be resumed.
+    Sources are encoded by their current values, since generators can't be saved.
+    """
+    state = {
+        'name': NM.name,
+        'defaults': encode_defaults(NM, table),
+        'neuron_name_index': NM.neuron_name_index,
+        'neurons': [encode_neuron(neuron) for neuron in NM.neurons.values() if neuron.valid],
+        'synapses': [encode_synapse(synapse, NM, table) for synapse in NM.synapses.values()],
+        'new_synapses': [encode_synapse(synapse, NM, table) for synapse in NM.new_synapses.values()],
+        'aliases': {destination: sorted(sources) for destination, sources in NM.synapse_alias_dict.items()},
+    }
+    if window is None:
+        return state
+    state['window'] = window
+    state['time_step'] = NM.time_step_counter
+    state['delay_counter'] = NM.delay_counter
+    state['axons'] = {name: [len(neuron.axon), neuron.last_activation, neuron.axon[-window:]] for name, neuron in NM.neurons.items() if neuron.valid}
+    state['spike_histories'] = {name: synapse.spike_history[-window:] for name, synapse in list(NM.synapses.items()) + list(NM.new_synapses.items())}
+    state['sources'] = encode_param(NM.current_sources_state, NM, table)
+    state['poked'] = sorted(NM.current_poked_neurons)
+    state['poke_buffer'] = encode_param(NM.poke_neuron_sequence_buffer, NM, table)
+    return state
+
+def decode_module(NM, state, table):
+    """Replace the structure, and state if present, of the module with that encoded by encode_module().
+    Axons and spike histories are restored with only their last window values. Structure listeners are not notified.
+    """
+    NM.neurons.clear()
+    NM.synapses.clear()
+    NM.new_synapses.clear()
+    NM.synapse_alias_dict.clear()
+    NM.latent_neurons.clear()
+    defaults = state['defaults']
+    NM.default_layer = defaults['layer']
+    for kind in ['trigger', 'pooling', 'synapse', 'action']:
+        fn_name, params = defaults[kind]
+        setattr(NM, f"default_{kind}_fn", decode_fn(kind, fn_name))
+        setattr(NM, f"default_{kind}_params", decode_param(params, NM, table))
+    NM.neuron_name_index = state['neuron_name_index']
+    for neuron_dict in state['neurons']:
+        neuron = decode_neuron(neuron_dict)
+        NM.neurons[neuron.name] = neuron
+    for synapse_dict in state['synapses']:
+        synapse = decode_synapse(synapse_dict, NM, table)
+        NM.synapses[synapse.name] = synapse
+    for synapse_dict in state['new_synapses']:
+        synapse = decode_synapse(synapse_dict, NM, table)
+        NM.new_synapses[synapse.name] = synapse
+    for destination, sources in state['aliases'].items():
+        NM.synapse_alias_dict[destination] = set(sources)
+    if 'window' in state:
+        NM.time_step_counter = state['time_step']
+        NM.delay_counter = state['delay_counter']
+        for name, (axon_len, last_activation, axon) in state['axons'].items():
+            neuron = NM.neurons.get(name)
+            if neuron is None:
+                continue
+            neuron.axon = list(axon)
+            neuron.last_activation = max(0, last_activation - (axon_len - len(axon))) # relative to the shortened axon
+        for name, spike_history in state['spike_histories'].items():
+            synapse = NM.synapses.get(name) or NM.new_synapses.get(name)
+            if synapse is not None:
+                synapse.spike_history = list(spike_history)
+        NM.current_sources_state.update(decode_param(state['sources'], NM, table))
+        NM.current_poked_neurons = set(state['poked'])
+        NM.poke_neuron_sequence_buffer = deque(decode_param(state['poke_buffer'], NM, table))
+    NM.reindex()
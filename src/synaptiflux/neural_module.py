@@ -1,17 +1,36 @@
 """Implement a neural module."""
 # Author: Garry Morrison
 # Created: 2024-9-18
-# Updated: 2024-11-14
+# Updated: 2026-10-19
 
 import json
+from time import perf_counter
 from collections import defaultdict, deque
 from .neuron import Neuron
+from .output_sink import default_output_sink
+from .sequence_store import SequenceStore
+from .profiler import Profiler
+from .similarity_index import SimilarityIndex
+from .memory_report import module_memory_report
+from .activation_tracker import ActivationTracker
 from .synapse import Synapse
 from .parse_simple_sdb import sp_dict_to_sp, parse_sf_if_then_machine, parse_seq, parse_sp, strip_delay, strip_synapse, extract_delay_number, list_to_sp
 from .trigger_fn import trigger_inverse_fn_map, trigger_fn_map, trigger_list_simm_threshold, trigger_list_min_simm_threshold
 from .pooling_fn import pooling_inverse_fn_map, pooling_fn_map, pooling_or
 from .synapse_fn import synapse_inverse_fn_map, synapse_fn_map, synapse_identity, synapse_delayed_identity
-from .action_fn import action_inverse_fn_map, action_fn_map, action_println, action_time_step_println, action_time_step_coeff_println, action_layer_time_step_coeff_println, action_layer_time_step_coeff_println_global_sequence
+from .action_fn import action_inverse_fn_map, action_fn_map, ACTION_NEVER, ACTION_POSITIVE, action_println, action_time_step_println, action_time_step_coeff_println, action_layer_time_step_coeff_println, action_layer_time_step_coeff_println_global_sequence
+
+duplicate_pattern_modes = ['allow', 'skip', 'merge']
+
+def pattern_key(seed_pattern, synapse_labels, trigger_fn, trigger_params):
+    """Return a hashable canonical form of a neuron pattern, so patterns that differ only in label order have the same key."""
+    try:
+        pairs = tuple(sorted(zip(synapse_labels, seed_pattern)))
+    except TypeError:
+        pairs = tuple(sorted((label, repr(coeff)) for label, coeff in zip(synapse_labels, seed_pattern)))
+    fn_name = trigger_fn.__name__ if trigger_fn is not None else None
+    params = tuple(sorted((key, repr(value)) for key, value in trigger_params.items()))
+    return (pairs, fn_name, params)
 
 def process_layers(synapses, layers):
     """Given a synapses dict, and layers, return valid layers.
@@ -63,7 +82,14 @@ class NeuralModule:
         self.poke_neuron_sequence_buffer = deque()
         self.new_synapses = {} # rename to latent_synapses?
         self.synapses = {}
+        self.structure_version = 0 # incremented when neurons, synapses, aliases or sources change, so cached lookups can be invalidated
         self.synapse_alias_dict = defaultdict(set)
+        self.synapse_alias_reverse_dict = defaultdict(set) # source synapse name -> the alias names that rewrite to it
+        self.neuron_synapses = defaultdict(set) # axon neuron name -> names of the synapses on that axon
+        self.synapse_consumers = defaultdict(set) # synapse label or alias name -> (neuron name, pattern number) pairs that read it
+        self.pattern_index = defaultdict(set) # canonical pattern key -> (neuron name, pattern number) pairs with that exact pattern
+        self.duplicate_patterns = 'allow' # what to do with exact duplicate patterns, one of: 'allow', 'skip', 'merge'
+        self.similarity_index = None # built on the first similarity query
         self.default_layer = 0
         self.default_trigger_fn = None
         self.default_trigger_params = {}
@@ -73,14 +99,33 @@ class NeuralModule:
         self.default_synapse_params = {}
         self.default_action_fn = None
         self.default_action_params = {}
-        self.global_sequences = defaultdict(lambda: defaultdict(list))
+        self.global_sequences = SequenceStore()
+        self.output_sink = default_output_sink
+        self.output_flush_interval = 1
+        self.profiler = None
+        self.profile_steps = True
+        self.capacity_tracker = None
+        self.activation_tracker = None # keeps neurons ordered by activation count, see enable_activation_tracking()
+        self.structure_listeners = [] # functions of (NM, op, args), called after each structural change, see notify_structure_change()
+        self.recorder = None
 
     def __setitem__(self, key, value):
         """Add a neuron or synapse to the module."""
         if isinstance(value, Neuron):
+            self.unindex_neuron(key)
             self.neurons[key] = value
+            self.index_neuron(key)
+            self.structure_version += 1
+            if self.structure_listeners:
+                self.notify_structure_change('set_neuron', {'name': key, 'neuron': value})
         elif isinstance(value, Synapse):
+            value.set_output_sink(self.output_sink)
+            self.unindex_synapse(key)
             self.synapses[key] = value
+            self.neuron_synapses[value.axon_name].add(key)
+            self.structure_version += 1
+            if self.structure_listeners:
+                self.notify_structure_change('set_synapse', {'name': key, 'synapse': value})
         else:
             raise TypeError(f"Value must be either a Neuron or Synapse, not type: {type(value).__name__}")
 
@@ -166,6 +211,8 @@ class NeuralModule:
     def set_default_layer(self, n):
         """Set the default layer."""
         self.default_layer = n
+        if self.structure_listeners:
+            self.notify_structure_change('set_default_layer', {'n': n})
 
     def get_default_layer(self):
         """Get the default layer."""
@@ -175,61 +222,130 @@ class NeuralModule:
         """Set the default trigger."""
         self.default_trigger_fn = fn
         self.default_trigger_params = params
+        if self.structure_listeners:
+            self.notify_structure_change('set_default_trigger', {'fn': fn, 'params': params})
 
     def set_default_pooling(self, fn, params):
         """Set the default pooling."""
         self.default_pooling_fn = fn
         self.default_pooling_params = params
+        if self.structure_listeners:
+            self.notify_structure_change('set_default_pooling', {'fn': fn, 'params': params})
 
     def set_default_synapse(self, fn, params):
         """Set the default synapse."""
         self.default_synapse_fn = fn
         self.default_synapse_params = params
+        if self.structure_listeners:
+            self.notify_structure_change('set_default_synapse', {'fn': fn, 'params': params})
 
     def set_default_action(self, fn, params):
         """Set the default action."""
         self.default_action_fn = fn
         self.default_action_params = params
+        if self.structure_listeners:
+            self.notify_structure_change('set_default_action', {'fn': fn, 'params': params})
+
+    def set_output_sink(self, sink, flush_interval=None):
+        """Set the output sink used by the print actions of all our synapses.
+
+        If flush_interval is given, the sink is flushed every flush_interval time steps, and at the end of update_system().
+        flush_interval == 0 means only flush at the end of update_system().
+        """
+        self.output_sink.flush()
+        self.output_sink = sink
+        if flush_interval is not None:
+            self.output_flush_interval = flush_interval
+        for synapse in self.synapses.values():
+            synapse.set_output_sink(sink)
+        for synapse in self.new_synapses.values():
+            synapse.set_output_sink(sink)
+
+    def get_output_sink(self):
+        """Return the output sink used by our print actions."""
+        return self.output_sink
+
+    def set_output_flush_interval(self, n):
+        """Set how many time steps between flushes of the output sink."""
+        self.output_flush_interval = n
+
+    def flush_output(self):
+        """Flush the output sink."""
+        self.output_sink.flush()
 
     def add_source(self, name, source_fn):
         """Add a source to our system."""
         self.sources[name] = source_fn
         self.current_sources_state[name] = next(self.sources[name])
+        self.structure_version += 1
 
     def add_neuron(self, name, layer, seed_pattern, synapse_labels, trigger_fn, trigger_params, pooling_fn, pooling_params):
         """Add a neuron to our system."""
         neuron = Neuron(name, layer, seed_pattern, synapse_labels, trigger_fn, trigger_params, pooling_fn, pooling_params)
+        self.unindex_neuron(name)
         self.neurons[name] = neuron
+        self.index_neuron(name)
+        self.structure_version += 1
+        if self.structure_listeners:
+            self.notify_structure_change('add_neuron', {'name': name, 'layer': layer, 'seed_pattern': seed_pattern, 'synapse_labels': synapse_labels,
+                'trigger_fn': trigger_fn, 'trigger_params': trigger_params, 'pooling_fn': pooling_fn, 'pooling_params': pooling_params})
 
     # append_pattern(self, seed_pattern, synapse_labels, trigger_fn, trigger_params)
     def append_neuron_pattern(self, name, seed_pattern, synapse_labels, trigger_fn, trigger_params):
         """Append a pattern to an existing neuron in our system."""
         if name not in self.neurons:
             return
+        if self.is_duplicate_pattern(name, seed_pattern, synapse_labels, trigger_fn, trigger_params):
+            return
         self.neurons[name].append_pattern(seed_pattern, synapse_labels, trigger_fn, trigger_params)
+        self.index_neuron_pattern(name, self.neurons[name].pattern_count - 1)
+        self.structure_version += 1
+        if self.structure_listeners:
+            self.notify_structure_change('append_neuron_pattern', {'name': name, 'seed_pattern': seed_pattern, 'synapse_labels': synapse_labels,
+                'trigger_fn': trigger_fn, 'trigger_params': trigger_params})
 
     def add_default_neuron(self, name, layer, seed_pattern, synapse_labels):
         """Add a default neuron to our system."""
         neuron = Neuron(name, layer, seed_pattern, synapse_labels, self.default_trigger_fn, self.default_trigger_params, self.default_pooling_fn, self.default_pooling_params)
+        self.unindex_neuron(name)
         self.neurons[name] = neuron
+        self.index_neuron(name)
+        self.structure_version += 1
+        if self.structure_listeners: # recorded with the defaults filled in
+            self.notify_structure_change('add_neuron', {'name': name, 'layer': layer, 'seed_pattern': seed_pattern, 'synapse_labels': synapse_labels,
+                'trigger_fn': self.default_trigger_fn, 'trigger_params': self.default_trigger_params,
+                'pooling_fn': self.default_pooling_fn, 'pooling_params': self.default_pooling_params})
 
     def append_default_neuron_pattern(self, name, seed_pattern, synapse_labels):
         """Append a default pattern to an existing neuron in our system."""
         if name not in self.neurons:
             return
+        if self.is_duplicate_pattern(name, seed_pattern, synapse_labels, self.default_trigger_fn, self.default_trigger_params):
+            return
         self.neurons[name].append_pattern(seed_pattern, synapse_labels, self.default_trigger_fn, self.default_trigger_params)
+        self.index_neuron_pattern(name, self.neurons[name].pattern_count - 1)
+        self.structure_version += 1
+        if self.structure_listeners:
+            self.notify_structure_change('append_neuron_pattern', {'name': name, 'seed_pattern': seed_pattern, 'synapse_labels': synapse_labels,
+                'trigger_fn': self.default_trigger_fn, 'trigger_params': self.default_trigger_params})
 
     def update_neuron_pooling(self, name, pooling_fn, pooling_params):
         """Update the pooling function for a neuron."""
         if name not in self.neurons:
             return
         self.neurons[name].update_pooling(pooling_fn, pooling_params)
+        self.structure_version += 1
+        if self.structure_listeners:
+            self.notify_structure_change('update_neuron_pooling', {'name': name, 'pooling_fn': pooling_fn, 'pooling_params': pooling_params})
 
     def update_neuron_trigger(self, name, pattern_no, trigger_fn, trigger_params):
         """Update the trigger function for a neuron's pattern."""
         if name not in self.neurons:
             return
         self.neurons[name].update_trigger(pattern_no, trigger_fn, trigger_params)
+        self.structure_version += 1
+        if self.structure_listeners:
+            self.notify_structure_change('update_neuron_trigger', {'name': name, 'pattern_no': pattern_no, 'trigger_fn': trigger_fn, 'trigger_params': trigger_params})
 
     def add_latent_neuron_layer(self, name, layer):
         """Add a latent neuron's layer number."""
@@ -277,7 +393,7 @@ class NeuralModule:
             if 'trigger_fn' in self.latent_neurons[name]:
                 trigger_fn = self.latent_neurons[name]['trigger_fn']
             else:
-                trigger_fn = self.default_pooling_fn
+                trigger_fn = self.default_trigger_fn
             if 'trigger_params' in self.latent_neurons[name]:
                 trigger_params = self.latent_neurons[name]['trigger_params']
             else:
@@ -297,25 +413,197 @@ class NeuralModule:
     def add_synapse_alias(self, source_synapse_name, destination_synapse_name):
         """Add a synapse alias, where source synapses rewrite to destination synapses."""
         self.synapse_alias_dict[destination_synapse_name].add(source_synapse_name)
+        self.synapse_alias_reverse_dict[source_synapse_name].add(destination_synapse_name)
+        self.structure_version += 1
+        if self.structure_listeners:
+            self.notify_structure_change('add_synapse_alias', {'source_synapse_name': source_synapse_name, 'destination_synapse_name': destination_synapse_name})
+
+    def add_structure_listener(self, listener):
+        """Add a function of (NM, op, args), called after each structural change to the module.
+        op is the name of the NeuralModule method that made the change, and args its arguments, with defaults filled in.
+        """
+        if listener not in self.structure_listeners:
+            self.structure_listeners.append(listener)
+
+    def remove_structure_listener(self, listener):
+        """Remove a structure listener."""
+        if listener in self.structure_listeners:
+            self.structure_listeners.remove(listener)
+
+    def notify_structure_change(self, op, args):
+        """Pass a structural change on to the structure listeners."""
+        for listener in self.structure_listeners:
+            listener(self, op, args)
+
+    def set_recorder(self, recorder):
+        """Set the recorder that is told about the start and end of each time step, or None. See Recorder.attach()."""
+        self.recorder = recorder
+
+    def get_recorder(self):
+        """Return the recorder, or None."""
+        return self.recorder
+
+    def pattern_label_keys(self, label):
+        """Return the keys a pattern label is indexed under, the label itself, and the label with any delay stripped."""
+        try:
+            key, delay_str = label.rsplit(" D", 1)
+            int(delay_str)
+            return (label, key)
+        except ValueError:
+            return (label,)
+
+    def index_neuron_pattern(self, name, pattern_no):
+        """Add a single neuron pattern to the synapse consumer index."""
+        neuron = self.neurons.get(name)
+        if neuron is None or not neuron.valid or pattern_no not in neuron.pattern_labels:
+            return
+        for label in neuron.pattern_labels[pattern_no]:
+            for key in self.pattern_label_keys(label):
+                self.synapse_consumers[key].add((name, pattern_no))
+        key = pattern_key(neuron.pattern[pattern_no], neuron.pattern_labels[pattern_no], neuron.trigger_fn[pattern_no], neuron.trigger_params[pattern_no])
+        self.pattern_index[key].add((name, pattern_no))
+        if self.similarity_index is not None:
+            self.similarity_index.add_pattern(name, pattern_no, neuron.pattern[pattern_no], neuron.pattern_labels[pattern_no])
+
+    def index_neuron(self, name):
+        """Add all of a neuron's patterns to the synapse consumer index."""
+        neuron = self.neurons.get(name)
+        if neuron is None or not neuron.valid:
+            return
+        for pattern_no in neuron.pattern_labels:
+            self.index_neuron_pattern(name, pattern_no)
+        if self.activation_tracker is not None:
+            self.activation_tracker.track(name, neuron.activation_count)
+
+    def unindex_neuron(self, name):
+        """Remove all of a neuron's patterns from the synapse consumer index."""
+        neuron = self.neurons.get(name)
+        if neuron is None or not neuron.valid:
+            return
+        if self.similarity_index is not None:
+            self.similarity_index.remove_neuron(name)
+        if self.activation_tracker is not None:
+            self.activation_tracker.untrack(name)
+        for pattern_no, labels in neuron.pattern_labels.items():
+            for label in labels:
+                for key in self.pattern_label_keys(label):
+                    consumers = self.synapse_consumers.get(key)
+                    if consumers is None:
+                        continue
+                    consumers.discard((name, pattern_no))
+                    if len(consumers) == 0:
+                        del self.synapse_consumers[key]
+            key = pattern_key(neuron.pattern[pattern_no], labels, neuron.trigger_fn[pattern_no], neuron.trigger_params[pattern_no])
+            owners = self.pattern_index.get(key)
+            if owners is not None:
+                owners.discard((name, pattern_no))
+                if len(owners) == 0:
+                    del self.pattern_index[key]
+
+    def unindex_synapse(self, name):
+        """Remove a synapse from the neuron synapses index."""
+        synapse = self.synapses.get(name)
+        if synapse is None:
+            return
+        synapses = self.neuron_synapses.get(synapse.axon_name)
+        if synapses is None:
+            return
+        synapses.discard(name)
+        if len(synapses) == 0:
+            del self.neuron_synapses[synapse.axon_name]
+
+    def reindex(self):
+        """Rebuild the neuron, synapse and alias indexes from scratch.
+        Only needed if neuron patterns, or the alias dictionary, were changed directly rather than through the module.
+        """
+        self.neuron_synapses.clear()
+        self.synapse_consumers.clear()
+        self.pattern_index.clear()
+        if self.similarity_index is not None:
+            self.similarity_index = SimilarityIndex()
+        if self.activation_tracker is not None:
+            self.activation_tracker.clear()
+        self.synapse_alias_reverse_dict.clear()
+        for name in self.neurons:
+            self.index_neuron(name)
+        for name, synapse in self.synapses.items():
+            self.neuron_synapses[synapse.axon_name].add(name)
+        for destination, sources in self.synapse_alias_dict.items():
+            for source in sources:
+                self.synapse_alias_reverse_dict[source].add(destination)
+        self.structure_version += 1
+
+    def set_duplicate_patterns(self, mode):
+        """Set what happens when an exact duplicate pattern is appended to a neuron, or learned by action_store_buffer().
+        'allow': add it anyway, the default.
+        'skip': don't add it.
+        'merge': don't add it, and count it as an activation of the neuron that already has it.
+        """
+        if mode not in duplicate_pattern_modes:
+            print(f"Unknown duplicate pattern mode: {mode}")
+            return
+        self.duplicate_patterns = mode
+
+    def find_duplicate_pattern(self, seed_pattern, synapse_labels, trigger_fn, trigger_params, name=None):
+        """Return the name of a neuron that already has exactly this pattern, restricted to the given neuron name if not None."""
+        owners = self.pattern_index.get(pattern_key(seed_pattern, synapse_labels, trigger_fn, trigger_params))
+        if owners is None:
+            return None
+        for owner, _ in owners:
+            if name is None or owner == name:
+                return owner
+        return None
+
+    def is_duplicate_pattern(self, name, seed_pattern, synapse_labels, trigger_fn, trigger_params):
+        """Return True if the pattern should not be added, because of our duplicate pattern mode."""
+        if self.duplicate_patterns == 'allow':
+            return False
+        owner = self.find_duplicate_pattern(seed_pattern, synapse_labels, trigger_fn, trigger_params, name)
+        if owner is None:
+            return False
+        if self.duplicate_patterns == 'merge':
+            self.neurons[owner].increment_activation_count()
+            if self.activation_tracker is not None:
+                self.activation_tracker.record(owner, self.neurons[owner].activation_count, self.time_step_counter)
+        return True
+
+    def get_neuron_synapses(self, name):
+        """Return the set of synapse names on the given neuron's axon."""
+        return set(self.neuron_synapses.get(name, ()))
+
+    def get_synapse_consumers(self, name):
+        """Return the set of (neuron name, pattern number) pairs that read the given synapse, directly or via an alias."""
+        consumers = set(self.synapse_consumers.get(name, ()))
+        for destination in self.synapse_alias_reverse_dict.get(name, ()):
+            consumers.update(self.synapse_consumers.get(destination, ()))
+        return consumers
 
     def add_synapse(self, name, axon_name, synapse_fn_type, params, synapse_action_type, action_params):
         """Add a synapse to our system."""
         synapse = Synapse(name, axon_name, synapse_fn_type, params, synapse_action_type, action_params)
+        synapse.set_output_sink(self.output_sink)
         if axon_name in self.neurons:
            layer = self.neurons[axon_name].get_layer()
            synapse.set_layer(layer)
         # self.synapses[name] = synapse
         self.new_synapses[name] = synapse # does this break anything?
+        if self.structure_listeners:
+            self.notify_structure_change('add_synapse', {'name': name, 'axon_name': axon_name, 'synapse_fn_type': synapse_fn_type, 'params': params,
+                'synapse_action_type': synapse_action_type, 'action_params': action_params})
         self.add_synapse_alias(name, name)
 
     def add_default_synapse(self, name, axon_name):
         """Add a default synapse to our system."""
         synapse = Synapse(name, axon_name, self.default_synapse_fn, self.default_synapse_params, self.default_action_fn, self.default_action_params)
+        synapse.set_output_sink(self.output_sink)
         if axon_name in self.neurons:
            layer = self.neurons[axon_name].get_layer()
            synapse.set_layer(layer)
         # self.synapses[name] = synapse
         self.new_synapses[name] = synapse
+        if self.structure_listeners:
+            self.notify_structure_change('add_synapse', {'name': name, 'axon_name': axon_name, 'synapse_fn_type': self.default_synapse_fn,
+                'params': self.default_synapse_params, 'synapse_action_type': self.default_action_fn, 'action_params': self.default_action_params})
         self.add_synapse_alias(name, name)
 
     def update_synapse_fn(self, name, synapse_fn, synapse_params):
@@ -323,16 +611,25 @@ class NeuralModule:
         if name not in self.synapses:
             if name in self.new_synapses:
                 self.new_synapses[name].update_fn(synapse_fn, synapse_params)
+                if self.structure_listeners:
+                    self.notify_structure_change('update_synapse_fn', {'name': name, 'synapse_fn': synapse_fn, 'synapse_params': synapse_params})
                 return
         self.synapses[name].update_fn(synapse_fn, synapse_params)
+        self.structure_version += 1
+        if self.structure_listeners:
+            self.notify_structure_change('update_synapse_fn', {'name': name, 'synapse_fn': synapse_fn, 'synapse_params': synapse_params})
 
     def update_synapse_action(self, name, action_fn, action_params):
         """Update the synapse action for a synapse."""
         if name not in self.synapses:
             if name in self.new_synapses:
                 self.new_synapses[name].update_action(action_fn, action_params)
+                if self.structure_listeners:
+                    self.notify_structure_change('update_synapse_action', {'name': name, 'action_fn': action_fn, 'action_params': action_params})
                 return
         self.synapses[name].update_action(action_fn, action_params)
+        if self.structure_listeners:
+            self.notify_structure_change('update_synapse_action', {'name': name, 'action_fn': action_fn, 'action_params': action_params})
 
     def test_source(self, name, steps):
         """Test a given source."""
@@ -347,6 +644,9 @@ class NeuralModule:
 
     def update_neurons(self):
         """Update our neurons."""
+        if self.activation_tracker is not None:
+            self.update_neurons_tracked()
+            return
         for label, neuron in self.neurons.items(): # update_axon(self, current_sources, synapses)
             poked = False
             if label in self.current_poked_neurons:
@@ -354,21 +654,58 @@ class NeuralModule:
             neuron.update_axon(self.current_sources_state, self.synapses, poked, self.synapse_alias_dict)
         self.current_poked_neurons.clear()
 
+    def update_neurons_tracked(self):
+        """Update our neurons, and move those that fired up the activation tracker."""
+        tracker = self.activation_tracker
+        time_step = self.time_step_counter
+        for label, neuron in self.neurons.items():
+            if not neuron.valid:
+                neuron.update_axon(self.current_sources_state, self.synapses, False, self.synapse_alias_dict)
+                continue
+            count = neuron.activation_count
+            neuron.update_axon(self.current_sources_state, self.synapses, label in self.current_poked_neurons, self.synapse_alias_dict)
+            if neuron.activation_count != count:
+                tracker.record(label, neuron.activation_count, time_step)
+        self.current_poked_neurons.clear()
+
     def patch_in_new_synapses(self):
         """Patch in new synapses."""
+        if len(self.new_synapses) == 0:
+            return
         spike_history_len = 0
         for label, synapse in self.synapses.items():
             spike_history_len = synapse.get_spike_history_len()
             break
         for label, synapse in self.new_synapses.items(): # patch in the new synapses:
             synapse.set_spike_history([0]*spike_history_len)
+            self.unindex_synapse(label)
             self.synapses[label] = synapse
+            self.neuron_synapses[synapse.axon_name].add(label)
         self.new_synapses.clear()
+        self.structure_version += 1
 
     def update_synapses(self):
-        """Update our synapses."""
-        for label, synapse in self.synapses.items(): # update_spike_history(self, neurons)
-            synapse.update_spike_history(self.neurons)
+        """Update our synapses, and invoke the actions of those that fired.
+
+        Actions that never do anything, or only act when value > 0, are skipped when they can't fire.
+        Runs of consecutive print actions are rendered, and then written to the output sink in one go.
+        """
+        rendered = []
+        for label, synapse in self.synapses.items():
+            value = synapse.update_spike_value(self.neurons)
+            mode = synapse.action_mode
+            if mode == ACTION_NEVER or (mode == ACTION_POSITIVE and value <= 0):
+                continue
+            render_fn = synapse.action_render_fn
+            if render_fn is not None:
+                rendered.append(render_fn(synapse, value, **synapse.action_params))
+                continue
+            if rendered: # write pending output first, to preserve the print order
+                self.output_sink.write(''.join(rendered))
+                rendered.clear()
+            synapse.action_fn(synapse, value, **synapse.action_params)
+        if rendered:
+            self.output_sink.write(''.join(rendered))
 
 #     def poke_neuron(self, name): # shift below update_system?
 #         """Poke a single neuron."""
@@ -452,14 +789,116 @@ class NeuralModule:
 
     def update_system(self, steps):
         """Update our system."""
+        if self.profiler is not None:
+            self.update_system_profiled(steps)
+            return
         for _ in range(steps):
+            if self.recorder is not None:
+                self.recorder.begin_step(self)
             self.patch_in_new_synapses()
+            self.enforce_capacity()
             self.update_poked_neuron_set()
             self.update_neurons()
             self.update_synapses()
             self.update_sources()
             self.increment_time_step()
             self.increment_delay_counter() # here or at the start of this sequence of methods?
+            if self.output_flush_interval > 0 and self.time_step_counter % self.output_flush_interval == 0:
+                self.output_sink.flush()
+            if self.recorder is not None:
+                self.recorder.end_step(self)
+        self.output_sink.flush()
+
+    def enable_profiling(self, profiler=None, record_steps=True):
+        """Enable profiling of update_system(), and return the profiler.
+        Set record_steps to False if step latencies are recorded elsewhere, eg, by a neural system sharing the profiler.
+        """
+        if profiler is None:
+            profiler = Profiler()
+        self.profiler = profiler
+        self.profile_steps = record_steps
+        return profiler
+
+    def disable_profiling(self):
+        """Disable profiling of update_system()."""
+        self.profiler = None
+
+    def get_profiler(self):
+        """Return the current profiler, or None if profiling is disabled."""
+        return self.profiler
+
+    def enable_activation_tracking(self, half_life=None):
+        """Start keeping our neurons ordered by activation count, and return the ActivationTracker.
+        If half_life is given, decayed activation rates are kept too, see prune_by_rate().
+        """
+        self.activation_tracker = ActivationTracker(self, half_life)
+        self.activation_tracker.rebuild()
+        return self.activation_tracker
+
+    def disable_activation_tracking(self):
+        """Stop tracking activation counts."""
+        self.activation_tracker = None
+
+    def get_activation_tracker(self):
+        """Return the activation tracker, or None if activation tracking is disabled."""
+        return self.activation_tracker
+
+    def update_neurons_profiled(self):
+        """Update our neurons, recording the cost of each neuron."""
+        profiler = self.profiler
+        tracker = self.activation_tracker
+        for label, neuron in self.neurons.items():
+            poked = label in self.current_poked_neurons
+            count = neuron.activation_count if neuron.valid else 0
+            start = perf_counter()
+            neuron.update_axon(self.current_sources_state, self.synapses, poked, self.synapse_alias_dict)
+            profiler.record_neuron(f"{self.name}: {label}", perf_counter() - start)
+            if tracker is not None and neuron.valid and neuron.activation_count != count:
+                tracker.record(label, neuron.activation_count, self.time_step_counter)
+        self.current_poked_neurons.clear()
+
+    def update_synapses_profiled(self):
+        """Update our synapses, recording the cost of each synapse and its action."""
+        profiler = self.profiler
+        for label, synapse in self.synapses.items():
+            start = perf_counter()
+            synapse.update_spike_history(self.neurons)
+            profiler.record_synapse(f"{self.name}: {label}", perf_counter() - start)
+
+    def update_system_profiled(self, steps):
+        """Update our system, recording the time spent in each phase."""
+        profiler = self.profiler
+        if profiler.track_entities:
+            update_neurons = self.update_neurons_profiled
+            update_synapses = self.update_synapses_profiled
+        else:
+            update_neurons = self.update_neurons
+            update_synapses = self.update_synapses
+        phases = [
+            ('patch_in_new_synapses', self.patch_in_new_synapses),
+            ('enforce_capacity', self.enforce_capacity),
+            ('update_poked_neuron_set', self.update_poked_neuron_set),
+            ('update_neurons', update_neurons),
+            ('update_synapses', update_synapses),
+            ('update_sources', self.update_sources),
+        ]
+        for _ in range(steps):
+            step_start = perf_counter()
+            if self.recorder is not None:
+                self.recorder.begin_step(self)
+            for phase, fn in phases:
+                start = perf_counter()
+                fn()
+                profiler.record_phase(phase, perf_counter() - start)
+            self.increment_time_step()
+            self.increment_delay_counter()
+            if self.output_flush_interval > 0 and self.time_step_counter % self.output_flush_interval == 0:
+                self.output_sink.flush()
+            if self.recorder is not None:
+                self.recorder.end_step(self)
+            if self.profile_steps:
+                profiler.record_step(perf_counter() - step_start)
+        self.output_sink.flush()
 
     def get_test_neurons(self, pattern):
         """Given a pattern, return a sorted list of neuron names that are triggered by that pattern."""
@@ -473,8 +912,147 @@ class NeuralModule:
                 neurons.add(name)
         return sorted(neurons)
 
+    def select_patterns(self, selector=None):
+        """Return a list of (neuron name, pattern numbers) for the patterns matching the selector.
+        selector is None for all patterns, a function f(name, neuron, pattern_no) returning True or False,
+        or a dictionary with any of the keys:
+            'layers': a layer number or list of layer numbers
+            'prefix': a neuron name prefix
+            'trigger': a trigger function, or its short name, eg 'simm'
+            'patterns': a list of (neuron name, pattern numbers) pairs
+        """
+        layers = None
+        prefix = None
+        trigger_name = None
+        select_fn = None
+        chosen = None
+        if callable(selector):
+            select_fn = selector
+        elif selector is not None:
+            layers = selector.get('layers')
+            if isinstance(layers, int):
+                layers = [layers]
+            if layers is not None:
+                layers = set(layers)
+            prefix = selector.get('prefix')
+            trigger = selector.get('trigger')
+            if isinstance(trigger, str):
+                trigger = trigger_fn_map.get(trigger)
+                if trigger is None:
+                    print(f"Unknown trigger: {selector.get('trigger')}")
+                    return []
+            if trigger is not None:
+                trigger_name = trigger.__name__
+            if 'patterns' in selector:
+                chosen = {name: set(pattern_numbers) for name, pattern_numbers in selector['patterns']}
+        selected = []
+        for name, neuron in self.neurons.items():
+            if not neuron.valid:
+                continue
+            if layers is not None and neuron.layer not in layers:
+                continue
+            if prefix is not None and not name.startswith(prefix):
+                continue
+            if chosen is not None and name not in chosen:
+                continue
+            pattern_numbers = []
+            for pattern_no in range(neuron.pattern_count):
+                if chosen is not None and pattern_no not in chosen[name]:
+                    continue
+                if trigger_name is not None and neuron.trigger_fn[pattern_no].__name__ != trigger_name:
+                    continue
+                if select_fn is not None and not select_fn(name, neuron, pattern_no):
+                    continue
+                pattern_numbers.append(pattern_no)
+            if pattern_numbers:
+                selected.append((name, pattern_numbers))
+        return selected
+
+    def apply_operator_all(self, operator, params, selector=None):
+        """Apply the operator with params to every selected pattern in the module, and return the number of patterns changed.
+        See select_patterns() for the selector. operator_clean, operator_normalize, operator_rescale and operator_drop_below
+        are applied in a single specialised pass, other operators one pattern at a time.
+        The module indexes are updated in place, and the synapse consumer index only for patterns whose labels changed.
+        """
+        selected = self.select_patterns(selector)
+        fn_name = operator.__name__
+        t = params.get('t', 1)
+        threshold = params.get('threshold')
+        pattern_index = self.pattern_index
+        synapse_consumers = self.synapse_consumers
+        count = 0
+        for name, pattern_numbers in selected:
+            neuron = self.neurons[name]
+            patterns = neuron.pattern
+            pattern_labels = neuron.pattern_labels
+            for k in pattern_numbers:
+                coeffs = patterns[k]
+                labels = pattern_labels[k]
+                old_key = pattern_key(coeffs, labels, neuron.trigger_fn[k], neuron.trigger_params[k])
+                if fn_name == 'operator_clean':
+                    patterns[k] = [1] * len(coeffs)
+                elif fn_name == 'operator_normalize':
+                    coeff_sum = sum(coeffs)
+                    if coeff_sum != 0:
+                        patterns[k] = [elt * t / coeff_sum for elt in coeffs]
+                elif fn_name == 'operator_rescale':
+                    coeff_max = max(coeffs) if coeffs else 0
+                    if coeff_max != 0:
+                        patterns[k] = [elt * t / coeff_max for elt in coeffs]
+                elif fn_name == 'operator_drop_below':
+                    patterns[k] = [v for v in coeffs if v >= threshold]
+                    if len(patterns[k]) != len(coeffs):
+                        pattern_labels[k] = [l for v, l in zip(coeffs, labels) if v >= threshold]
+                else:
+                    patterns[k], pattern_labels[k] = operator(coeffs, labels, **params)
+                count += 1
+                owner = (name, k)
+                owners = pattern_index.get(old_key)
+                if owners is not None:
+                    owners.discard(owner)
+                    if len(owners) == 0:
+                        del pattern_index[old_key]
+                new_labels = pattern_labels[k]
+                pattern_index[pattern_key(patterns[k], new_labels, neuron.trigger_fn[k], neuron.trigger_params[k])].add(owner)
+                if new_labels is not labels:
+                    new_keys = {key for label in new_labels for key in self.pattern_label_keys(label)}
+                    for label in labels:
+                        for key in self.pattern_label_keys(label):
+                            if key not in new_keys and key in synapse_consumers:
+                                consumers = synapse_consumers[key]
+                                consumers.discard(owner)
+                                if len(consumers) == 0:
+                                    del synapse_consumers[key]
+                    for key in new_keys:
+                        synapse_consumers[key].add(owner)
+                if self.similarity_index is not None:
+                    self.similarity_index.add_pattern(name, k, patterns[k], new_labels)
+        if count > 0:
+            self.structure_version += 1
+            if self.structure_listeners:
+                self.notify_structure_change('apply_operator_all', {'operator': operator, 'params': params, 'selector': {'patterns': selected}})
+        return count
+
+    def get_similar_neurons(self, query, k=10, threshold=0.0, measure='simm'):
+        """Return up to k (neuron name, score) pairs, for the neurons whose patterns are most similar to the query.
+        The query is a superposition string, a dictionary of label -> coefficient, or a list of labels.
+        The measure is either 'simm' or 'dot_product'.
+        """
+        if self.similarity_index is None:
+            self.similarity_index = SimilarityIndex()
+            self.similarity_index.build(self.neurons)
+        return self.similarity_index.query(query, k, threshold, measure)
+
+    def memory_report(self, top_n=10, sample=None):
+        """Return a MemoryReport of the bytes used by our neurons, synapses, histories, indexes and buffers.
+        With sample, eg 16, long axons and spike histories are sampled, so it is cheap enough to call during a run.
+        """
+        return module_memory_report(self, top_n, sample)
+
     def activation_report(self, activation_threshold):
         """Return an activation report as a string."""
+        if self.activation_tracker is not None:
+            return self.activation_tracker.activation_report(activation_threshold)
         # Build the dictionary
         # activation_neuron_dict = {} # maybe defaultdict instead?
         activation_neuron_dict = defaultdict(list)
@@ -492,28 +1070,91 @@ class NeuralModule:
 
     def prune(self, activation_threshold):
         """Prune all neurons with activation less than the given threshold, and corresponding synapses."""
+        if self.activation_tracker is not None:
+            self.prune_neurons(self.activation_tracker.below(activation_threshold))
+            return
         prune_neuron_set = set()
         for name, neuron in self.neurons.items():
             if neuron.get_activation_count() < activation_threshold:
                 prune_neuron_set.add(name)
-        for name in prune_neuron_set:
-                self.erase_neuron(name)
-        prune_synapse_set = set()
-        for label, synapse in self.synapses.items():
-            if synapse.axon_name in prune_neuron_set:
-                prune_synapse_set.add(label)
-        for label in prune_synapse_set:
-            self.erase_synapse(label)
+        self.prune_neurons(prune_neuron_set)
+
+    def prune_by_rate(self, rate_threshold):
+        """Prune all neurons with decayed activation rate less than the given threshold, and corresponding synapses.
+        Needs activation tracking with a half life, see enable_activation_tracking().
+        """
+        tracker = self.activation_tracker
+        if tracker is None or tracker.half_life is None:
+            print(f"Unable to prune {self.name} by rate, activation tracking with a half life is not enabled.")
+            return
+        self.prune_neurons(tracker.below_rate(rate_threshold))
+
+    def prune_neurons(self, names):
+        """Erase the given neurons, and the synapses on their axons."""
+        for name in names:
+            self.erase_neuron(name)
+            for label in self.get_neuron_synapses(name): # the synapses on the pruned neuron's axon
+                self.erase_synapse(label)
 
     def erase_neuron(self, name):
-        """Erase the neuron from the module with the given name."""
+        """Erase the neuron from the module with the given name.
+        The synapses on its axon are kept, and read 0 from now on.
+        """
         # print(f"Erasing neuron {name}")
-        del self.neurons[name] # Is this sufficient, or do we need to tweak other dictionaries too?
+        self.unindex_neuron(name)
+        del self.neurons[name]
+        self.structure_version += 1
+        if self.structure_listeners:
+            self.notify_structure_change('erase_neuron', {'name': name})
 
     def erase_synapse(self, name):
-        """Erase the synapse from the module with the given name."""
+        """Erase the synapse from the module with the given name, and remove it from the synapse aliases.
+        Neuron patterns that read the synapse are kept, and read 0 from now on. See get_synapse_consumers().
+        """
         # print(f"Erasing synapse {name}")
-        del self.synapses[name] # Is this sufficient, or do we need to tweak other dictionaries too?
+        self.unindex_synapse(name)
+        del self.synapses[name]
+        self.erase_synapse_aliases(name)
+        self.structure_version += 1
+        if self.structure_listeners:
+            self.notify_structure_change('erase_synapse', {'name': name})
+
+    def erase_synapse_aliases(self, name):
+        """Remove the given synapse from the synapse aliases."""
+        for destination in self.synapse_alias_reverse_dict.pop(name, ()):
+            sources = self.synapse_alias_dict.get(destination)
+            if sources is None:
+                continue
+            sources.discard(name)
+            if len(sources) == 0:
+                del self.synapse_alias_dict[destination]
+
+    def remove_neuron(self, name):
+        """Erase a neuron, along with the synapses on its axon, including those not yet patched in."""
+        if name in self.neurons:
+            self.erase_neuron(name)
+        for label in [label for label, synapse in self.new_synapses.items() if synapse.axon_name == name]:
+            del self.new_synapses[label]
+            self.erase_synapse_aliases(label)
+        for label in self.get_neuron_synapses(name):
+            self.erase_synapse(label)
+        if self.capacity_tracker is not None:
+            self.capacity_tracker.remove(name)
+        if self.structure_listeners: # after the erase_neuron() and erase_synapse() changes, so replaying all of them is safe
+            self.notify_structure_change('remove_neuron', {'name': name})
+
+    def set_capacity_tracker(self, tracker):
+        """Set the capacity tracker that bounds the neurons learned by action_store_buffer(), or None for no bound."""
+        self.capacity_tracker = tracker
+
+    def get_capacity_tracker(self):
+        """Return the capacity tracker, or None if learning is unbounded."""
+        return self.capacity_tracker
+
+    def enforce_capacity(self):
+        """Evict learned neurons if we are over capacity."""
+        if self.capacity_tracker is not None:
+            self.capacity_tracker.evict(self)
 
     def as_chunk(self, grouped=True):
         """Output the neural module in chunk notation."""
@@ -547,16 +1188,11 @@ class NeuralModule:
                 layer = neuron.get_layer()
                 layer_neuron_set[layer].add(neuron_name)
 
-            neuron_synapse_set = defaultdict(set) # this might be better off doing somewhere else, not every time as_chunk() is called?
-            for synapse_name, synapse in self.synapses.items(): # also, synapses without corresponding neurons are not displayed
-                neuron_name = synapse.get_parent_axon_name()
-                neuron_synapse_set[neuron_name].add(synapse_name)
-
             for layer in sorted(layer_neuron_set.keys()):
                 for neuron_name in layer_neuron_set[layer]:
                     neuron = self.neurons[neuron_name]
                     s += neuron.as_chunk(self.default_layer, self.default_trigger_fn, self.default_trigger_params, self.default_pooling_fn, self.default_pooling_params)
-                    for synapse_name in neuron_synapse_set[neuron_name]:
+                    for synapse_name in self.neuron_synapses.get(neuron_name, ()): # synapses without corresponding neurons are not displayed
                         synapse = self.synapses[synapse_name]
                         s += synapse.as_chunk(self.default_synapse_fn, self.default_synapse_params, self.default_action_fn, self.default_action_params)
 
@@ -655,11 +1291,6 @@ class NeuralModule:
             layer = neuron.get_layer()
             layer_neuron_set[layer].add(neuron_name)
 
-        neuron_synapse_set = defaultdict(set) # this might be better off doing somewhere else, not every time as_chunk() is called?
-        for synapse_name, synapse in self.synapses.items(): # also, synapses without corresponding neurons are not displayed
-            neuron_name = synapse.get_parent_axon_name()
-            neuron_synapse_set[neuron_name].add(synapse_name)
-
         neuron_synapse_groups = []
         for layer in sorted(layer_neuron_set.keys()):
             for neuron_name in layer_neuron_set[layer]:
@@ -667,7 +1298,7 @@ class NeuralModule:
                 neuron = self.neurons[neuron_name]
                 neuron_synapse_dict['neuron'] = neuron.as_dict()
                 synapses = []
-                for synapse_name in neuron_synapse_set[neuron_name]:
+                for synapse_name in self.neuron_synapses.get(neuron_name, ()): # synapses without corresponding neurons are not included
                     synapse = self.synapses[synapse_name]
                     synapses.append(synapse.as_dict())
                 neuron_synapse_dict['synapses'] = synapses
@@ -949,19 +1580,25 @@ class NeuralModule:
 
     def append_to_global_sequence(self, layer, time_step, s):
         """Append the string 's' to the global sequence, with the given layer and time-step."""
-        self.global_sequences[layer][time_step].append(s)
+        self.global_sequences.append(layer, time_step, s)
+
+    def set_global_sequences_retention(self, n):
+        """Set the maximum number of global sequence entries kept per layer, or None for no limit."""
+        self.global_sequences.set_retention(n)
+
+    def get_global_sequence(self, layer, start=None, end=None):
+        """Return a list of (time_step, labels) for the given layer, with start <= time_step < end."""
+        return self.global_sequences.query(layer, start, end)
 
     def print_global_sequences(self, layers):
         """Print the global sequence, for the specified layers."""
         # ignore layers parameter for now
         s = '\nGlobal sequences:\n'
-        for layer, seq in self.global_sequences.items():
-            seq_str = ' . '.join(list_to_sp(elt) for elt in seq.values())
-            s += f'    {layer}:    {seq_str}\n'
+        s += str(self.global_sequences)
         print(s)
 
     def clear_global_sequences(self):
-        """Clear the global sequences dictionary."""
+        """Clear the global sequences."""
         self.global_sequences.clear()
 
     def print_neuron(self, name):
@@ -1,9 +1,12 @@
 """Implement a neural system, which is a collection of neural modules."""
 # Author: Garry Morrison
 # Created: 2024-9-19
-# Updated: 2024-10-22
+# Updated: 2026-10-19
 
+from time import perf_counter
 from .neural_module import NeuralModule, display_layer_synapse_dict
+from .profiler import Profiler
+from .memory_report import system_memory_report
 
 class NeuralSystem:
     """Implement a collection of neural modules."""
@@ -16,6 +19,7 @@ class NeuralSystem:
         self.variables = set()            # testing. They seem to work
         self.variables_history = {}       # testing
         self.variables_current_state = {} # testing
+        self.external_channel_state = {}  # channel values poked from outside the system, consumed on the next step
         self.modules = {}
         self.module_inputs = {}           # comment out?
         self.module_outputs = {}
@@ -28,6 +32,16 @@ class NeuralSystem:
         # self.active_synapses_delays = [0,1,2,3,4]
         self.active_synapses_prefix = "        "
         self.active_synapses_strings = {}
+        self.output_sink = None # None means each module keeps its own output sink
+        self.output_flush_interval = None
+        self.profiler = None
+        self.routes_compiled = False      # the routing tables below are rebuilt when the wiring changes
+        self.input_channels = []          # distinct input channels, indexed by slot
+        self.input_channel_slots = {}     # input channel -> slot
+        self.input_slot_states = []       # (state dictionary, channel) read for each slot, or (None, channel) if unconnected
+        self.input_routes = []            # (slot, module, neuron) for each registered module input
+        self.history_routes = []          # (history list, channel) for each channel
+        self.output_routes = {}           # module name -> (module structure version, [(synapse, delay, output, history list), ...])
 
     def enable_active_synapses(self, value):
         """Enable or disable active synapses in the neural module display."""
@@ -57,10 +71,27 @@ class NeuralSystem:
         """Get the active synapses print prefix."""
         return self.active_synapses_prefix
 
+    def set_output_sink(self, sink, flush_interval=None):
+        """Set the output sink used by the print actions in all of our modules, including those registered later."""
+        self.output_sink = sink
+        self.output_flush_interval = flush_interval
+        for module in self.modules.values():
+            module.set_output_sink(sink, flush_interval)
+
+    def get_output_sink(self):
+        """Return the system level output sink, or None if not set."""
+        return self.output_sink
+
+    def flush_output(self):
+        """Flush the output sinks of all our modules."""
+        for module in self.modules.values():
+            module.flush_output()
+
     def add_source(self, name, source_fn):
         """Add a source to our system."""
         self.sources[name] = source_fn
         self.current_sources_state[name] = next(self.sources[name])
+        self.routes_compiled = False
 
 #     def update_sources(self):
 #         """Update our sources."""
@@ -81,6 +112,8 @@ class NeuralSystem:
     def register_module(self, name, module):
         """Register a new module in our system."""
         self.modules[name] = module
+        if self.output_sink is not None:
+            module.set_output_sink(self.output_sink, self.output_flush_interval)
         self.module_inputs[name] = []
         self.module_outputs[name] = []
         self.module_inputs_history[name] = {}
@@ -88,12 +121,14 @@ class NeuralSystem:
         # if self.show_active_synapses:
         #     self.active_synapses_strings[name] = ""
         self.active_synapses_strings[name] = ""
+        self.routes_compiled = False
 
     def register_module_input(self, name, input, neuron):
         """Register a new input for a given module in our system."""
         if name not in self.modules:
             return # raise exception?
         self.module_inputs[name].append([input, neuron])
+        self.routes_compiled = False
         if input not in self.module_inputs_history[name]:
             self.module_inputs_history[name][input] = []
         if input not in self.variables:
@@ -105,6 +140,7 @@ class NeuralSystem:
         """Register a list of new inputs for a given module in our system."""
         if name not in self.modules:
             return # raise exception?
+        self.routes_compiled = False
         for pair in list_input_neuron_pairs:
             self.module_inputs[name].append(pair)
             if pair[1] not in self.module_inputs_history[name]: # swap pair[1] with pair[0]?
@@ -119,6 +155,7 @@ class NeuralSystem:
         if name not in self.modules:
             return # raise exception?
         self.module_outputs[name].append([synapse, output])
+        self.routes_compiled = False
         if output not in self.module_outputs_history[name]:
             self.current_outputs_state[output] = 0 # self.current_inputs_state, or self.current_outputs_state?
             self.module_outputs_history[name][output] = []
@@ -131,6 +168,7 @@ class NeuralSystem:
         """Register a list of new outputs for a given module in our system."""
         if name not in self.modules:
             return # raise exception?
+        self.routes_compiled = False
         for pair in list_synapse_output_pairs:
             self.module_outputs[name].append(pair)
             if pair[1] not in self.module_inputs_history[name]:
@@ -141,21 +179,77 @@ class NeuralSystem:
                 self.variables_history[pair[1]] = []
                 self.variables_current_state[pair[1]] = 0
 
-    def update_inputs(self):
-        """Update our inputs."""
+    def poke_channel(self, channel, value=1):
+        """Set the value of a channel from outside the system, for the next time step only."""
+        if channel not in self.variables:
+            print(f"Unknown channel: {channel}")
+            return
+        self.external_channel_state[channel] = value
+
+    def compile_routes(self):
+        """Compile the channel wiring into flat routing tables, used by update_inputs() and update_outputs()."""
+        self.input_channels = []
+        self.input_channel_slots = {}
+        self.input_routes = []
         for name, module in self.modules.items():
             for input, neuron in self.module_inputs[name]:
-                value = 0
-                if input in self.sources:
-                    value = self.current_sources_state[input]
-                elif input in self.current_outputs_state:
-                    value = self.current_outputs_state[input]
-                # self.module_inputs_history[name][neuron].append(value) # comment out later!
-                self.variables_current_state[input] = value
-                if value > 0:
-                    module.poke_neuron(neuron)
-        for input in self.variables:
-            self.variables_history[input].append(self.variables_current_state[input])
+                if input not in self.input_channel_slots:
+                    self.input_channel_slots[input] = len(self.input_channels)
+                    self.input_channels.append(input)
+                self.input_routes.append((self.input_channel_slots[input], module, neuron))
+        self.input_slot_states = []
+        for input in self.input_channels:
+            if input in self.sources:
+                self.input_slot_states.append((self.current_sources_state, input))
+            elif input in self.current_outputs_state:
+                self.input_slot_states.append((self.current_outputs_state, input))
+            else:
+                self.input_slot_states.append((None, input))
+        self.history_routes = [(self.variables_history[channel], channel) for channel in self.variables]
+        self.output_routes = {}
+        for name in self.modules:
+            self.compile_module_outputs(name)
+        self.routes_compiled = True
+
+    def compile_module_outputs(self, name):
+        """Resolve the output synapses of the given module, returning (structure version, routes)."""
+        module = self.modules[name]
+        routes = []
+        for synapse_name, output in self.module_outputs[name]:
+            if synapse_name in module.synapses: # the same lookup as NeuralModule.read_synapse()
+                synapse = module.synapses[synapse_name]
+                delay = 0
+            else:
+                try:
+                    label, delay_str = synapse_name.rsplit(" D", 1)
+                    delay = int(delay_str)
+                except ValueError:
+                    label = synapse_name
+                    delay = 0
+                synapse = module.synapses.get(label)
+            routes.append((synapse, delay, output, self.module_outputs_history[name][output]))
+        self.output_routes[name] = (module.structure_version, routes)
+        return self.output_routes[name]
+
+    def update_inputs(self):
+        """Update our inputs."""
+        if not self.routes_compiled:
+            self.compile_routes()
+        values = [0 if state is None else state[channel] for state, channel in self.input_slot_states]
+        if self.external_channel_state:
+            for channel, value in self.external_channel_state.items():
+                slot = self.input_channel_slots.get(channel)
+                if slot is not None:
+                    values[slot] = value
+            self.external_channel_state.clear()
+        current_state = self.variables_current_state
+        for channel, value in zip(self.input_channels, values):
+            current_state[channel] = value
+        for slot, module, neuron in self.input_routes:
+            if values[slot] > 0:
+                module.poke_neuron(neuron)
+        for history, channel in self.history_routes:
+            history.append(current_state[channel])
 
     def update_modules(self):
         """Update our modules."""
@@ -164,11 +258,17 @@ class NeuralSystem:
 
     def update_outputs(self):
         """Update our outputs."""
+        if not self.routes_compiled:
+            self.compile_routes()
+        current_outputs_state = self.current_outputs_state
         for name, module in self.modules.items():
-            for synapse, output in self.module_outputs[name]:
-                 value = module.read_synapse(synapse)
-                 self.current_outputs_state[output] = value
-                 self.module_outputs_history[name][output].append(value)
+            version, routes = self.output_routes[name]
+            if version != module.structure_version: # synapses were added or removed, so resolve them again
+                version, routes = self.compile_module_outputs(name)
+            for synapse, delay, output, history in routes:
+                value = 0 if synapse is None else synapse.read_synapse(delay)
+                current_outputs_state[output] = value
+                history.append(value)
 
     def update_sources(self):
         """Update our sources."""
@@ -187,8 +287,55 @@ class NeuralSystem:
             s = display_layer_synapse_dict(layer_synapse_dict, prefix)
             self.active_synapses_strings[name] += s + "\n"
 
+    def memory_report(self, top_n=10, sample=None):
+        """Return a MemoryReport of the bytes used by our modules, and our variable and output histories."""
+        return system_memory_report(self, top_n, sample)
+
+    def enable_profiling(self, profiler=None, include_modules=False):
+        """Enable profiling of update_system(), and return the profiler.
+        If include_modules is True, our modules record their phases and neurons to the same profiler.
+        """
+        if profiler is None:
+            profiler = Profiler()
+        self.profiler = profiler
+        if include_modules:
+            for module in self.modules.values():
+                module.enable_profiling(profiler, record_steps=False)
+        return profiler
+
+    def disable_profiling(self):
+        """Disable profiling of update_system(), including for our modules."""
+        self.profiler = None
+        for module in self.modules.values():
+            module.disable_profiling()
+
+    def get_profiler(self):
+        """Return the current profiler, or None if profiling is disabled."""
+        return self.profiler
+
+    def update_system_profiled(self, steps):
+        """Update the system for steps, recording the time spent in each phase."""
+        profiler = self.profiler
+        phases = [
+            ('update_inputs', self.update_inputs),
+            ('update_modules', self.update_modules),
+            ('update_outputs', self.update_outputs),
+            ('update_sources', self.update_sources),
+            ('update_active_synapses', self.update_active_synapses),
+        ]
+        for _ in range(steps):
+            step_start = perf_counter()
+            for phase, fn in phases:
+                start = perf_counter()
+                fn()
+                profiler.record_phase(f"system {phase}", perf_counter() - start)
+            profiler.record_step(perf_counter() - step_start)
+
     def update_system(self, steps):
         """Update the system for steps."""
+        if self.profiler is not None:
+            self.update_system_profiled(steps)
+            return
         for _ in range(steps):
             self.update_inputs()
             self.update_modules()
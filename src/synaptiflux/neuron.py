@@ -1,11 +1,13 @@
 """Implement a single reductionist neuron."""
 # Author: Garry Morrison
 # Created: 2024-9-18
-# Updated: 2024-11-8
+# Updated: 2026-10-19
 
 from .parse_simple_sdb import sp_dict_to_sp, coeff_labels_to_sp
-from .pooling_fn import pooling_inverse_fn_map, pooling_fn_map
+from .pooling_fn import pooling_inverse_fn_map, pooling_fn_map, pooling_short_circuit_fn_map
 from .trigger_fn import trigger_inverse_fn_map, trigger_fn_map
+from .superposition import Superposition
+from .operator_fn import operator_superposition_map
 
 class Neuron:
     """Implements a single reductionist neuron."""
@@ -18,6 +20,7 @@ class Neuron:
         self.name = name
         self.layer = layer
         self.activation_count = 0
+        self.last_activation = 0 # length of the axon list when the neuron last activated
         self.pattern_count = 0
         self.pattern = {}
         self.pattern_labels = {}
@@ -110,8 +113,11 @@ class Neuron:
         if poked:
             self.axon.append(1)
             self.activation_count += 1
+            self.last_activation = len(self.axon)
             return
         pooling_list = []
+        short_circuit_fn = pooling_short_circuit_fn_map.get(self.pooling_fn.__name__)
+        partial_sum = 0
         for k in range(self.pattern_count):
             input_pattern = []
             for label in self.pattern_labels[k]:
@@ -139,11 +145,16 @@ class Neuron:
             # print(f"{self.name} pattern: {input_pattern}")
             result = fn(self.pattern[k], input_pattern, **self.trigger_params[k])
             pooling_list.append(result)
+            if short_circuit_fn is not None: # stop evaluating patterns once the pooling result is decided
+                partial_sum += result
+                if short_circuit_fn(partial_sum, self.pattern_count - k - 1, **self.pooling_params):
+                    break
         # print(f"{self.name} pooling: {pooling_list}")
-        axon_value = self.pooling_fn(pooling_list)
+        axon_value = self.pooling_fn(pooling_list, **self.pooling_params)
         self.axon.append(axon_value)
         if axon_value != 0: # != 0, vs > 0?
             self.activation_count += 1
+            self.last_activation = len(self.axon)
 
     def update_pooling(self, pooling_fn, pooling_params):
         """Update the neuron's pooling function and parameters."""
@@ -313,6 +324,32 @@ class Neuron:
         self.pattern[pattern_number] = new_coeffs
         self.pattern_labels[pattern_number] = new_labels
 
+    def apply_operators(self, pattern_number, operators):
+        """Apply a list of (operator, params) pairs to the given pattern number, in order.
+        The pattern is converted to a Superposition once, and back to lists at the end, so the coefficients come back as floats.
+        Operators without a superposition version are applied to the list form.
+        """
+        if pattern_number >= self.pattern_count:
+            return # no matching pattern, so return
+        sp = None
+        coeffs = self.pattern[pattern_number]
+        labels = self.pattern_labels[pattern_number]
+        for operator, params in operators:
+            sp_operator = operator_superposition_map.get(operator.__name__)
+            if sp_operator is not None:
+                if sp is None:
+                    sp = Superposition(coeffs, labels)
+                sp = sp_operator(sp, **params)
+            else:
+                if sp is not None:
+                    coeffs, labels = sp.to_lists()
+                    sp = None
+                coeffs, labels = operator(coeffs, labels, **params)
+        if sp is not None:
+            coeffs, labels = sp.to_lists()
+        self.pattern[pattern_number] = coeffs
+        self.pattern_labels[pattern_number] = labels
+
     def __str__(self):
         if not self.valid:
             print("Invalid neuron")
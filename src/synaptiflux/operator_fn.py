@@ -1,9 +1,10 @@
 """Simple SDB style operators."""
 # Author: Garry Morrison
 # Created: 2024-11-8
-# Updated: 2024-11-16
+# Updated: 2026-10-19
 
 from collections import defaultdict
+from .superposition import Superposition, as_superposition
 
 def operator_clean(coeffs0, labels0):
     """Clean the coeffs by setting them all to 1."""
@@ -46,4 +47,46 @@ def operator_or(coeffs0, labels0, coeffs1, labels1):
     new_coeffs = [1] * len(new_labels)
     return new_coeffs, new_labels
 
+def sp_operator_clean(sp):
+    """Clean the coeffs of a superposition pattern by setting them all to 1."""
+    return sp.clean()
 
+def sp_operator_normalize(sp, t=1):
+    """Normalize the coeffs of a superposition pattern so their sum == t."""
+    return sp.normalize(t)
+
+def sp_operator_rescale(sp, t=1):
+    """Rescale the coeffs of a superposition pattern so the max coeff == t."""
+    return sp.rescale(t)
+
+def sp_operator_drop_below(sp, threshold):
+    """Drop elements from a superposition pattern with coeff < threshold."""
+    return sp.drop_below(threshold)
+
+def sp_operator_add(sp, coeffs1, labels1=None):
+    """Superposition add a pattern to a superposition pattern."""
+    return sp.add(as_superposition(coeffs1, labels1))
+
+def sp_operator_or(sp, coeffs1, labels1=None):
+    """Or a pattern with a superposition pattern."""
+    return sp.union(as_superposition(coeffs1, labels1))
+
+# map the list operator names to the operators, eg, for loading them from a saved change:
+operator_fn_map = {
+    'operator_clean': operator_clean,
+    'operator_normalize': operator_normalize,
+    'operator_rescale': operator_rescale,
+    'operator_drop_below': operator_drop_below,
+    'operator_add': operator_add,
+    'operator_or': operator_or,
+}
+
+# map the list operators to their superposition versions, which take the same parameters:
+operator_superposition_map = {
+    'operator_clean': sp_operator_clean,
+    'operator_normalize': sp_operator_normalize,
+    'operator_rescale': sp_operator_rescale,
+    'operator_drop_below': sp_operator_drop_below,
+    'operator_add': sp_operator_add,
+    'operator_or': sp_operator_or,
+}
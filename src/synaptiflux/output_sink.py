@@ -0,0 +1,104 @@
+"""Implement output sinks for the print actions."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import sys
+
+class StdoutSink:
+    """Implements a sink that writes straight through to stdout."""
+    def __str__(self):
+        return "stdout sink"
+
+    def write(self, s):
+        """Write a string to stdout."""
+        sys.stdout.write(s)
+
+    def flush(self):
+        """Nothing to flush, since we write straight through."""
+        return
+
+
+class BufferedSink:
+    """Implements a sink that buffers output, and writes it to a stream when flushed."""
+    def __init__(self, stream=None, max_buffered=65536):
+        self.stream = stream # None means write to the current sys.stdout
+        self.max_buffered = max_buffered
+        self.buffer = []
+        self.buffered_len = 0
+
+    def __str__(self):
+        return f"buffered sink: {self.buffered_len} characters buffered"
+
+    def write(self, s):
+        """Append a string to the buffer, and flush if the buffer is full."""
+        self.buffer.append(s)
+        self.buffered_len += len(s)
+        if self.buffered_len >= self.max_buffered:
+            self.flush()
+
+    def flush(self):
+        """Write the buffer to the stream, then erase it."""
+        if not self.buffer:
+            return
+        stream = sys.stdout if self.stream is None else self.stream
+        stream.write(''.join(self.buffer))
+        self.buffer.clear()
+        self.buffered_len = 0
+
+
+class ListSink:
+    """Implements a sink that stores output in memory."""
+    def __init__(self):
+        self.output = []
+
+    def __str__(self):
+        return self.get_output()
+
+    def write(self, s):
+        """Append a string to our output list."""
+        self.output.append(s)
+
+    def flush(self):
+        """Nothing to flush, since output stays in memory."""
+        return
+
+    def get_output(self):
+        """Return the output so far as a single string."""
+        return ''.join(self.output)
+
+    def erase(self):
+        """Erase the stored output."""
+        self.output.clear()
+
+
+class FileSink(BufferedSink):
+    """Implements a buffered sink that writes to the given file."""
+    def __init__(self, filename, mode='w', max_buffered=65536):
+        super().__init__(open(filename, mode), max_buffered)
+        self.filename = filename
+
+    def __str__(self):
+        return f"file sink: {self.filename}"
+
+    def close(self):
+        """Flush the buffer and close the file."""
+        self.flush()
+        self.stream.close()
+
+
+class NullSink:
+    """Implements a sink that discards all output."""
+    def __str__(self):
+        return "null sink"
+
+    def write(self, s):
+        """Discard the string."""
+        return
+
+    def flush(self):
+        """Nothing to flush."""
+        return
+
+
+default_output_sink = StdoutSink()
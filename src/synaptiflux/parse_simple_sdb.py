@@ -1,13 +1,14 @@
 """Parse simple SDB."""
 # Author: Garry Morrison
 # Created: 2024-10-15
-# Updated: 2024-11-10
+# Updated: 2026-10-19
 
 from .trigger_fn import trigger_list_simm_threshold, trigger_fn_map
 from .pooling_fn import pooling_or, pooling_fn_map
 from .synapse_fn import synapse_identity, synapse_fn_map
 from .action_fn import action_println, action_fn_map
 from .misc import cast_value
+from .superposition import Superposition
 import re
 
 def strip_delay(s):
@@ -70,6 +71,11 @@ def parse_sp(s, synapse_number=None): # superpositions do not require synapse nu
     labels = [x[1] for x in kets]
     return coeffs, labels
 
+def parse_superposition(s, synapse_number=None):
+    """Parse a SDB superposition into a Superposition. Unlike parse_sp(), repeated labels are added together."""
+    coeffs, labels = parse_sp(s, synapse_number)
+    return Superposition(coeffs, labels)
+
 def coeff_labels_to_sp(coeffs, labels):
     """Map coeffs, labels back to a superposition notation."""
     list_kets = [f"{clean_ket_coeff(coeff)}|{label}>" for coeff,label in zip(coeffs, labels)] # really should check both lists are the same length!
@@ -1,7 +1,7 @@
 """Define some toy pooling functions."""
 # Author: Garry Morrison
 # Created: 2024-9-18
-# Updated: 2024-10-19
+# Updated: 2026-10-19
 
 def pooling_or(list1):
     """Pool the outputs from our trigger functions into a single value."""
@@ -27,6 +27,18 @@ def pooling_sum_mod2(list1):
     return sum(list1) % 2
 
 
+def pooling_or_decided(partial_sum, remaining):
+    """Return True once the or pooling result is fixed, ie, after the first firing pattern."""
+    return partial_sum > 0
+
+def pooling_sum_decided(partial_sum, remaining, threshold):
+    """Return True once the threshold is reached, or can no longer be reached by the remaining patterns.
+
+    Assumes each trigger function returns 0 or 1.
+    """
+    return partial_sum >= threshold or partial_sum + remaining < threshold
+
+
 pooling_fn_map = {
     'or': pooling_or,
     'xor': pooling_xor,
@@ -40,3 +52,10 @@ pooling_inverse_fn_map = {
     'pooling_sum': 'sum',
     'pooling_sum_mod2': 'sum_mod2'
 }
+
+# Pooling functions that can stop evaluating trigger functions early.
+# Each maps to a function of (partial_sum, remaining, **pooling_params) that returns True once the result is decided:
+pooling_short_circuit_fn_map = {
+    'pooling_or': pooling_or_decided,
+    'pooling_sum': pooling_sum_decided
+}
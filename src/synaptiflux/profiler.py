@@ -0,0 +1,103 @@
+"""Implement a simple profiler for neural module and neural system updates."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import heapq
+from collections import defaultdict
+
+class Profiler:
+    """Records wall time and call counts per update phase, step latencies, and per neuron and synapse costs."""
+    def __init__(self, top_n=10, track_entities=True):
+        self.top_n = top_n
+        self.track_entities = track_entities
+        self.phase_time = defaultdict(float)
+        self.phase_calls = defaultdict(int)
+        self.step_histogram = defaultdict(int) # bucket k counts steps taking [2^(k-1), 2^k) microseconds
+        self.step_count = 0
+        self.step_time = 0.0
+        self.neuron_time = defaultdict(float)
+        self.neuron_calls = defaultdict(int)
+        self.synapse_time = defaultdict(float)
+        self.synapse_calls = defaultdict(int)
+
+    def reset(self):
+        """Reset all recorded statistics."""
+        self.phase_time.clear()
+        self.phase_calls.clear()
+        self.step_histogram.clear()
+        self.step_count = 0
+        self.step_time = 0.0
+        self.neuron_time.clear()
+        self.neuron_calls.clear()
+        self.synapse_time.clear()
+        self.synapse_calls.clear()
+
+    def record_phase(self, phase, seconds):
+        """Record one call of an update phase."""
+        self.phase_time[phase] += seconds
+        self.phase_calls[phase] += 1
+
+    def record_step(self, seconds):
+        """Record the latency of a single time step."""
+        self.step_count += 1
+        self.step_time += seconds
+        self.step_histogram[int(seconds * 1e6).bit_length()] += 1
+
+    def record_neuron(self, key, seconds):
+        """Record the cost of a single neuron update."""
+        self.neuron_time[key] += seconds
+        self.neuron_calls[key] += 1
+
+    def record_synapse(self, key, seconds):
+        """Record the cost of a single synapse update, including its action."""
+        self.synapse_time[key] += seconds
+        self.synapse_calls[key] += 1
+
+    def top_neurons(self, n=None):
+        """Return a list of (seconds, calls, key) for the n most expensive neurons."""
+        n = self.top_n if n is None else n
+        return [(self.neuron_time[key], self.neuron_calls[key], key) for key in heapq.nlargest(n, self.neuron_time, key=self.neuron_time.get)]
+
+    def top_synapses(self, n=None):
+        """Return a list of (seconds, calls, key) for the n most expensive synapses."""
+        n = self.top_n if n is None else n
+        return [(self.synapse_time[key], self.synapse_calls[key], key) for key in heapq.nlargest(n, self.synapse_time, key=self.synapse_time.get)]
+
+    def histogram(self):
+        """Return the step latency histogram as a list of (low_us, high_us, count)."""
+        return [(0 if k == 0 else 2 ** (k - 1), 2 ** k, self.step_histogram[k]) for k in sorted(self.step_histogram.keys())]
+
+    def as_dict(self):
+        """Return the recorded statistics as a Python dictionary."""
+        output_dict = {}
+        output_dict['steps'] = self.step_count
+        output_dict['step_time'] = self.step_time
+        output_dict['phases'] = {phase: {'time': self.phase_time[phase], 'calls': self.phase_calls[phase]} for phase in self.phase_time}
+        output_dict['step_histogram_us'] = [[low, high, count] for low, high, count in self.histogram()]
+        output_dict['top_neurons'] = [[str(key), seconds, calls] for seconds, calls, key in self.top_neurons()]
+        output_dict['top_synapses'] = [[str(key), seconds, calls] for seconds, calls, key in self.top_synapses()]
+        return output_dict
+
+    def report(self):
+        """Return a profile report as a string."""
+        s = "Profile report:\n"
+        s += f"    steps: {self.step_count}\n"
+        if self.step_count > 0:
+            s += f"    mean step: {1e6 * self.step_time / self.step_count:.1f} us\n"
+        s += "\n    phases:\n"
+        for phase in sorted(self.phase_time.keys(), key=self.phase_time.get, reverse=True):
+            seconds = self.phase_time[phase]
+            calls = self.phase_calls[phase]
+            s += f"        {phase}: {1e3 * seconds:.3f} ms, {calls} calls, {1e6 * seconds / calls:.1f} us/call\n"
+        s += "\n    step latency histogram:\n"
+        for low, high, count in self.histogram():
+            s += f"        [{low}, {high}) us: {count}\n"
+        if self.track_entities:
+            s += f"\n    top {self.top_n} neurons:\n"
+            for seconds, calls, key in self.top_neurons():
+                s += f"        {key}: {1e6 * seconds:.1f} us, {calls} calls\n"
+            s += f"\n    top {self.top_n} synapses:\n"
+            for seconds, calls, key in self.top_synapses():
+                s += f"        {key}: {1e6 * seconds:.1f} us, {calls} calls\n"
+        return s
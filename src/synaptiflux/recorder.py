@@ -0,0 +1,296 @@
+"""Implement a record and replay log of the external inputs to neural module and neural system runs."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import json
+from collections import defaultdict
+from .source_fn import source_off
+from .output_sink import NullSink
+from .action_fn import ACTION_NEVER
+from .module_codec import ObjectTable, encode_param, decode_param, encode_change, apply_change, encode_module, decode_module, history_window
+
+def target_modules(target, name=None):
+    """Return a dictionary of name -> neural module, for a neural module, or all the modules in a neural system."""
+    if hasattr(target, 'modules') and hasattr(target, 'register_module'):
+        return dict(target.modules)
+    return {target.name if name is None else name: target}
+
+def disable_print_actions(NM):
+    """Stop invoking print actions with no other side effects, ie, those with render functions."""
+    for synapse in list(NM.synapses.values()) + list(NM.new_synapses.values()):
+        if synapse.action_render_fn is not None:
+            synapse.action_mode = ACTION_NEVER
+
+class Recorder:
+    """Records the external inputs to a run in an append only log of JSON lines, so the run can be replayed exactly.
+
+    Per time step we record the poked neurons, including those from poke_neuron_sequence(), and the source values that
+    changed, but only for time steps that have them. Structure changes made from outside are recorded so they can be
+    re-applied, and changes made by learning actions during a time step are recorded as internal, so replay can check
+    they happen again. A checkpoint of each module is written on attach(), and every checkpoint_interval time steps,
+    so a replay can seek without running from the start.
+    Spike histories are not recorded, only the last few values needed to resume from a checkpoint, see history_window().
+    """
+    def __init__(self, f, checkpoint_interval=None):
+        if isinstance(f, str):
+            self.f = open(f, 'w')
+            self.owns_file = True
+        else:
+            self.f = f
+            self.owns_file = False
+        self.checkpoint_interval = checkpoint_interval
+        self.table = ObjectTable()
+        self.modules = {} # module name -> neural module
+        self.module_names = {} # id(NM) -> module name
+        self.source_state = {} # module name -> the encoded source values, as of the last record
+        self.last_checkpoint = {} # module name -> time step of the last checkpoint
+        self.in_step = set() # names of the modules inside a time step
+        self.record_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, record):
+        """Append a record to the log."""
+        self.f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.record_count += 1
+
+    def attach(self, target, name=None):
+        """Start recording a neural module, or all the modules in a neural system."""
+        for module_name, NM in target_modules(target, name).items():
+            self.modules[module_name] = NM
+            self.module_names[id(NM)] = module_name
+            NM.set_recorder(self)
+            NM.add_structure_listener(self.record_structure_change)
+            self.write_checkpoint(module_name, NM)
+
+    def detach(self):
+        """Stop recording, and write the final time step of each module."""
+        for name, NM in self.modules.items():
+            NM.set_recorder(None)
+            NM.remove_structure_listener(self.record_structure_change)
+            self.write({'type': 'end', 'module': name, 'time_step': NM.get_time_step()})
+        self.modules = {}
+        self.module_names = {}
+        self.f.flush()
+
+    def close(self):
+        """Detach, and close the log if we opened it."""
+        if self.modules:
+            self.detach()
+        if self.owns_file:
+            self.f.close()
+
+    def flush(self):
+        """Flush the log."""
+        self.f.flush()
+
+    def write_checkpoint(self, name, NM):
+        """Write a checkpoint of the module's structure and state."""
+        state = encode_module(NM, self.table, history_window(NM))
+        self.write({'type': 'checkpoint', 'module': name, 'time_step': NM.get_time_step(), 'state': state})
+        self.source_state[name] = dict(state['sources'])
+        self.last_checkpoint[name] = NM.get_time_step()
+
+    def begin_step(self, NM):
+        """Record the inputs to the time step that is about to run. Called by NM.update_system()."""
+        name = self.module_names.get(id(NM))
+        if name is None:
+            return
+        time_step = NM.get_time_step()
+        if self.checkpoint_interval and time_step % self.checkpoint_interval == 0 and self.last_checkpoint.get(name) != time_step:
+            # checkpoint all the modules before any of them run this time step, so objects they share are consistent:
+            for module_name, module in self.modules.items():
+                if module.get_time_step() == time_step and self.last_checkpoint.get(module_name) != time_step:
+                    self.write_checkpoint(module_name, module)
+        poked = set(NM.current_poked_neurons)
+        if NM.poke_neuron_sequence_buffer: # the poke_neuron_sequence() entry this time step will use
+            next_value = NM.poke_neuron_sequence_buffer[0]
+            if isinstance(next_value, list):
+                poked.update(next_value)
+            else:
+                poked.add(next_value)
+        sources = {}
+        state = self.source_state[name]
+        for label, value in NM.current_sources_state.items():
+            value = encode_param(value, NM, self.table)
+            if label not in state or state[label] != value:
+                sources[label] = value
+                state[label] = value
+        if poked or sources:
+            self.write({'type': 'step', 'module': name, 'time_step': time_step, 'poked': sorted(poked), 'sources': sources})
+        self.in_step.add(name)
+
+    def end_step(self, NM):
+        """Note the end of a time step. Called by NM.update_system()."""
+        self.in_step.discard(self.module_names.get(id(NM)))
+
+    def record_structure_change(self, NM, op, args):
+        """Record a structure change, as a structure listener."""
+        name = self.module_names.get(id(NM))
+        if name is None:
+            return
+        self.write({'type': 'change', 'module': name, 'time_step': NM.get_time_step(), 'internal': name in self.in_step,
+            'change': encode_change(NM, op, args, self.table)})
+
+    def __str__(self):
+        s = "Recorder:\n"
+        s += f"    modules: {sorted(self.modules)}\n"
+        s += f"    checkpoint interval: {self.checkpoint_interval}\n"
+        s += f"    records: {self.record_count}\n"
+        return s
+
+def read_records(f):
+    """Read the records of a log, from a filename or a file object."""
+    if isinstance(f, str):
+        with open(f, 'r') as log:
+            return [json.loads(line) for line in log if line.strip()]
+    return [json.loads(line) for line in f if line.strip()]
+
+class Replayer:
+    """Replays a log written by a Recorder into a neural module, or neural system.
+
+    The target should be built the same way as the recorded one, or for a neural module, seek() to the first checkpoint to
+    restore it. Sources are replaced by their recorded values, and for a neural system, its inputs by the recorded pokes. If quiet is True, output goes to a NullSink and print
+    actions are skipped. If verify is True, the structure changes made by learning actions are checked against the log.
+    """
+    def __init__(self, f, target, quiet=False, verify=True):
+        self.target = target
+        self.modules = target_modules(target)
+        self.quiet = quiet
+        self.verify = verify
+        self.table = ObjectTable()
+        self.steps = defaultdict(dict) # module name -> time step -> (poked, changed sources)
+        self.changes = defaultdict(lambda: defaultdict(list)) # module name -> time step -> [(internal, change)]
+        self.checkpoints = defaultdict(list) # module name -> [(time step, state)]
+        self.end_steps = {} # module name -> final recorded time step
+        self.source_state = defaultdict(dict) # module name -> encoded source values
+        self.replayed_changes = defaultdict(list) # module name -> (op, name) of the internal changes in this time step
+        self.replaying = False
+        self.mismatches = 0
+        records = read_records(f)
+        recorded_names = []
+        for record in records:
+            if record['module'] not in recorded_names:
+                recorded_names.append(record['module'])
+        if len(self.modules) == 1 and len(recorded_names) == 1: # a single module can be replayed into a module with another name
+            self.modules = {recorded_names[0]: list(self.modules.values())[0]}
+        for record in records:
+            name = record['module']
+            time_step = record['time_step']
+            if record['type'] == 'step':
+                self.steps[name][time_step] = (record['poked'], record['sources'])
+            elif record['type'] == 'change':
+                self.changes[name][time_step].append((record['internal'], record['change']))
+            elif record['type'] == 'checkpoint':
+                self.checkpoints[name].append((time_step, record['state']))
+            elif record['type'] == 'end':
+                self.end_steps[name] = time_step
+        for name in recorded_names:
+            if name not in self.modules:
+                print(f"Recorded module not in the replay target: {name}")
+        for name, NM in self.modules.items():
+            if self.checkpoints[name]:
+                self.source_state[name] = dict(self.checkpoints[name][0][1]['sources'])
+            self.prepare_module(name, NM)
+
+    def prepare_module(self, name, NM):
+        """Replace the module's sources with recorded values, and silence it if quiet."""
+        for label in list(NM.sources) + list(self.source_state[name]):
+            NM.sources[label] = source_off()
+        if self.quiet:
+            NM.set_output_sink(NullSink())
+            disable_print_actions(NM)
+        if self.verify and self.record_replayed_change not in NM.structure_listeners:
+            NM.add_structure_listener(self.record_replayed_change)
+
+    def record_replayed_change(self, NM, op, args):
+        """Note the structure changes made while replaying a time step, as a structure listener."""
+        if self.replaying:
+            for name, module in self.modules.items():
+                if module is NM:
+                    self.replayed_changes[name].append((op, args.get('name')))
+
+    def get_time_step(self):
+        """Return the current time step of the replay."""
+        return min(NM.get_time_step() for NM in self.modules.values())
+
+    def get_end_step(self):
+        """Return the last recorded time step."""
+        time_steps = list(self.end_steps.values())
+        for name in self.modules:
+            time_steps += list(self.steps[name]) + list(self.changes[name])
+            time_steps += [time_step for time_step, _ in self.checkpoints[name]]
+        return max(time_steps, default=0)
+
+    def seek(self, time_step):
+        """Restore each module from its last checkpoint at or before time_step, then replay up to time_step."""
+        for name, NM in self.modules.items():
+            candidates = [(checkpoint_step, state) for checkpoint_step, state in self.checkpoints[name] if checkpoint_step <= time_step]
+            if not candidates:
+                print(f"No checkpoint for {name} at or before time step {time_step}")
+                return False
+            checkpoint_step, state = candidates[-1]
+            if NM.get_time_step() <= time_step and NM.get_time_step() > checkpoint_step:
+                continue # already past the checkpoint, so just replay forward
+            decode_module(NM, state, self.table)
+            self.source_state[name] = dict(state['sources'])
+            self.prepare_module(name, NM)
+        while self.get_time_step() < time_step:
+            self.step()
+        return True
+
+    def step(self):
+        """Replay one time step."""
+        for name, NM in self.modules.items():
+            time_step = NM.get_time_step()
+            for internal, change in self.changes[name].get(time_step, ()):
+                if not internal:
+                    apply_change(NM, change, self.table)
+            poked, sources = self.steps[name].get(time_step, ([], {}))
+            self.source_state[name].update(sources)
+            for label, value in self.source_state[name].items():
+                NM.current_sources_state[label] = decode_param(value, NM, self.table)
+            NM.current_poked_neurons = set(poked)
+            NM.poke_neuron_sequence_buffer.clear()
+            self.replayed_changes[name] = []
+        self.replaying = True
+        try:
+            if hasattr(self.target, 'update_modules'): # the recorded pokes already include those routed in by the system
+                self.target.update_modules()
+                self.target.update_outputs()
+            else:
+                self.target.update_system(1)
+        finally:
+            self.replaying = False
+        if self.verify:
+            for name, NM in self.modules.items():
+                self.check_changes(name, NM.get_time_step() - 1)
+
+    def check_changes(self, name, time_step):
+        """Compare the internal structure changes of a replayed time step with those recorded."""
+        recorded = [(change['op'], change['args'].get('name')) for internal, change in self.changes[name].get(time_step, ()) if internal]
+        replayed = self.replayed_changes[name]
+        if recorded != replayed:
+            self.mismatches += 1
+            print(f"Replay of {name} differs at time step {time_step}: recorded {recorded}, replayed {replayed}")
+
+    def run(self, steps=None):
+        """Replay steps time steps, or up to the end of the log if steps is None."""
+        if steps is None:
+            steps = self.get_end_step() - self.get_time_step()
+        for _ in range(steps):
+            self.step()
+
+    def __str__(self):
+        s = "Replayer:\n"
+        s += f"    modules: {sorted(self.modules)}\n"
+        s += f"    time step: {self.get_time_step()}\n"
+        s += f"    end step: {self.get_end_step()}\n"
+        s += f"    checkpoints: {sum(len(checkpoints) for checkpoints in self.checkpoints.values())}\n"
+        s += f"    mismatches: {self.mismatches}\n"
+        return s
@@ -0,0 +1,191 @@
+"""Implement a columnar store for global sequences."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+from .parse_simple_sdb import list_to_sp
+
+class LayerSequence:
+    """Implements the (time_step, label id) columns for a single layer, with incremental rendering."""
+    def __init__(self, labels):
+        self.labels = labels # shared list of interned labels, indexed by label id
+        self.time_steps = array('q')
+        self.label_ids = array('q')
+        self.offset = 0      # index of the oldest retained event
+        self.ordered = True  # False once a time step arrives out of order
+        self.groups = deque() # [time_step, start, end, sp] for each rendered time step
+        self.grouped_upto = 0
+        self.rendered = None
+
+    def __len__(self):
+        return len(self.time_steps) - self.offset
+
+    def append(self, time_step, label_id):
+        """Append an event to the columns."""
+        if len(self.time_steps) > self.offset and time_step < self.time_steps[-1]:
+            self.ordered = False
+        self.time_steps.append(time_step)
+        self.label_ids.append(label_id)
+        self.rendered = None
+
+    def evict(self, retention):
+        """Drop the oldest events so that at most retention events remain."""
+        excess = len(self) - retention
+        if excess <= 0:
+            return
+        self.offset += excess
+        while self.groups and self.groups[0][2] <= self.offset:
+            self.groups.popleft()
+        if self.groups and self.groups[0][1] < self.offset:
+            self.groups[0][1] = self.offset
+            self.groups[0][3] = self.render_range(self.offset, self.groups[0][2])
+        self.grouped_upto = max(self.grouped_upto, self.offset)
+        self.rendered = None
+        if self.offset > 1024 and self.offset * 2 > len(self.time_steps):
+            self.compact()
+
+    def compact(self):
+        """Release the storage used by evicted events."""
+        offset = self.offset
+        self.time_steps = self.time_steps[offset:]
+        self.label_ids = self.label_ids[offset:]
+        for group in self.groups:
+            group[1] -= offset
+            group[2] -= offset
+        self.grouped_upto -= offset
+        self.offset = 0
+
+    def render_range(self, start, end):
+        """Render the events in the index range [start, end) as a superposition."""
+        labels = self.labels
+        return list_to_sp([labels[self.label_ids[idx]] for idx in range(start, end)])
+
+    def update_groups(self):
+        """Group and render the events that have arrived since the last render."""
+        groups = self.groups
+        dirty = None
+        for idx in range(self.grouped_upto, len(self.time_steps)):
+            time_step = self.time_steps[idx]
+            if groups and groups[-1][0] == time_step:
+                groups[-1][2] = idx + 1
+            else:
+                if dirty is not None:
+                    dirty[3] = self.render_range(dirty[1], dirty[2])
+                groups.append([time_step, idx, idx + 1, None])
+            dirty = groups[-1]
+        if dirty is not None:
+            dirty[3] = self.render_range(dirty[1], dirty[2])
+        self.grouped_upto = len(self.time_steps)
+
+    def grouped_events(self, start_idx, end_idx):
+        """Return a dictionary of time_step -> list of labels, for the index range [start_idx, end_idx)."""
+        time_step_labels = {}
+        for idx in range(start_idx, end_idx):
+            time_step = self.time_steps[idx]
+            if time_step not in time_step_labels:
+                time_step_labels[time_step] = []
+            time_step_labels[time_step].append(self.labels[self.label_ids[idx]])
+        return time_step_labels
+
+    def render(self):
+        """Render the layer as a SDB sequence string."""
+        if self.rendered is not None:
+            return self.rendered
+        if self.ordered:
+            self.update_groups()
+            self.rendered = ' . '.join(group[3] for group in self.groups)
+        else: # out of order time steps are merged with their earlier occurrence, so render from scratch:
+            time_step_labels = self.grouped_events(self.offset, len(self.time_steps))
+            self.rendered = ' . '.join(list_to_sp(labels) for labels in time_step_labels.values())
+        return self.rendered
+
+    def query(self, start=None, end=None):
+        """Return a list of (time_step, labels) with start <= time_step < end."""
+        lo = self.offset
+        hi = len(self.time_steps)
+        if self.ordered:
+            if start is not None:
+                lo = bisect_left(self.time_steps, start, lo, hi)
+            if end is not None:
+                hi = bisect_left(self.time_steps, end, lo, hi)
+            return list(self.grouped_events(lo, hi).items())
+        time_step_labels = self.grouped_events(lo, hi)
+        return [(time_step, labels) for time_step, labels in time_step_labels.items()
+                if (start is None or time_step >= start) and (end is None or time_step < end)]
+
+
+class SequenceStore:
+    """Implements a store of (layer, time_step, label) events, with interned labels and an optional retention limit."""
+    def __init__(self, retention=None):
+        self.retention = retention # maximum number of events kept per layer, None for no limit
+        self.label_ids = {}
+        self.labels = []
+        self.layers = {}
+
+    def __len__(self):
+        return sum(len(layer_sequence) for layer_sequence in self.layers.values())
+
+    def __str__(self):
+        s = ''
+        for layer, seq_str in self.items():
+            s += f'    {layer}:    {seq_str}\n'
+        return s
+
+    def set_retention(self, retention):
+        """Set the maximum number of events kept per layer, or None for no limit."""
+        self.retention = retention
+        if retention is not None:
+            for layer_sequence in self.layers.values():
+                layer_sequence.evict(retention)
+
+    def get_retention(self):
+        """Return the maximum number of events kept per layer."""
+        return self.retention
+
+    def intern(self, s):
+        """Return the label id for the given label."""
+        label_id = self.label_ids.get(s)
+        if label_id is None:
+            label_id = len(self.labels)
+            self.label_ids[s] = label_id
+            self.labels.append(s)
+        return label_id
+
+    def append(self, layer, time_step, s):
+        """Append the label 's' with the given layer and time step."""
+        layer_sequence = self.layers.get(layer)
+        if layer_sequence is None:
+            layer_sequence = LayerSequence(self.labels)
+            self.layers[layer] = layer_sequence
+        layer_sequence.append(time_step, self.intern(s))
+        if self.retention is not None:
+            layer_sequence.evict(self.retention)
+
+    def get_layers(self):
+        """Return the list of layers, in order of first appearance."""
+        return list(self.layers.keys())
+
+    def query(self, layer, start=None, end=None):
+        """Return a list of (time_step, labels) for the given layer, with start <= time_step < end."""
+        if layer not in self.layers:
+            return []
+        return self.layers[layer].query(start, end)
+
+    def render(self, layer):
+        """Return the SDB sequence string for the given layer."""
+        if layer not in self.layers:
+            return ''
+        return self.layers[layer].render()
+
+    def items(self):
+        """Return a list of (layer, SDB sequence string) pairs."""
+        return [(layer, layer_sequence.render()) for layer, layer_sequence in self.layers.items()]
+
+    def clear(self):
+        """Clear the store, including the interned labels."""
+        self.label_ids.clear()
+        self.labels.clear()
+        self.layers.clear()
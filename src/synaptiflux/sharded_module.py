@@ -0,0 +1,363 @@
+"""Implement a sharded neural module, that updates the neurons and synapses of one large module across worker processes."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import traceback
+import multiprocessing
+from threading import BrokenBarrierError
+from math import ceil
+from collections import deque
+from .action_fn import ACTION_NEVER, ACTION_POSITIVE
+
+SHARD_STEP = 0
+SHARD_STOP = 1
+
+VALUE_FLOAT = 0
+VALUE_INT = 1
+VALUE_BOOL = 2
+
+def encode_value(value):
+    """Encode a neuron or synapse value as a (float, kind) pair, so it can be stored in shared memory."""
+    if value is True or value is False:
+        return float(value), VALUE_BOOL
+    if isinstance(value, int):
+        return float(value), VALUE_INT
+    return float(value), VALUE_FLOAT
+
+def decode_value(value, kind):
+    """Decode a (float, kind) pair back into the original value."""
+    if kind == VALUE_INT:
+        return int(value)
+    if kind == VALUE_BOOL:
+        return bool(value)
+    return value
+
+def resolve_label(NM, label):
+    """Resolve a pattern label into the synapse alias key and delay, the same way Neuron.update_axon() does."""
+    if label in NM.synapses:
+        return label, 0
+    try:
+        key, delay_str = label.rsplit(" D", 1)
+        return key, int(delay_str)
+    except ValueError:
+        return label, 0
+
+def neuron_graph(NM):
+    """Return the undirected neuron graph, where neurons are connected if one reads a synapse on the other's axon."""
+    graph = {name: set() for name in NM.neurons}
+    for name, neuron in NM.neurons.items():
+        if not neuron.valid:
+            continue
+        for labels in neuron.pattern_labels.values():
+            for label in labels:
+                if label in NM.current_sources_state:
+                    continue
+                key, _ = resolve_label(NM, label)
+                for sublabel in NM.synapse_alias_dict.get(key, ()):
+                    synapse = NM.synapses.get(sublabel)
+                    if synapse is None or synapse.axon_name not in graph or synapse.axon_name == name:
+                        continue
+                    graph[name].add(synapse.axon_name)
+                    graph[synapse.axon_name].add(name)
+    return graph
+
+def neuron_cost(neuron):
+    """Return the rough cost of updating a neuron, the number of its pattern labels plus one."""
+    if not neuron.valid:
+        return 1
+    return 1 + sum(len(labels) for labels in neuron.pattern_labels.values())
+
+def partition_neurons(NM, shards):
+    """Greedily partition the neurons into shards of roughly equal cost, walking the neuron graph breadth first so connected neurons share a shard.
+    Returns the list of shards, and the number of cut and total edges.
+    """
+    graph = neuron_graph(NM)
+    order = []
+    seen = set()
+    for start in graph:
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for other in sorted(graph[name] - seen):
+                seen.add(other)
+                queue.append(other)
+    total_cost = sum(neuron_cost(neuron) for neuron in NM.neurons.values())
+    shard_cost = ceil(total_cost / shards) if shards > 0 else total_cost
+    partition = [[] for _ in range(shards)]
+    shard = 0
+    cost = 0
+    for name in order:
+        if cost >= shard_cost and shard < shards - 1:
+            shard += 1
+            cost = 0
+        partition[shard].append(name)
+        cost += neuron_cost(NM.neurons[name])
+    shard_of = {name: k for k, names in enumerate(partition) for name in names}
+    total_edges = sum(len(others) for others in graph.values()) // 2
+    cut_edges = sum(1 for name, others in graph.items() for other in others if shard_of[name] < shard_of[other])
+    return partition, cut_edges, total_edges
+
+def max_pattern_delay(NM):
+    """Return the largest synapse delay read by any of the neuron patterns."""
+    max_delay = 0
+    for neuron in NM.neurons.values():
+        if not neuron.valid:
+            continue
+        for labels in neuron.pattern_labels.values():
+            for label in labels:
+                _, delay = resolve_label(NM, label)
+                if delay > max_delay:
+                    max_delay = delay
+    return max_delay
+
+class ShardClock:
+    """Counts the steps taken by a worker since it was started."""
+    def __init__(self):
+        self.steps = 0
+
+class SharedSynapseReader:
+    """Stands in for a synapse inside a worker, reading recent spike values from the shared ring buffer."""
+    __slots__ = ['index', 'base_len', 'clock', 'ring', 'ring_kinds', 'ring_len', 'synapse_count']
+
+    def __init__(self, index, base_len, clock, ring, ring_kinds, ring_len, synapse_count):
+        self.index = index
+        self.base_len = base_len
+        self.clock = clock
+        self.ring = ring
+        self.ring_kinds = ring_kinds
+        self.ring_len = ring_len
+        self.synapse_count = synapse_count
+
+    def read_synapse(self, delay):
+        """Read and return the value of the synapse, with the given delay."""
+        history_len = self.base_len + self.clock.steps
+        if delay < 0 or delay >= history_len:
+            return 0
+        slot = ((history_len - 1 - delay) % self.ring_len) * self.synapse_count + self.index
+        return decode_value(self.ring[slot], self.ring_kinds[slot])
+
+class ShardedModule:
+    """Updates a single neural module across worker processes, each owning a shard of its neurons and synapses.
+
+    The neuron and synapse values are exchanged through shared memory once per time step, and mirrored back into the
+    neural module, so its state, actions and output are identical to NM.update_system().
+    """
+    def __init__(self, NM, shards=4):
+        self.NM = NM
+        self.shards = shards
+        self.workers = []
+        self.structure_version = None
+        self.partition = []
+        self.cut_edges = 0
+        self.total_edges = 0
+        self.restarts = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
+
+    def is_parallel(self):
+        """Return True if we can update the module in worker processes."""
+        return self.shards > 1 and 'fork' in multiprocessing.get_all_start_methods()
+
+    def start(self):
+        """Partition the module, allocate the shared memory, and fork the workers."""
+        self.stop()
+        NM = self.NM
+        NM.patch_in_new_synapses()
+        ctx = multiprocessing.get_context('fork')
+        self.partition, self.cut_edges, self.total_edges = partition_neurons(NM, self.shards)
+        self.neuron_names = list(NM.neurons)
+        self.neuron_index = {name: k for k, name in enumerate(self.neuron_names)}
+        self.synapse_names = list(NM.synapses)
+        self.source_names = list(NM.current_sources_state)
+        neuron_count = len(self.neuron_names)
+        synapse_count = len(self.synapse_names)
+        source_count = len(self.source_names)
+        self.ring_len = max_pattern_delay(NM) + 2 # so a worker writing this step's value never overwrites one still being read
+        self.base_len = [NM.synapses[name].get_spike_history_len() for name in self.synapse_names]
+        self.steps = 0
+
+        self.shared = {
+            'ring': ctx.RawArray('d', max(1, self.ring_len * synapse_count)),
+            'ring_kinds': ctx.RawArray('b', max(1, self.ring_len * synapse_count)),
+            'axons': ctx.RawArray('d', max(1, neuron_count)),
+            'axon_kinds': ctx.RawArray('b', max(1, neuron_count)),
+            'poked': ctx.RawArray('b', max(1, neuron_count)),
+            'sources': ctx.RawArray('d', max(1, source_count)),
+            'source_kinds': ctx.RawArray('b', max(1, source_count)),
+        }
+        self.views = {key: memoryview(array).cast('B').cast('b' if key.endswith(('kinds', 'poked')) else 'd') for key, array in self.shared.items()}
+        ring = self.views['ring']
+        ring_kinds = self.views['ring_kinds']
+        for sid, name in enumerate(self.synapse_names):
+            history = NM.synapses[name].spike_history
+            for k in range(max(0, len(history) - self.ring_len), len(history)):
+                slot = (k % self.ring_len) * synapse_count + sid
+                ring[slot], ring_kinds[slot] = encode_value(history[k])
+        self.command = ctx.RawValue('b', SHARD_STEP)
+        self.barrier = ctx.Barrier(self.shards + 1)
+
+        shard_of = {name: k for k, names in enumerate(self.partition) for name in names}
+        shard_synapses = [[] for _ in range(self.shards)]
+        for sid, name in enumerate(self.synapse_names):
+            shard_synapses[shard_of.get(NM.synapses[name].axon_name, 0)].append(sid)
+        self.workers = []
+        for shard in range(self.shards):
+            process = ctx.Process(target=self.run_worker, args=(self.partition[shard], shard_synapses[shard]), daemon=True)
+            process.start()
+            self.workers.append(process)
+        self.structure_version = NM.structure_version
+
+    def run_worker(self, neuron_names, synapse_indices):
+        """The body of a worker process, updating its shard of neurons and synapses once per time step."""
+        try:
+            NM = self.NM
+            views = self.views
+            synapse_count = len(self.synapse_names)
+            clock = ShardClock()
+            synapse_view = {}
+            for sid, name in enumerate(self.synapse_names):
+                synapse_view[name] = SharedSynapseReader(sid, self.base_len[sid], clock, views['ring'], views['ring_kinds'], self.ring_len, synapse_count)
+            neurons = [(self.neuron_index[name], NM.neurons[name]) for name in neuron_names if NM.neurons[name].valid]
+            synapses = [(sid, self.base_len[sid], NM.synapses[self.synapse_names[sid]]) for sid in synapse_indices]
+            source_names = list(enumerate(self.source_names))
+            while True:
+                self.barrier.wait()
+                if self.command.value == SHARD_STOP:
+                    break
+                current_sources = {name: decode_value(views['sources'][k], views['source_kinds'][k]) for k, name in source_names}
+                for index, neuron in neurons:
+                    neuron.update_axon(current_sources, synapse_view, views['poked'][index] == 1, NM.synapse_alias_dict)
+                    views['axons'][index], views['axon_kinds'][index] = encode_value(neuron.axon[-1])
+                for sid, base_len, synapse in synapses:
+                    value = synapse.update_spike_value(NM.neurons)
+                    slot = ((base_len + clock.steps) % self.ring_len) * synapse_count + sid
+                    views['ring'][slot], views['ring_kinds'][slot] = encode_value(value)
+                clock.steps += 1
+                self.barrier.wait()
+        except Exception:
+            traceback.print_exc()
+            self.barrier.abort()
+
+    def stop(self):
+        """Stop the workers."""
+        if not self.workers:
+            return
+        self.command.value = SHARD_STOP
+        try:
+            self.barrier.wait()
+        except BrokenBarrierError:
+            pass
+        for process in self.workers:
+            process.join()
+        self.workers = []
+        self.structure_version = None
+
+    def update_step(self):
+        """Update the module by one time step, returning False if a worker failed."""
+        NM = self.NM
+        NM.patch_in_new_synapses()
+        NM.enforce_capacity()
+        if self.structure_version != NM.structure_version: # the module was changed, so re-partition from the current state
+            if self.workers:
+                self.restarts += 1
+            self.start()
+        views = self.views
+        NM.update_poked_neuron_set()
+        poked_indices = [self.neuron_index[name] for name in NM.current_poked_neurons if name in self.neuron_index]
+        for index in poked_indices:
+            views['poked'][index] = 1
+        NM.current_poked_neurons.clear()
+        for k, name in enumerate(self.source_names):
+            views['sources'][k], views['source_kinds'][k] = encode_value(NM.current_sources_state[name])
+        try:
+            self.barrier.wait()
+            self.barrier.wait()
+        except BrokenBarrierError:
+            print(f"Sharded update of {NM.name} failed at time step {NM.time_step_counter}")
+            for process in self.workers:
+                process.terminate()
+            self.workers = []
+            self.structure_version = None
+            return False
+        for index in poked_indices:
+            views['poked'][index] = 0
+
+        axons = views['axons']
+        axon_kinds = views['axon_kinds']
+        for index, name in enumerate(self.neuron_names):
+            neuron = NM.neurons[name]
+            if not neuron.valid:
+                neuron.update_axon(NM.current_sources_state, NM.synapses, False, NM.synapse_alias_dict)
+                continue
+            value = decode_value(axons[index], axon_kinds[index])
+            neuron.axon.append(value)
+            if value != 0:
+                neuron.activation_count += 1
+                neuron.last_activation = len(neuron.axon)
+                if NM.activation_tracker is not None:
+                    NM.activation_tracker.record(name, neuron.activation_count, NM.time_step_counter)
+
+        ring = views['ring']
+        ring_kinds = views['ring_kinds']
+        synapse_count = len(self.synapse_names)
+        rendered = []
+        for sid, name in enumerate(self.synapse_names): # mirror NM.update_synapses(), in the same order
+            synapse = NM.synapses[name]
+            slot = ((self.base_len[sid] + self.steps) % self.ring_len) * synapse_count + sid
+            value = decode_value(ring[slot], ring_kinds[slot])
+            synapse.spike_history.append(value)
+            mode = synapse.action_mode
+            if mode == ACTION_NEVER or (mode == ACTION_POSITIVE and value <= 0):
+                continue
+            render_fn = synapse.action_render_fn
+            if render_fn is not None:
+                rendered.append(render_fn(synapse, value, **synapse.action_params))
+                continue
+            if rendered:
+                NM.output_sink.write(''.join(rendered))
+                rendered.clear()
+            synapse.action_fn(synapse, value, **synapse.action_params)
+        if rendered:
+            NM.output_sink.write(''.join(rendered))
+        self.steps += 1
+        return True
+
+    def update_system(self, steps):
+        """Update the module by the given number of time steps, in the worker processes if we can."""
+        NM = self.NM
+        if not self.is_parallel():
+            NM.update_system(steps)
+            return
+        for _ in range(steps):
+            if NM.recorder is not None:
+                NM.recorder.begin_step(NM)
+            if not self.update_step():
+                break
+            NM.update_sources()
+            NM.increment_time_step()
+            NM.increment_delay_counter()
+            if NM.output_flush_interval > 0 and NM.time_step_counter % NM.output_flush_interval == 0:
+                NM.output_sink.flush()
+            if NM.recorder is not None:
+                NM.recorder.end_step(NM)
+        NM.output_sink.flush()
+
+    def __str__(self):
+        s = f"Sharded module: {self.NM.name}\n"
+        s += f"    shards: {self.shards}\n"
+        s += f"    running: {len(self.workers) > 0}\n"
+        s += f"    restarts: {self.restarts}\n"
+        s += f"    ring length: {getattr(self, 'ring_len', 0)}\n"
+        s += f"    cut edges: {self.cut_edges} of {self.total_edges}\n"
+        for k, names in enumerate(self.partition):
+            s += f"    shard {k}: {len(names)} neurons\n"
+        return s
@@ -0,0 +1,155 @@
+"""Implement an inverted label index over neuron patterns, for top-k similarity queries."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import heapq
+from collections import defaultdict
+from .parse_simple_sdb import parse_sp
+
+similarity_measures = ['simm', 'dot_product']
+
+def query_to_dict(query):
+    """Convert a query into a dictionary of label -> coefficient.
+    The query can be a SDB superposition string, a dictionary, a list of labels, or a (coeffs, labels) pair.
+    """
+    if isinstance(query, str):
+        coeffs, labels = parse_sp(query)
+    elif isinstance(query, dict):
+        return {label: coeff for label, coeff in query.items() if coeff != 0}
+    elif isinstance(query, tuple) and len(query) == 2:
+        coeffs, labels = query
+    else:
+        labels = list(query)
+        coeffs = [1] * len(labels)
+    query_dict = defaultdict(float)
+    for coeff, label in zip(coeffs, labels):
+        if label != '':
+            query_dict[label] += coeff
+    return {label: coeff for label, coeff in query_dict.items() if coeff != 0}
+
+def pattern_to_dict(seed_pattern, synapse_labels):
+    """Convert a neuron pattern into a dictionary of label -> coefficient, adding the coefficients of repeated labels."""
+    pattern_dict = defaultdict(float)
+    for coeff, label in zip(seed_pattern, synapse_labels):
+        pattern_dict[label] += coeff
+    return {label: coeff for label, coeff in pattern_dict.items() if coeff != 0}
+
+def pattern_dict_scores(query_dict, postings, sizes, measure='simm'):
+    """Return a dictionary of (neuron name, pattern number) -> score, given the postings of the query labels,
+    ie, label -> {(neuron name, pattern number): coefficient}, and the pattern sizes, ie, the sums of their absolute coefficients.
+    """
+    scores = defaultdict(float)
+    if measure == 'dot_product':
+        for label, g in query_dict.items():
+            for key, f in postings.get(label, {}).items():
+                scores[key] += f * g
+        return scores
+    if measure != 'simm':
+        print(f"Unknown similarity measure: {measure}")
+        return scores
+    s2 = sum(abs(g) for g in query_dict.values())
+    if s2 == 0:
+        return scores
+    for label, g in query_dict.items():
+        b = g / s2
+        for key, f in postings.get(label, {}).items():
+            a = f / sizes[key]
+            scores[key] += (abs(a) + abs(b) - abs(a - b)) / 2
+    return scores
+
+def rank_pattern_scores(scores, k=10, threshold=0.0):
+    """Return up to k (neuron name, score) pairs, best first, where a neuron's score is the best score of its patterns.
+    Only neurons with score >= threshold are returned. If k is None, return all of them.
+    """
+    neuron_scores = {}
+    for (name, _), score in scores.items():
+        if score >= threshold and score > neuron_scores.get(name, float('-inf')):
+            neuron_scores[name] = score
+    ranking = lambda x: (-x[1], x[0])
+    if k is None:
+        return sorted(neuron_scores.items(), key=ranking)
+    return heapq.nsmallest(k, neuron_scores.items(), key=ranking)
+
+class SimilarityIndex:
+    """An inverted index from synapse labels to the neuron patterns that use them.
+
+    A query only visits the patterns that share a label with it, so sparse queries take time proportional to the
+    length of the matching posting lists, rather than to the size of the module.
+
+    The list simm of f and g, as in trigger_list_simm_threshold(), only depends on their shared labels:
+        simm(f, g) = sum over shared labels of (|a| + |b| - |a - b|)/2, where a = f/sum|f|, and b = g/sum|g|
+    which is sum of min(a, b) for non-negative coefficients. So the scores are exact, not approximate.
+    """
+    def __init__(self):
+        self.postings = defaultdict(dict) # label -> {(neuron name, pattern number): coefficient}
+        self.patterns = {} # (neuron name, pattern number) -> {label: coefficient}
+        self.sizes = {} # (neuron name, pattern number) -> sum of the absolute coefficients
+        self.neuron_patterns = defaultdict(set) # neuron name -> pattern numbers
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def add_pattern(self, name, pattern_no, seed_pattern, synapse_labels):
+        """Add, or replace, a neuron pattern."""
+        key = (name, pattern_no)
+        if key in self.patterns:
+            self.remove_pattern(name, pattern_no)
+        pattern_dict = pattern_to_dict(seed_pattern, synapse_labels)
+        self.patterns[key] = pattern_dict
+        self.sizes[key] = sum(abs(coeff) for coeff in pattern_dict.values())
+        self.neuron_patterns[name].add(pattern_no)
+        for label, coeff in pattern_dict.items():
+            self.postings[label][key] = coeff
+
+    def remove_pattern(self, name, pattern_no):
+        """Remove a neuron pattern."""
+        key = (name, pattern_no)
+        pattern_dict = self.patterns.pop(key, None)
+        if pattern_dict is None:
+            return
+        del self.sizes[key]
+        for label in pattern_dict:
+            posting = self.postings[label]
+            del posting[key]
+            if len(posting) == 0:
+                del self.postings[label]
+        pattern_numbers = self.neuron_patterns[name]
+        pattern_numbers.discard(pattern_no)
+        if len(pattern_numbers) == 0:
+            del self.neuron_patterns[name]
+
+    def remove_neuron(self, name):
+        """Remove all the patterns of a neuron."""
+        for pattern_no in list(self.neuron_patterns.get(name, ())):
+            self.remove_pattern(name, pattern_no)
+
+    def build(self, neurons):
+        """Rebuild the index from a dictionary of neurons."""
+        self.postings.clear()
+        self.patterns.clear()
+        self.sizes.clear()
+        self.neuron_patterns.clear()
+        for name, neuron in neurons.items():
+            if not neuron.valid:
+                continue
+            for pattern_no in neuron.pattern:
+                self.add_pattern(name, pattern_no, neuron.pattern[pattern_no], neuron.pattern_labels[pattern_no])
+
+    def pattern_scores(self, query, measure='simm'):
+        """Return a dictionary of (neuron name, pattern number) -> score, for the patterns that share a label with the query."""
+        return pattern_dict_scores(query_to_dict(query), self.postings, self.sizes, measure)
+
+    def query(self, query, k=10, threshold=0.0, measure='simm'):
+        """Return up to k (neuron name, score) pairs, best first, where a neuron's score is the best score of its patterns.
+        Only neurons with score >= threshold are returned, and only those sharing at least one label with the query.
+        If k is None, return all of them.
+        """
+        return rank_pattern_scores(self.pattern_scores(query, measure), k, threshold)
+
+    def __str__(self):
+        s = "Similarity index:\n"
+        s += f"    neurons: {len(self.neuron_patterns)}\n"
+        s += f"    patterns: {len(self.patterns)}\n"
+        s += f"    labels: {len(self.postings)}\n"
+        return s
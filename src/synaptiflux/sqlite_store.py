@@ -0,0 +1,345 @@
+"""Implement an out of core store of neurons, patterns and synapses in a SQLite database, with an LRU cache of neurons."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import json
+import sqlite3
+from collections import OrderedDict
+from .neural_module import NeuralModule
+from .parse_simple_sdb import parse_seq, parse_sp, strip_delay, strip_synapse
+from .similarity_index import query_to_dict, pattern_to_dict, pattern_dict_scores, rank_pattern_scores
+from .module_codec import ObjectTable, encode_neuron, decode_neuron, encode_synapse, decode_synapse, encode_defaults, decode_fn, decode_param
+
+store_schema = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS neurons (name TEXT PRIMARY KEY, layer INTEGER, empty_trigger INTEGER, data TEXT);
+CREATE INDEX IF NOT EXISTS neurons_layer ON neurons (layer);
+CREATE TABLE IF NOT EXISTS patterns (neuron TEXT, pattern_no INTEGER, size REAL, PRIMARY KEY (neuron, pattern_no));
+CREATE TABLE IF NOT EXISTS pattern_labels (label TEXT, neuron TEXT, pattern_no INTEGER, coeff REAL);
+CREATE INDEX IF NOT EXISTS pattern_labels_label ON pattern_labels (label);
+CREATE INDEX IF NOT EXISTS pattern_labels_neuron ON pattern_labels (neuron);
+CREATE TABLE IF NOT EXISTS synapses (name TEXT PRIMARY KEY, axon TEXT, data TEXT);
+CREATE INDEX IF NOT EXISTS synapses_axon ON synapses (axon);
+CREATE TABLE IF NOT EXISTS aliases (source TEXT, destination TEXT, PRIMARY KEY (source, destination));
+"""
+
+sqlite_max_params = 900 # stay under the SQLite limit on the number of ? parameters in a query
+
+def chunked(items, size=sqlite_max_params):
+    """Split a list into lists of at most size items."""
+    return [items[k:k + size] for k in range(0, len(items), size)]
+
+def map_line_names(line):
+    """Return the neuron and synapse names used by a line of a map, as processed by NM.from_map(), or None for other lines."""
+    for separator, reverse in [(' => ', True), (' |=> ', False)]:
+        if separator not in line:
+            continue
+        try:
+            if reverse:
+                pattern, neurons = line.split(separator, 1)
+            else:
+                neurons, pattern = line.split(separator, 1)
+            synapse_labels = parse_seq(pattern, 0, reverse=reverse)[1]
+            neuron_names = parse_sp(neurons)[1]
+        except Exception:
+            return None
+        synapse_names = [strip_delay(label) for label in synapse_labels]
+        return neuron_names + [strip_synapse(name) for name in synapse_names], synapse_names
+    return None
+
+class SQLiteStore:
+    """Stores the neurons, patterns and synapses of a module in a SQLite database, so it needn't fit in memory.
+
+    Pattern labels are indexed, so get_test_neurons() and get_similar_neurons() only read the neurons that share a label
+    with the query, and from_map() only reads the neurons and synapses a map mentions. The most recently used neurons
+    are kept in an LRU cache of cache_size neurons. Neurons returned by get_neuron() are shared with the cache, so
+    changes to them are only saved by put_neuron().
+    Writes are committed by commit(), close(), and the bulk import methods.
+    """
+    def __init__(self, filename, cache_size=1024):
+        self.filename = filename
+        self.db = sqlite3.connect(filename)
+        self.db.executescript(store_schema)
+        self.cache_size = cache_size
+        self.cache = OrderedDict() # neuron name -> Neuron, least recently used first
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.NM = NeuralModule(self.get_meta('name', 'sqlite store')) # holds the defaults, and is the module '$module' decodes to
+        self.table = ObjectTable(self.get_meta('next_object', 0))
+        defaults = self.get_meta('defaults')
+        if defaults is not None:
+            self.set_defaults(defaults)
+        self.NM.neuron_name_index = self.get_meta('neuron_name_index', 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM neurons").fetchone()[0]
+
+    def __contains__(self, name):
+        return self.has_neuron(name)
+
+    def get_meta(self, key, default=None):
+        """Return a stored setting."""
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def set_meta(self, key, value):
+        """Store a setting."""
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def set_defaults(self, defaults):
+        """Set the module defaults, as encoded by encode_defaults()."""
+        self.NM.default_layer = defaults['layer']
+        for kind in ['trigger', 'pooling', 'synapse', 'action']:
+            fn_name, params = defaults[kind]
+            setattr(self.NM, f"default_{kind}_fn", decode_fn(kind, fn_name))
+            setattr(self.NM, f"default_{kind}_params", decode_param(params, self.NM, self.table))
+
+    def commit(self):
+        """Commit the writes so far."""
+        self.set_meta('next_object', self.table.next_number)
+        self.set_meta('neuron_name_index', self.NM.neuron_name_index)
+        self.db.commit()
+
+    def close(self):
+        """Commit, and close the database."""
+        if self.db is None:
+            return
+        self.commit()
+        self.db.close()
+        self.db = None
+
+    def cache_neuron(self, neuron):
+        """Add a neuron to the LRU cache, evicting the least recently used if it is full."""
+        self.cache[neuron.name] = neuron
+        self.cache.move_to_end(neuron.name)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def put_neuron(self, neuron):
+        """Add, or replace, a neuron and its pattern index."""
+        name = neuron.name
+        self.db.execute("INSERT OR REPLACE INTO neurons (name, layer, empty_trigger, data) VALUES (?, ?, ?, ?)",
+            (name, neuron.layer, int(bool(neuron.test_pattern(set()))), json.dumps(encode_neuron(neuron))))
+        self.db.execute("DELETE FROM patterns WHERE neuron = ?", (name,))
+        self.db.execute("DELETE FROM pattern_labels WHERE neuron = ?", (name,))
+        for pattern_no in neuron.pattern:
+            pattern_dict = pattern_to_dict(neuron.pattern[pattern_no], neuron.pattern_labels[pattern_no])
+            self.db.execute("INSERT INTO patterns (neuron, pattern_no, size) VALUES (?, ?, ?)",
+                (name, pattern_no, sum(abs(coeff) for coeff in pattern_dict.values())))
+            self.db.executemany("INSERT INTO pattern_labels (label, neuron, pattern_no, coeff) VALUES (?, ?, ?, ?)",
+                [(label, name, pattern_no, coeff) for label, coeff in pattern_dict.items()])
+        self.cache.pop(name, None) # the neuron is read back when needed, rather than sharing the caller's copy
+
+    def get_neuron(self, name):
+        """Return the named neuron, or None if it is not in the store."""
+        neuron = self.cache.get(name)
+        if neuron is not None:
+            self.cache.move_to_end(name)
+            self.cache_hits += 1
+            return neuron
+        self.cache_misses += 1
+        row = self.db.execute("SELECT data FROM neurons WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        neuron = decode_neuron(json.loads(row[0]))
+        self.cache_neuron(neuron)
+        return neuron
+
+    def has_neuron(self, name):
+        """Return True if the named neuron is in the store."""
+        return name in self.cache or self.db.execute("SELECT 1 FROM neurons WHERE name = ?", (name,)).fetchone() is not None
+
+    def erase_neuron(self, name):
+        """Erase the named neuron. The synapses on its axon are kept, as in NM.erase_neuron()."""
+        self.cache.pop(name, None)
+        for table in ['neurons WHERE name', 'patterns WHERE neuron', 'pattern_labels WHERE neuron']:
+            self.db.execute(f"DELETE FROM {table} = ?", (name,))
+
+    def neuron_names(self, layer=None):
+        """Return the sorted neuron names, optionally only those in the given layer."""
+        if layer is None:
+            rows = self.db.execute("SELECT name FROM neurons ORDER BY name")
+        else:
+            rows = self.db.execute("SELECT name FROM neurons WHERE layer = ? ORDER BY name", (layer,))
+        return [row[0] for row in rows]
+
+    def put_synapse(self, synapse, NM=None):
+        """Add, or replace, a synapse. NM is the module it came from, if its parameters refer to it."""
+        self.db.execute("INSERT OR REPLACE INTO synapses (name, axon, data) VALUES (?, ?, ?)",
+            (synapse.name, synapse.axon_name, json.dumps(encode_synapse(synapse, self.NM if NM is None else NM, self.table))))
+
+    def get_synapse(self, name):
+        """Return the named synapse, or None if it is not in the store."""
+        row = self.db.execute("SELECT data FROM synapses WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return decode_synapse(json.loads(row[0]), self.NM, self.table)
+
+    def has_synapse(self, name):
+        """Return True if the named synapse is in the store."""
+        return self.db.execute("SELECT 1 FROM synapses WHERE name = ?", (name,)).fetchone() is not None
+
+    def erase_synapse(self, name):
+        """Erase the named synapse, and its aliases."""
+        self.db.execute("DELETE FROM synapses WHERE name = ?", (name,))
+        self.db.execute("DELETE FROM aliases WHERE source = ? OR destination = ?", (name, name))
+
+    def get_neuron_synapses(self, name):
+        """Return the sorted names of the synapses on the named neuron's axon."""
+        return [row[0] for row in self.db.execute("SELECT name FROM synapses WHERE axon = ? ORDER BY name", (name,))]
+
+    def add_synapse_alias(self, source_synapse_name, destination_synapse_name):
+        """Add a synapse alias, as in NM.add_synapse_alias()."""
+        self.db.execute("INSERT OR IGNORE INTO aliases (source, destination) VALUES (?, ?)", (source_synapse_name, destination_synapse_name))
+
+    def get_synapse_aliases(self, names):
+        """Return the aliases with a destination in names, as a list of (source, destination) pairs."""
+        aliases = []
+        for names_chunk in chunked(sorted(set(names))):
+            aliases += self.db.execute(f"SELECT source, destination FROM aliases WHERE destination IN ({','.join('?' * len(names_chunk))})", names_chunk).fetchall()
+        return aliases
+
+    def label_postings(self, labels):
+        """Return label -> {(neuron name, pattern number): coefficient} for the given labels, and the sizes of those patterns."""
+        postings = {}
+        sizes = {}
+        for labels_chunk in chunked(sorted(set(labels))):
+            rows = self.db.execute("SELECT pattern_labels.label, pattern_labels.neuron, pattern_labels.pattern_no, pattern_labels.coeff, patterns.size "
+                f"FROM pattern_labels JOIN patterns USING (neuron, pattern_no) WHERE pattern_labels.label IN ({','.join('?' * len(labels_chunk))})", labels_chunk)
+            for label, name, pattern_no, coeff, size in rows:
+                postings.setdefault(label, {})[(name, pattern_no)] = coeff
+                sizes[(name, pattern_no)] = size
+        return postings, sizes
+
+    def get_test_neurons(self, pattern):
+        """Given a pattern, return a sorted list of neuron names that are triggered by that pattern, as in NM.get_test_neurons().
+        Only the neurons with a pattern label in the pattern, or that trigger on an empty pattern, are read.
+        """
+        pattern = set(pattern)
+        postings, _ = self.label_postings(pattern)
+        candidates = {name for posting in postings.values() for name, _ in posting}
+        candidates.update(row[0] for row in self.db.execute("SELECT name FROM neurons WHERE empty_trigger = 1"))
+        return sorted(name for name in candidates if self.get_neuron(name).test_pattern(pattern))
+
+    def get_similar_neurons(self, query, k=10, threshold=0.0, measure='simm'):
+        """Return up to k (neuron name, score) pairs, for the neurons whose patterns are most similar to the query.
+        The scores are the same as those of NM.get_similar_neurons(), and only the patterns sharing a label with the query are read.
+        """
+        query_dict = query_to_dict(query)
+        postings, sizes = self.label_postings(query_dict)
+        return rank_pattern_scores(pattern_dict_scores(query_dict, postings, sizes, measure), k, threshold)
+
+    def import_module(self, NM):
+        """Add all the neurons, synapses and aliases of a module, and its defaults, to the store."""
+        self.set_meta('name', NM.name)
+        self.set_meta('defaults', encode_defaults(NM, self.table))
+        self.set_defaults(self.get_meta('defaults'))
+        self.NM.neuron_name_index = max(self.NM.neuron_name_index, NM.neuron_name_index)
+        for neuron in NM.neurons.values():
+            if neuron.valid:
+                self.put_neuron(neuron)
+        for synapse in list(NM.synapses.values()) + list(NM.new_synapses.values()):
+            self.put_synapse(synapse, NM)
+        for destination, sources in NM.synapse_alias_dict.items():
+            for source in sources:
+                self.add_synapse_alias(source, destination)
+        self.commit()
+
+    def load_into_module(self, NM, neuron_names=None, synapse_names=None):
+        """Load the given neurons, and the synapses on their axons, plus the given synapses, into the module.
+        If neuron_names and synapse_names are both None, load everything.
+        """
+        if neuron_names is None and synapse_names is None:
+            neuron_names = self.neuron_names()
+            synapse_names = [row[0] for row in self.db.execute("SELECT name FROM synapses")]
+        neuron_names = set(neuron_names or ())
+        synapse_names = set(synapse_names or ())
+        for name in neuron_names:
+            synapse_names.update(self.get_neuron_synapses(name))
+        NM.default_layer = self.NM.default_layer
+        for kind in ['trigger', 'pooling', 'synapse', 'action']:
+            setattr(NM, f"default_{kind}_fn", getattr(self.NM, f"default_{kind}_fn"))
+            setattr(NM, f"default_{kind}_params", getattr(self.NM, f"default_{kind}_params"))
+        NM.neuron_name_index = max(NM.neuron_name_index, self.NM.neuron_name_index)
+        for name in sorted(neuron_names):
+            neuron = self.get_neuron(name)
+            if neuron is not None:
+                NM[name] = decode_neuron(encode_neuron(neuron)) # a copy, so the module doesn't change the cached neuron
+        for name in sorted(synapse_names):
+            row = self.db.execute("SELECT data FROM synapses WHERE name = ?", (name,)).fetchone()
+            if row is not None:
+                NM[name] = decode_synapse(json.loads(row[0]), NM, self.table)
+        for source, destination in self.get_synapse_aliases(synapse_names):
+            NM.add_synapse_alias(source, destination)
+        NM.patch_in_new_synapses()
+        return NM
+
+    def export_module(self, NM=None):
+        """Return a module with everything in the store, in NM if given, else in a new module."""
+        if NM is None:
+            NM = NeuralModule(self.get_meta('name', 'sqlite store'))
+        return self.load_into_module(NM)
+
+    def from_map(self, s, verbose=False):
+        """Load the map string s into the store, as in NM.from_map().
+        Only the neurons and synapses the map mentions, and those on their axons, are read from the store.
+        """
+        neuron_names = set()
+        synapse_names = set()
+        for line in s.splitlines():
+            names = map_line_names(line.strip())
+            if names is not None:
+                neuron_names.update(names[0])
+                synapse_names.update(names[1])
+        NM = NeuralModule(self.NM.name)
+        self.load_into_module(NM, neuron_names, synapse_names)
+        for name in list(NM.synapses): # NM.update_synapse_layers() needs the neurons the synapses are named after
+            neuron_name = strip_synapse(name)
+            if neuron_name not in NM.neurons and self.has_neuron(neuron_name):
+                NM[neuron_name] = decode_neuron(encode_neuron(self.get_neuron(neuron_name)))
+        NM.from_map(s, verbose)
+        for neuron in NM.neurons.values():
+            self.put_neuron(neuron)
+        for synapse in NM.synapses.values():
+            self.put_synapse(synapse, NM)
+        for destination, sources in NM.synapse_alias_dict.items():
+            for source in sources:
+                self.add_synapse_alias(source, destination)
+        self.commit()
+
+    def import_json(self, filename):
+        """Import a module saved by NM.save_as_json()."""
+        NM = NeuralModule('json import')
+        NM.load_from_json(filename)
+        self.import_module(NM)
+
+    def export_json(self, filename, grouped=True):
+        """Export the store as a module json file, as by NM.save_as_json()."""
+        self.export_module().save_as_json(filename, grouped)
+
+    def import_chunk(self, filename):
+        """Import a module saved by NM.save_as_chunk()."""
+        NM = NeuralModule('chunk import')
+        NM.load_from_chunk(filename)
+        self.import_module(NM)
+
+    def export_chunk(self, filename):
+        """Export the store as a module chunk file, as by NM.save_as_chunk()."""
+        self.export_module().save_as_chunk(filename)
+
+    def __str__(self):
+        s = f"SQLite store: {self.filename}\n"
+        s += f"    neurons: {len(self)}\n"
+        s += f"    synapses: {self.db.execute('SELECT COUNT(*) FROM synapses').fetchone()[0]}\n"
+        s += f"    pattern labels: {self.db.execute('SELECT COUNT(DISTINCT label) FROM pattern_labels').fetchone()[0]}\n"
+        s += f"    cache: {len(self.cache)} of {self.cache_size} neurons, {self.cache_hits} hits, {self.cache_misses} misses\n"
+        return s
@@ -0,0 +1,200 @@
+"""Implement a sparse superposition type, backed by interned label ids and a compact coefficient array."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+from array import array
+from itertools import compress
+
+label_ids = {} # label -> id, shared by all superpositions
+id_labels = [] # id -> label
+
+def intern_label(label):
+    """Return the integer id of the label, adding it to the label table if needed."""
+    label_id = label_ids.get(label)
+    if label_id is None:
+        label_id = len(id_labels)
+        label_ids[label] = label_id
+        id_labels.append(label)
+    return label_id
+
+class Superposition:
+    """A sparse superposition, a list of distinct labels with float coefficients, in insertion order.
+
+    Labels are stored as interned integer ids, and coefficients in an array of doubles. Repeated labels are added together.
+    The parallel coeffs and labels lists used by neuron patterns are available from to_lists().
+    """
+    __slots__ = ['ids', 'coeffs', 'positions']
+
+    def __init__(self, coeffs=None, labels=None):
+        self.ids = array('l')
+        self.coeffs = array('d')
+        self.positions = {} # label id -> index into ids and coeffs, or None until needed
+        if labels is not None:
+            if coeffs is None:
+                coeffs = [1] * len(labels)
+            ids = [label_ids[label] if label in label_ids else intern_label(label) for label in labels]
+            if len(set(ids)) == len(ids) and len(coeffs) == len(ids): # the usual case, no repeated labels
+                self.ids = array('l', ids)
+                self.coeffs = array('d', coeffs)
+                self.positions = None
+            else:
+                for coeff, label_id in zip(coeffs, ids):
+                    self.add_id(label_id, coeff)
+
+    @classmethod
+    def from_ids(cls, ids, coeffs):
+        """Construct a superposition directly from distinct label ids and their coefficients."""
+        sp = cls()
+        sp.ids = array('l', ids)
+        sp.coeffs = array('d', coeffs)
+        sp.positions = None
+        return sp
+
+    def get_positions(self):
+        """Return the dictionary of label id -> index, building it if needed."""
+        if self.positions is None:
+            self.positions = {label_id: k for k, label_id in enumerate(self.ids)}
+        return self.positions
+
+    def add_id(self, label_id, coeff):
+        """Add coeff to the coefficient of the given label id, in place."""
+        positions = self.get_positions()
+        position = positions.get(label_id)
+        if position is None:
+            positions[label_id] = len(self.ids)
+            self.ids.append(label_id)
+            self.coeffs.append(coeff)
+        else:
+            self.coeffs[position] += coeff
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        """Iterate over the (coeff, label) pairs."""
+        for label_id, coeff in zip(self.ids, self.coeffs):
+            yield coeff, id_labels[label_id]
+
+    def __contains__(self, label):
+        label_id = label_ids.get(label)
+        return label_id is not None and label_id in self.get_positions()
+
+    def __eq__(self, other):
+        if not isinstance(other, Superposition):
+            return NotImplemented
+        return self.ids == other.ids and self.coeffs == other.coeffs
+
+    def get(self, label, default=0):
+        """Return the coefficient of the label, or default if it is not in the superposition."""
+        position = self.get_positions().get(label_ids.get(label))
+        if position is None:
+            return default
+        return self.coeffs[position]
+
+    def labels(self):
+        """Return the list of labels."""
+        return [id_labels[label_id] for label_id in self.ids]
+
+    def to_lists(self):
+        """Return the superposition as parallel coeffs and labels lists."""
+        return list(self.coeffs), self.labels()
+
+    def to_dict(self):
+        """Return the superposition as a dictionary of label -> coefficient."""
+        return {id_labels[label_id]: coeff for label_id, coeff in zip(self.ids, self.coeffs)}
+
+    def copy(self):
+        """Return a copy of the superposition."""
+        sp = Superposition()
+        sp.ids = array('l', self.ids)
+        sp.coeffs = array('d', self.coeffs)
+        sp.positions = None if self.positions is None else dict(self.positions)
+        return sp
+
+    def clean(self):
+        """Return the superposition with all coefficients set to 1."""
+        return Superposition.from_ids(self.ids, [1] * len(self.ids))
+
+    def normalize(self, t=1):
+        """Return the superposition rescaled so the sum of the coefficients is t."""
+        coeff_sum = sum(self.coeffs)
+        if coeff_sum == 0:
+            return self.copy()
+        return Superposition.from_ids(self.ids, [coeff * t / coeff_sum for coeff in self.coeffs])
+
+    def rescale(self, t=1):
+        """Return the superposition rescaled so the max coefficient is t."""
+        if len(self.coeffs) == 0:
+            return self.copy()
+        coeff_max = max(self.coeffs)
+        if coeff_max == 0:
+            return self.copy()
+        return Superposition.from_ids(self.ids, [coeff * t / coeff_max for coeff in self.coeffs])
+
+    def drop_below(self, threshold):
+        """Return the superposition without the labels that have coeff < threshold."""
+        keep = [coeff >= threshold for coeff in self.coeffs]
+        return Superposition.from_ids(list(compress(self.ids, keep)), list(compress(self.coeffs, keep)))
+
+    def add(self, other):
+        """Return the sum of this superposition and other."""
+        sp = self.copy()
+        for label_id, coeff in zip(other.ids, other.coeffs):
+            sp.add_id(label_id, coeff)
+        return sp
+
+    def union(self, other):
+        """Return the 'or' of this superposition and other, their labels in sorted order, with coefficients 1."""
+        ids = sorted(set(self.ids).union(other.ids), key=id_labels.__getitem__)
+        return Superposition.from_ids(ids, [1] * len(ids))
+
+    def dot(self, other):
+        """Return the dot product of this superposition and other."""
+        if len(other) < len(self):
+            self, other = other, self
+        positions = other.get_positions()
+        coeffs = other.coeffs
+        total = 0
+        for label_id, coeff in zip(self.ids, self.coeffs):
+            position = positions.get(label_id)
+            if position is not None:
+                total += coeff * coeffs[position]
+        return total
+
+    def simm(self, other):
+        """Return the list simm of this superposition and other, over the union of their labels, as in trigger_list_simm_threshold()."""
+        s1 = sum(abs(coeff) for coeff in self.coeffs)
+        s2 = sum(abs(coeff) for coeff in other.coeffs)
+        if s1 == 0 or s2 == 0:
+            return 0
+        positions = other.get_positions()
+        coeffs = other.coeffs
+        total = 0
+        for label_id, coeff in zip(self.ids, self.coeffs): # only the shared labels contribute
+            position = positions.get(label_id)
+            if position is not None:
+                a = coeff / s1
+                b = coeffs[position] / s2
+                total += (abs(a) + abs(b) - abs(a - b)) / 2
+        return total
+
+    def __add__(self, other):
+        return self.add(other)
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __str__(self):
+        if len(self.ids) == 0:
+            return '|>'
+        return ' + '.join(f"{'' if coeff == 1 else coeff}|{id_labels[label_id]}>" for label_id, coeff in zip(self.ids, self.coeffs))
+
+    def __repr__(self):
+        return f"Superposition({list(self.coeffs)}, {self.labels()})"
+
+def as_superposition(coeffs, labels=None):
+    """Return coeffs unchanged if it is already a superposition, else build one from the coeffs and labels lists."""
+    if isinstance(coeffs, Superposition):
+        return coeffs
+    return Superposition(coeffs, labels)
@@ -1,12 +1,13 @@
 """Implement a single synapse."""
 # Author: Garry Morrison
 # Created: 2024-9-18
-# Updated: 2024-10-25
+# Updated: 2026-10-19
 
 import json
 from .parse_simple_sdb import sp_dict_to_sp
 from .synapse_fn import synapse_inverse_fn_map, synapse_fn_map
-from .action_fn import action_inverse_fn_map, action_fn_map
+from .output_sink import default_output_sink
+from .action_fn import action_inverse_fn_map, action_fn_map, action_dispatch_mode, action_render_fn, ACTION_NEVER, ACTION_POSITIVE
 
 class Synapse:
     """Implements a single reductionist synapse."""
@@ -21,6 +22,9 @@ class Synapse:
         self.spike_history = []
         self.action_fn = synapse_action_type
         self.action_params = action_params
+        self.action_mode = action_dispatch_mode(synapse_action_type)
+        self.action_render_fn = action_render_fn(synapse_action_type)
+        self.output_sink = default_output_sink
 
     def get_parent_axon_name(self):
         """Return the name of the parent axon/neuron."""
@@ -51,6 +55,16 @@ class Synapse:
         """Update the synapse action."""
         self.action_fn = action_fn
         self.action_params = action_params
+        self.action_mode = action_dispatch_mode(action_fn)
+        self.action_render_fn = action_render_fn(action_fn)
+
+    def set_output_sink(self, sink):
+        """Set the output sink used by print actions."""
+        self.output_sink = sink
+
+    def get_output_sink(self):
+        """Return the output sink used by print actions."""
+        return self.output_sink
 
     def append_to_history(self, value):
         """Append to the spike history list, just used for testing."""
@@ -64,17 +78,32 @@ class Synapse:
         """Set the spike history. Eg, used if adding a new synapse part way through a run."""
         self.spike_history = spike_history
 
-    def update_spike_history(self, neurons):
-        """Given a dictionary of neurons, calculate and update the spike history list.
-        Followed by applying the desired action.
+    def update_spike_value(self, neurons):
+        """Given a dictionary of neurons, calculate and update the spike history list, and return the new value.
+        Unlike update_spike_history(), the action is not applied.
         """
         if self.axon_name not in neurons:
             self.spike_history.append(0)
-            self.action_fn(self, 0, **self.action_params) # do we want this, or comment it out?
-            return
+            return 0
         value = self.synapse_fn(neurons[self.axon_name].axon, **self.params)
         self.spike_history.append(value)
-        self.action_fn(self, value, **self.action_params)
+        return value
+
+    def should_fire(self, value):
+        """Return True if the action should be invoked for the given synapse value."""
+        if self.action_mode == ACTION_NEVER:
+            return False
+        if self.action_mode == ACTION_POSITIVE:
+            return value > 0
+        return True
+
+    def update_spike_history(self, neurons):
+        """Given a dictionary of neurons, calculate and update the spike history list.
+        Followed by applying the desired action.
+        """
+        value = self.update_spike_value(neurons)
+        if self.should_fire(value):
+            self.action_fn(self, value, **self.action_params)
 
     def as_chunk(self, default_synapse_fn=None, default_synapse_params=None, default_action_fn=None, default_action_params=None):
         """Output the synapse in chunk notation."""
@@ -148,8 +177,7 @@ class Synapse:
                         action_fn_str = value['action']
                         action_fn = action_fn_map[action_fn_str]
                         del value['action']
-                        constructed_synapse.action_fn = action_fn
-                        constructed_synapse.action_params = value
+                        constructed_synapse.update_action(action_fn, value)
                     except Exception as e:
                         print(e)
             except Exception as e:
@@ -0,0 +1,149 @@
+"""Generate synthetic workloads as map rules, chunks, and JSON modules."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import json
+import random
+
+workload_delay_distributions = ['none', 'uniform', 'geometric']
+
+def workload_delay(rng, max_delay, delay_distribution):
+    """Return a random delay in [0, max_delay] using the given distribution."""
+    if max_delay <= 0 or delay_distribution == 'none':
+        return 0
+    if delay_distribution == 'geometric': # each extra time step of delay is half as likely
+        delay = 0
+        while delay < max_delay and rng.random() < 0.5:
+            delay += 1
+        return delay
+    return rng.randint(0, max_delay)
+
+def workload_layer_range(layer, neuron_count, layer_depth):
+    """Return the (start, end) neuron index range of the given layer."""
+    start = -(-layer * neuron_count // layer_depth)
+    end = -(-(layer + 1) * neuron_count // layer_depth)
+    return start, end
+
+def generate_neurons(neuron_count, patterns_per_neuron=1, fan_in=3, max_delay=0, delay_distribution='uniform', layer_depth=4, seed=0):
+    """Yield (name, layer, patterns) for each neuron of a synthetic module, where patterns is a list of [(coeff, input_name, delay), ...]."""
+    rng = random.Random(seed)
+    layer_depth = max(1, min(layer_depth, neuron_count))
+    for layer in range(layer_depth):
+        start, end = workload_layer_range(layer, neuron_count, layer_depth)
+        if layer > 0:
+            input_start, input_end = workload_layer_range(layer - 1, neuron_count, layer_depth)
+            input_count = input_end - input_start
+        for k in range(start, end):
+            if layer == 0: # input neurons have no patterns
+                yield f"n{k}", 0, []
+                continue
+            patterns = []
+            for _ in range(patterns_per_neuron):
+                if input_count >= fan_in:
+                    inputs = rng.sample(range(input_start, input_end), fan_in)
+                else:
+                    inputs = [rng.randrange(input_start, input_end) for _ in range(fan_in)]
+                patterns.append([(1, f"n{idx}", workload_delay(rng, max_delay, delay_distribution)) for idx in inputs])
+            yield f"n{k}", layer, patterns
+
+def generate_aliases(neuron_count, alias_density=0.0, fan_in=3, max_delay=0, delay_distribution='uniform', layer_depth=4, seed=0):
+    """Yield (name, targets) for round(alias_density * neuron_count) alias neurons, where targets is a list of (coeff, target_name, delay)."""
+    rng = random.Random(seed + 1)
+    layer_depth = max(1, min(layer_depth, neuron_count))
+    for k in range(round(alias_density * neuron_count)):
+        start, end = workload_layer_range(rng.randrange(layer_depth), neuron_count, layer_depth)
+        targets = [(1, f"n{rng.randrange(start, end)}", workload_delay(rng, max_delay, delay_distribution)) for _ in range(fan_in)]
+        yield f"alias {k}", targets
+
+def pattern_to_seq(pattern, synapse_suffix=''):
+    """Convert a list of (coeff, name, delay) into a SDB sequence, where position in the sequence encodes the delay."""
+    max_delay = max(delay for _, _, delay in pattern)
+    delay_kets = [[] for _ in range(max_delay + 1)]
+    for coeff, name, delay in pattern:
+        coeff_str = '' if coeff == 1 else str(coeff)
+        delay_kets[delay].append(f"{coeff_str}|{name}{synapse_suffix}>")
+    return ' . '.join(' + '.join(kets) if len(kets) > 0 else '|>' for kets in reversed(delay_kets))
+
+def write_workload_map(f, neuron_count, patterns_per_neuron=1, fan_in=3, max_delay=0, delay_distribution='uniform', layer_depth=4, alias_density=0.0, seed=0):
+    """Stream a synthetic module to the file object f in map notation."""
+    f.write(f"-- synthetic workload: {neuron_count} neurons, seed {seed}\n")
+    for name, layer, patterns in generate_neurons(neuron_count, patterns_per_neuron, fan_in, max_delay, delay_distribution, layer_depth, seed):
+        for pattern in patterns:
+            f.write(f"{pattern_to_seq(pattern)} => |{name}>\n")
+    for name, targets in generate_aliases(neuron_count, alias_density, fan_in, max_delay, delay_distribution, layer_depth, seed):
+        f.write(f"|{name}> |=> {' . '.join(f'|{target}>' for _, target, _ in targets)}\n")
+
+def write_workload_chunk(f, neuron_count, patterns_per_neuron=1, fan_in=3, max_delay=0, delay_distribution='uniform', layer_depth=4, seed=0):
+    """Stream a synthetic module to the file object f in chunk notation."""
+    f.write("\nas default:\n")
+    f.write("    layer => |0>\n")
+    f.write("    trigger_fn => |trigger: min_simm> + |threshold: 0.98>\n")
+    f.write("    pooling_fn => |pooling: or>\n")
+    f.write("    synapse_fn => |synapse: identity> + |sign: 1>\n")
+    f.write("    action_fn => |action: null>\n")
+    f.write("end:\n")
+    for name, layer, patterns in generate_neurons(neuron_count, patterns_per_neuron, fan_in, max_delay, delay_distribution, layer_depth, seed):
+        s = f"\nas neuron |{name}>:\n"
+        if layer != 0:
+            s += f"    layer => |{layer}>\n"
+        if len(patterns) == 0:
+            s += "    pattern => |>\n"
+        for pattern in patterns:
+            s += f"    pattern => {pattern_to_seq(pattern)}\n"
+        s += "end:\n"
+        s += f"\nas synapse |{name} S0>:\n"
+        s += f"    axon => |{name}>\n"
+        s += "end:\n"
+        f.write(s)
+
+def workload_defaults_dict():
+    """Return the defaults used by the JSON workloads."""
+    return {
+        'layer': 0,
+        'pooling_fn': {'pooling': 'or'},
+        'trigger_fn': {'trigger': 'min_simm', 'threshold': 0.98},
+        'synapse_fn': {'synapse': 'identity', 'sign': 1},
+        'action_fn': {'action': 'null'},
+    }
+
+def workload_neuron_dict(name, layer, patterns):
+    """Return the neuron dictionary, in the format of Neuron.as_dict()."""
+    pattern_dicts = []
+    if len(patterns) == 0:
+        pattern_dicts.append({'trigger_fn': {'trigger': 'min_simm', 'threshold': 0.98}, 'coeffs': [1], 'synapse_labels': ['#OFF#']})
+    for pattern in patterns:
+        pattern_dicts.append({
+            'trigger_fn': {'trigger': 'min_simm', 'threshold': 0.98},
+            'coeffs': [coeff for coeff, _, _ in pattern],
+            'synapse_labels': [f"{input_name} S0 D{delay}" for _, input_name, delay in pattern],
+        })
+    return {'name': name, 'layer': layer, 'activation_count': 0, 'pooling_fn': {'pooling': 'or'}, 'patterns': pattern_dicts}
+
+def workload_synapse_dict(name, layer):
+    """Return the S0 synapse dictionary for the given neuron, in the format of Synapse.as_dict()."""
+    return {'synapse_name': f"{name} S0", 'axon': name, 'layer': layer, 'synapse_fn': {'synapse': 'identity', 'sign': 1}, 'action_fn': {'action': 'null'}}
+
+def write_json_list(f, key, items):
+    """Stream a JSON list, one item per line."""
+    f.write(f',\n    "{key}": [')
+    separator = '\n        '
+    for item in items:
+        f.write(separator)
+        f.write(json.dumps(item))
+        separator = ',\n        '
+    f.write('\n    ]')
+
+def write_workload_json(f, neuron_count, patterns_per_neuron=1, fan_in=3, max_delay=0, delay_distribution='uniform', layer_depth=4, seed=0, grouped=True):
+    """Stream a synthetic module to the file object f as a grouped or flat JSON module."""
+    json_type = 'grouped' if grouped else 'flat'
+    f.write(f'{{\n    "json_type": "{json_type}",\n    "defaults": {json.dumps(workload_defaults_dict())}')
+    params = (neuron_count, patterns_per_neuron, fan_in, max_delay, delay_distribution, layer_depth, seed)
+    if grouped:
+        groups = ({'neuron': workload_neuron_dict(name, layer, patterns), 'synapses': [workload_synapse_dict(name, layer)]}
+                  for name, layer, patterns in generate_neurons(*params))
+        write_json_list(f, 'neuron_synapse_groups', groups)
+    else: # flat mode walks the neurons twice, rather than holding them in memory:
+        write_json_list(f, 'neurons', (workload_neuron_dict(name, layer, patterns) for name, layer, patterns in generate_neurons(*params)))
+        write_json_list(f, 'synapses', (workload_synapse_dict(name, layer) for name, layer, _ in generate_neurons(*params)))
+    f.write('\n}\n')
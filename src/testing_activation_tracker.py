@@ -0,0 +1,57 @@
+"""Testing the activation tracker, and activation reports, top k queries and pruning that use it."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import io
+import time
+import random
+import synaptiflux as sf
+
+def workload_module(n):
+    """Return a workload module with n neurons."""
+    f = io.StringIO()
+    sf.write_workload_chunk(f, n, patterns_per_neuron=2, fan_in=3, seed=1)
+    NM = sf.NeuralModule('workload')
+    NM.from_chunk(f.getvalue())
+    NM.patch_in_new_synapses()
+    return NM
+
+if __name__ == '__main__':
+    print('Testing the activation tracker ...')
+
+    # run two copies of a module with the same pokes, one tracked, one not:
+    NM = workload_module(2000)
+    NM2 = workload_module(2000)
+    tracker = NM2.enable_activation_tracking(half_life=20)
+    random.seed(3)
+    names = sorted(NM.neurons)
+    for _ in range(200):
+        pokes = random.sample(names, 20)
+        NM.poke_neurons(pokes)
+        NM2.poke_neurons(pokes)
+        NM.update_system(1)
+        NM2.update_system(1)
+    print(tracker)
+    print(f"same activation reports: {NM.activation_report(0) == NM2.activation_report(0)}")
+    print(NM2.activation_report(6))
+    print(f"top 5: {tracker.top(5)}")
+    print(tracker.rate_report(5))
+
+    # reports only visit the neurons they return:
+    for module in [NM, NM2]:
+        start = time.perf_counter()
+        for _ in range(100):
+            module.activation_report(6)
+        end = time.perf_counter()
+        print(f"tracked: {module.activation_tracker is not None} activation report: {(end - start) * 10:.3f} ms")
+
+    # pruning by count, then by recent rate:
+    print("\n----------------------------------------")
+    NM.prune(3)
+    NM2.prune(3)
+    print(f"after pruning by count: {len(NM2.neurons)} neurons, same as untracked: {sorted(NM.neurons) == sorted(NM2.neurons)}")
+    NM2.prune_by_rate(0.01)
+    print(f"after pruning by rate: {len(NM2.neurons)} neurons, tracked: {len(tracker)}")
+    print(f"lowest remaining rate: {min(tracker.rate(name) for name in NM2.neurons):.4f}")
+    NM.prune_by_rate(0.01) # needs activation tracking with a half life
@@ -0,0 +1,54 @@
+"""Test applying an operator to all selected neuron patterns in a neural module, and that the indexes stay consistent."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+
+def index_snapshot(NM):
+    """Return a copy of the module pattern indexes, for comparison with a fresh reindex()."""
+    return ({key: set(value) for key, value in NM.synapse_consumers.items()}, {key: set(value) for key, value in NM.pattern_index.items()})
+
+def print_patterns(NM):
+    """Print each neuron's patterns."""
+    for name, neuron in NM.neurons.items():
+        for k in range(neuron.pattern_count):
+            print(f"    {name} {k}: {list(zip(neuron.pattern[k], neuron.pattern_labels[k]))}")
+
+if __name__ == '__main__':
+    print('Testing apply_operator_all():')
+    NM = sf.NeuralModule('operators')
+    NM.add_neuron('alpha', 0, [1, 2, 3], ['a', 'b', 'c'], sf.trigger_list_simm_threshold, {'threshold': 0.9}, sf.pooling_or, {})
+    NM.append_neuron_pattern('alpha', [4, 1], ['a', 'd'], sf.trigger_list_simm_threshold, {'threshold': 0.9})
+    NM.add_neuron('beta', 1, [5, 1, 1], ['b', 'c', 'e'], sf.trigger_list_min_simm_threshold, {'threshold': 0.98}, sf.pooling_or, {})
+    NM.add_neuron('gamma', 1, [2, 2], ['a', 'e'], sf.trigger_dot_product_threshold, {'threshold': 1}, sf.pooling_or, {})
+    NM.get_similar_neurons('|a>') # build the similarity index, so it is updated too
+    print_patterns(NM)
+
+    print("\nnormalize(10), layer 1:")
+    print(f"    changed: {NM.apply_operator_all(sf.operator_normalize, {'t': 10}, {'layers': 1})}")
+    print_patterns(NM)
+
+    print("\nrescale(1), trigger simm:")
+    print(f"    changed: {NM.apply_operator_all(sf.operator_rescale, {'t': 1}, {'trigger': 'simm'})}")
+    print_patterns(NM)
+
+    print("\ndrop-below(0.5), all patterns:")
+    print(f"    changed: {NM.apply_operator_all(sf.operator_drop_below, {'threshold': 0.5})}")
+    print_patterns(NM)
+
+    print("\nclean, prefix 'g':")
+    print(f"    changed: {NM.apply_operator_all(sf.operator_clean, {}, {'prefix': 'g'})}")
+    print_patterns(NM)
+
+    print("\nadd |z>, to pattern 0 only:")
+    print(f"    changed: {NM.apply_operator_all(sf.operator_add, {'coeffs1': [1], 'labels1': ['z']}, lambda name, neuron, k: k == 0)}")
+    print_patterns(NM)
+
+    print("\nunknown trigger:")
+    print(f"    changed: {NM.apply_operator_all(sf.operator_clean, {}, {'trigger': 'fuzzy'})}")
+
+    print(f"\nsimilar to |z>: {NM.get_similar_neurons('|z>')}")
+    indexes = index_snapshot(NM)
+    NM.reindex()
+    print(f"indexes match reindex(): {indexes == index_snapshot(NM)}")
@@ -0,0 +1,60 @@
+"""Test the asyncio driver, with pokes from an async producer and an output subscriber."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import asyncio
+import synaptiflux as sf
+
+def ping_pong_system():
+    """Return a neural system where poking !ping! produces !pong! one step later."""
+    NM = sf.NeuralModule('ping pong module')
+    NM.add_source('#OFF#', sf.source_off())
+    NM.set_default_trigger(sf.trigger_dot_product_threshold, {'threshold': 1})
+    NM.set_default_pooling(sf.pooling_or, {})
+    NM.set_default_synapse(sf.synapse_identity, {'sign': 1})
+    NM.set_default_action(sf.action_null, {})
+    NM.add_default_neuron('ping', 0, [1], ['#OFF#'])
+    NM.add_default_synapse('ping S0', 'ping')
+    NM.add_default_neuron('pong', 1, [1], ['ping S0'])
+    NM.add_default_synapse('pong S0', 'pong')
+    NM.patch_in_new_synapses()
+
+    NS = sf.NeuralSystem('ping pong system')
+    NS.register_module('ping pong module', NM)
+    NS.register_module_input('ping pong module', '!ping!', 'ping')
+    NS.register_module_output('ping pong module', 'pong S0', '!pong!')
+    return NS
+
+async def producer(driver, pokes):
+    """Poke the !ping! channel, yielding to the driver between pokes."""
+    for _ in range(pokes):
+        await driver.poke('!ping!')
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+async def subscriber(queue, count):
+    """Print the first count output events."""
+    for _ in range(count):
+        tick, channel, value = await queue.get()
+        print(f"    tick {tick}: {channel} = {value}")
+
+async def main():
+    driver = sf.AsyncDriver(ping_pong_system())
+    queue = driver.subscribe(['!pong!'])
+    await asyncio.gather(driver.run(ticks=12), producer(driver, 3), subscriber(queue, 6))
+    stats = driver.stats()
+    print(f"ticks: {stats['ticks']}, events received: {stats['events_received']}, published: {stats['published']}")
+
+    # now a rate limited driver, with pokes from the event loop that overflow a small queue:
+    driver = sf.AsyncDriver(ping_pong_system(), rate=500, max_queued=2)
+    accepted = [driver.poke_nowait('!ping!') for _ in range(4)]
+    print(f"\naccepted pokes: {accepted}")
+    await driver.run(ticks=10)
+    stats = driver.stats()
+    print(f"ticks: {stats['ticks']}, events received: {stats['events_received']}, events dropped: {stats['events_dropped']}")
+
+
+if __name__ == '__main__':
+    print("Testing the asyncio driver:")
+    asyncio.run(main())
@@ -0,0 +1,25 @@
+"""Test capacity bounded learning with action_store_buffer, under the lru, lfu and rate eviction policies."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+import synaptiflux.systems.system_print_sequence
+
+if __name__ == '__main__':
+    print('Testing capacity bounded learning:')
+    seq = 'ab, cd, ab, ef, gh, ab, cd, ij, ab, kl!'
+    print(f"The sequence to process: {seq}")
+    for policy in sf.capacity_policies:
+        print("\n----------------------------------------")
+        print(f"policy: {policy}")
+        NS = sf.systems.system_print_sequence.system_symbol_sequence('capacity system', seq, ' ,.!?', verbose=False)
+        NM = NS.modules['print symbols module']
+        tracker = sf.CapacityTracker(max_neurons=3, policy=policy, window=10)
+        NM.set_capacity_tracker(tracker)
+        NS.update_system(len(seq) + 5)
+        print()
+        print(tracker)
+        print(f"evicted: {tracker.get_evicted()}")
+        print(f"learned neurons kept: {sorted(tracker.tracked)}")
+        print(f"neurons still in the module: {all(name in NM.neurons for name in tracker.tracked)}")
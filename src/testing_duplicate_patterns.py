@@ -0,0 +1,31 @@
+"""Test duplicate pattern detection, when loading the same map rules twice."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+
+def pattern_count(NM):
+    """Return the total number of neuron patterns in the module."""
+    return sum(neuron.pattern_count for neuron in NM.neurons.values())
+
+if __name__ == '__main__':
+    print('Testing duplicate pattern detection:')
+    map_str = """
+|a> . |b> => |ab>
+|b> + |a> => |a and b>
+|c> => |ab>
+"""
+    for mode in sf.duplicate_pattern_modes:
+        NM = sf.NeuralModule(f"duplicate patterns {mode}")
+        NM.set_duplicate_patterns(mode)
+        NM.from_map(map_str)
+        NM.from_map(map_str) # load the same rules again
+        NM.from_map("|a> + |b> => |a and b>") # the same pattern, with the labels in a different order
+        print(f"\nmode: {mode}")
+        print(f"    patterns: {pattern_count(NM)}")
+        for name in ['ab', 'a and b']:
+            neuron = NM.neurons[name]
+            print(f"    {name}: {list(neuron.pattern_labels.values())}, activation count: {neuron.get_activation_count()}")
+        duplicate = NM.find_duplicate_pattern([1, 1], ['a S0 D0', 'b S0 D0'], sf.trigger_list_min_simm_threshold, {'threshold': 0.98})
+        print(f"    duplicate of |a> + |b>: {duplicate}")
@@ -0,0 +1,50 @@
+"""Test the function registry, and plugging in user defined trigger and action functions."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+
+def trigger_overlap_threshold(list1, list2, threshold):
+    """Return 1 if the number of positions where both lists are non-zero is at least threshold, else 0."""
+    overlap = sum(1 for x, y in zip(list1, list2) if x != 0 and y != 0)
+    return int(overlap >= threshold)
+
+def action_shout(synapse, value, s):
+    """Print the string in upper case, if value > 0."""
+    if value > 0:
+        sf.output_sink_of(synapse).write(f'{s.upper()}!\n')
+
+def action_shout_render(synapse, value, s):
+    """Render the shout action to a string."""
+    return f'{s.upper()}!\n'
+
+if __name__ == '__main__':
+    print('Testing the function registry:')
+    for kind in sf.fn_kinds:
+        print(f"\n{kind} functions:")
+        for info in sf.registered_fns[kind].values():
+            print(f"    {info}")
+
+    print('\nRegistering user defined functions:')
+    print(f"    {sf.register_fn('trigger', 'overlap', trigger_overlap_threshold)}")
+    print(f"    {sf.register_fn('action', 'shout', action_shout, positive_only=True, render_fn=action_shout_render)}")
+    print(f"    lookup overlap: {sf.lookup_fn('trigger', 'overlap').__name__}")
+    print(f"    shout dispatch mode: {sf.action_dispatch_mode(action_shout)}, has render fn: {sf.action_render_fn(action_shout) is not None}")
+    print(f"    batch fn of simm: {sf.get_batch_fn('trigger', 'simm')}")
+    print(f"    check overlap params: {sf.get_fn_info('trigger', 'overlap').check_params({'threshold': 2})}")
+    print(f"    check shout params: {sf.get_fn_info('action', action_shout).check_params({'text': 'hi'})}")
+    print(f"    unknown kind: {sf.register_fn('neuron', 'x', action_shout)}")
+
+    print('\nUsing them in a neural module:')
+    NM = sf.NeuralModule('registry')
+    NM.add_source('#ON#', sf.source_on())
+    NM.add_neuron('greet', 0, [1, 1, 1], ['#ON#', 'a', 'b'], trigger_overlap_threshold, {'threshold': 1}, sf.pooling_or, {})
+    NM.add_synapse('greet S0', 'greet', sf.synapse_identity, {'sign': 1}, action_shout, {'s': 'hello'})
+    NM.update_system(2)
+    print(NM.as_flat_json())
+
+    NM2 = sf.NeuralModule('registry copy')
+    NM2.from_flat_dict(NM.as_flat_dict())
+    print(f"trigger fn after reload: {NM2.neurons['greet'].trigger_fn[0].__name__}")
+    print(f"action fn after reload: {NM2.synapses['greet S0'].action_fn.__name__}")
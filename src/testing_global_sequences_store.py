@@ -0,0 +1,25 @@
+"""Testing the global sequences retention limit and range queries."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+
+if __name__ == '__main__':
+    print('Testing the global sequences store ...')
+
+    NM = sf.NeuralModule('testing global sequences store')
+    NM.from_map('|H> . |i> => |Greetings!>', verbose=False)
+    for _ in range(3):
+        NM.poke_neuron_sequence(['H', 'i'])
+        NM.update_system(4)
+    NM.print_global_sequences(layers=None)
+
+    # range queries by layer and time window:
+    print('Layer 0, time steps 4 to 8:')
+    for time_step, labels in NM.get_global_sequence(0, 4, 8):
+        print(f'    {time_step}: {labels}')
+
+    # only keep the most recent 3 entries per layer:
+    NM.set_global_sequences_retention(3)
+    NM.print_global_sequences(layers=None)
@@ -0,0 +1,83 @@
+"""Testing journaled persistence of neural modules."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import os
+import io
+import json
+import tempfile
+import contextlib
+import synaptiflux as sf
+import synaptiflux.systems.system_print_sequence
+
+def module_structure(NM):
+    """Return the structure of a module, for comparisons, ignoring its name and activation counts."""
+    NM.patch_in_new_synapses()
+    state = sf.encode_module(NM, sf.ObjectTable())
+    del state['name']
+    for neuron in state['neurons']:
+        del neuron['activation_count']
+    return json.dumps(state, sort_keys=True)
+
+def file_sizes(path):
+    """Return the sizes of the snapshot and journal files."""
+    return {os.path.basename(filename): os.path.getsize(filename) for filename in sf.journal_paths(path) if os.path.exists(filename)}
+
+if __name__ == '__main__':
+    print('Testing journaled persistence ...')
+    directory = tempfile.mkdtemp()
+
+    # journal the print symbols module of our sequence system, which learns the stored sequences as it runs:
+    NS = sf.systems.system_print_sequence.system_symbol_sequence('example sequence system', 'Hello, World! Hi, Fred.', ' ,.!?', verbose=False)
+    NM = NS.modules['print symbols module']
+    path = os.path.join(directory, 'print symbols')
+    journal = sf.ModuleJournal(NM, path, compact_interval=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        NS.update_system(30)
+    print(journal)
+    print(f"files: {file_sizes(path)}")
+    journal.close()
+
+    # load it into an empty module:
+    NM2 = sf.NeuralModule('empty module')
+    seq = sf.load_journaled_module(NM2, path)
+    print(f"loaded up to change: {seq}")
+    print(f"same structure: {module_structure(NM) == module_structure(NM2)}")
+    print(f"learnt neurons: {sorted(name for name in NM2.neurons if name.startswith('N'))}")
+
+    # changes are written as they happen, so a crash without close() loses nothing:
+    print("\n----------------------------------------")
+    path = os.path.join(directory, 'crash')
+    NM = sf.NeuralModule('crash module')
+    journal = sf.ModuleJournal(NM, path, compact_interval=5)
+    NM.set_default_trigger(sf.trigger_list_simm_threshold, {'threshold': 0.9})
+    NM.set_default_pooling(sf.pooling_or, {})
+    NM.set_default_synapse(sf.synapse_delayed_identity, {'sign': 1, 'delay': 0})
+    NM.set_default_action(sf.action_null, {})
+    for k in range(12):
+        NM.add_default_neuron(f"n{k}", 0, [1, 1], [f"s{k}", f"s{k + 1}"])
+        NM.add_default_synapse(f"s{k}", f"n{k}")
+    NM.erase_neuron('n3')
+    NM.prune(1) # prunes everything, since nothing has fired
+    NM.add_default_neuron('survivor', 0, [1], ['s0'])
+    journal.wait()
+    print(journal)
+    print(f"files: {file_sizes(path)}")
+    NM2 = sf.NeuralModule('recovered module')
+    sf.load_journaled_module(NM2, path)
+    print(f"same structure: {module_structure(NM) == module_structure(NM2)}")
+    print(f"neurons: {sorted(NM2.neurons)}")
+
+    # reopen the journal, which loads and compacts it, then keep going:
+    print("\n----------------------------------------")
+    NM3 = sf.NeuralModule('reopened module')
+    journal = sf.ModuleJournal(NM3, path)
+    NM3.append_default_neuron_pattern('survivor', [1], ['s1'])
+    journal.close()
+    print(journal)
+    print(f"files: {file_sizes(path)}")
+    NM4 = sf.NeuralModule('final module')
+    sf.load_journaled_module(NM4, path)
+    print(f"same structure: {module_structure(NM3) == module_structure(NM4)}")
+    print(NM4.neurons['survivor'])
@@ -0,0 +1,39 @@
+"""Test the lazy package imports, that each submodule's public names are listed, and only the needed submodules are imported."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import sys
+import inspect
+import subprocess
+import synaptiflux as sf
+
+def unlisted_names(submodule):
+    """Return the public functions and classes defined in the submodule, that are missing from sf.submodule_names."""
+    module = getattr(sf, submodule)
+    defined = [name for name, value in vars(module).items() if not name.startswith('_') and (inspect.isfunction(value) or inspect.isclass(value)) and value.__module__ == module.__name__]
+    return [name for name in defined if name not in sf.submodule_names[submodule]]
+
+def imported_after(statement):
+    """Return the synaptiflux submodules, and asyncio and multiprocessing, imported by statement in a fresh interpreter."""
+    code = f"import sys; {statement}; print(' '.join(sorted(m for m in sys.modules if m.startswith('synaptiflux.') or m in ['asyncio', 'multiprocessing'])))"
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+
+if __name__ == '__main__':
+    print('Testing lazy package imports:')
+    for submodule in sf.submodule_names:
+        missing = unlisted_names(submodule)
+        if missing:
+            print(f"    {submodule} names missing from sf.submodule_names: {missing}")
+    print(f"all names listed: {all(len(unlisted_names(submodule)) == 0 for submodule in sf.submodule_names)}")
+    print(f"package names: {len(sf.__all__)}")
+
+    for statement in ['import synaptiflux', 'import synaptiflux as sf; sf.Neuron', 'import synaptiflux as sf; sf.NeuralModule', 'import synaptiflux as sf; sf.ShardedModule']:
+        print(f"\n{statement}:")
+        print(f"    {imported_after(statement)}")
+
+    print(f"\nsf.NeuralModule is sf.neural_module.NeuralModule: {sf.NeuralModule is sf.neural_module.NeuralModule}")
+    try:
+        sf.no_such_name
+    except AttributeError as e:
+        print(f"AttributeError: {e}")
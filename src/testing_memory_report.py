@@ -0,0 +1,35 @@
+"""Testing memory reports of neural modules and neural systems."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import io
+import time
+import contextlib
+import synaptiflux as sf
+import synaptiflux.systems.system_print_sequence
+
+if __name__ == '__main__':
+    print('Testing memory reports ...')
+
+    # report on our sequence system, after it has run for a while:
+    NS = sf.systems.system_print_sequence.system_symbol_sequence('example sequence system', 'Hello, World! Hi, Fred.', ' ,.!?', verbose=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        NS.update_system(30)
+    print(NS.memory_report(5))
+
+    # a bigger module, measured exactly, and then sampled:
+    print("\n----------------------------------------")
+    f = io.StringIO()
+    sf.write_workload_chunk(f, 2000, patterns_per_neuron=2, fan_in=3, seed=1)
+    NM = sf.NeuralModule('workload')
+    NM.from_chunk(f.getvalue())
+    NM.patch_in_new_synapses()
+    NM.update_system(200)
+    for sample in [None, 16]:
+        start = time.perf_counter()
+        report = NM.memory_report(3, sample)
+        end = time.perf_counter()
+        print(f"sample: {sample} total: {report.total()} bytes time: {end - start:.3f} s")
+    print(report)
+    print(report.as_dict()['top'])
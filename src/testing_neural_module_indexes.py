@@ -0,0 +1,38 @@
+"""Test the neural module neuron, synapse and alias indexes, and that erase and prune keep them consistent."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import io
+import synaptiflux as sf
+
+def index_snapshot(NM):
+    """Return a copy of the module indexes, for comparison with a fresh reindex()."""
+    return (dict(NM.neuron_synapses), dict(NM.synapse_consumers), dict(NM.synapse_alias_reverse_dict))
+
+if __name__ == '__main__':
+    print('Testing the neural module indexes:')
+    f = io.StringIO()
+    sf.write_workload_map(f, 30, patterns_per_neuron=2, fan_in=2, max_delay=2, layer_depth=3, alias_density=0.2, seed=1)
+    NM = sf.NeuralModule('indexes')
+    NM.from_map(f.getvalue())
+    NM.update_system(1)
+
+    print(f"\nsynapses on n1: {sorted(NM.get_neuron_synapses('n1'))}")
+    print(f"consumers of n1 S0: {sorted(NM.get_synapse_consumers('n1 S0'))}")
+
+    NM.erase_synapse('n1 S0')
+    print(f"\nafter erasing n1 S0, aliases still using it: {[name for name, sources in NM.synapse_alias_dict.items() if 'n1 S0' in sources]}")
+    NM.poke_neuron_sequence(['n1', 'n0', 'n2'])
+    NM.update_system(6) # erased synapses read as 0, rather than raise a KeyError
+
+    print()
+    print(NM.activation_report(0))
+    NM.prune(1)
+    print(f"after pruning: {len(NM.neurons)} neurons, {len(NM.synapses)} synapses")
+    print(f"neurons: {sorted(NM.neurons)}")
+    print(f"synapses: {sorted(NM.synapses)}")
+
+    indexes = index_snapshot(NM)
+    NM.reindex()
+    print(f"\nindexes match reindex(): {indexes == index_snapshot(NM)}")
@@ -0,0 +1,38 @@
+"""Test the output sinks used by the print actions."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+import synaptiflux.modules.module_print_symbols
+
+def poke_symbols(NM, symbols):
+    """Poke each of the given symbols, one every two time steps."""
+    for symbol in symbols:
+        NM.poke_neuron(f'print {symbol}')
+        NM.update_system(2)
+
+if __name__ == '__main__':
+    print("Testing output sinks:")
+
+    # the default sink writes straight through to stdout:
+    NM = sf.modules.module_print_symbols.module_print_symbols('print alphabet', 'abcd', append_newline=True)
+    print(f"\nDefault sink: {NM.get_output_sink()}")
+    poke_symbols(NM, 'abcd')
+
+    # store the output in memory:
+    sink = sf.ListSink()
+    NM.set_output_sink(sink)
+    poke_symbols(NM, 'dcba')
+    print(f"\nList sink output: {repr(sink.get_output())}")
+
+    # buffer the output, and only flush it at the end of each update_system() call:
+    NM.set_output_sink(sf.BufferedSink(), flush_interval=0)
+    print("\nBuffered sink:")
+    poke_symbols(NM, 'abba')
+
+    # discard all output:
+    NM.set_output_sink(sf.NullSink())
+    print("\nNull sink (no output expected):")
+    poke_symbols(NM, 'abcd')
+    print("Done.")
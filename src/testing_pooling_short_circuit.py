@@ -0,0 +1,39 @@
+"""Test short-circuit evaluation of the or and sum pooling functions."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+
+trigger_calls = sf.Counter()
+
+def trigger_counted_dot_product(list1, list2, threshold):
+    """The dot product trigger, but counting the number of times it is invoked."""
+    trigger_calls.increment()
+    return sf.trigger_dot_product_threshold(list1, list2, threshold)
+
+def build_module(pooling_fn, pooling_params, pattern_count):
+    """Build a module with a single neuron with many patterns, where only pattern 2 matches the '#ON#' source."""
+    NM = sf.NeuralModule('short circuit')
+    NM.add_source('#ON#', sf.source_on())
+    NM.add_source('#OFF#', sf.source_off())
+    NM.add_neuron('many patterns', 0, [1], ['#OFF#'], trigger_counted_dot_product, {'threshold': 1}, pooling_fn, pooling_params)
+    for k in range(1, pattern_count):
+        label = '#ON#' if k in [2, 3] else '#OFF#'
+        NM.append_neuron_pattern('many patterns', [1], [label], trigger_counted_dot_product, {'threshold': 1})
+    return NM
+
+if __name__ == '__main__':
+    print('Testing short-circuit pooling:')
+    pattern_count = 100
+    for name, pooling_fn, pooling_params in [
+            ('or', sf.pooling_or, {}),
+            ('sum, threshold 2', sf.pooling_sum, {'threshold': 2}),
+            ('sum, threshold 3', sf.pooling_sum, {'threshold': 3}),
+            ('sum_mod2', sf.pooling_sum_mod2, {})]:
+        NM = build_module(pooling_fn, pooling_params, pattern_count)
+        trigger_calls.reset()
+        NM.update_system(1)
+        print(f"    {name}:")
+        print(f"        axon: {NM['many patterns'].axon}")
+        print(f"        trigger calls: {trigger_calls.get()} of {pattern_count}")
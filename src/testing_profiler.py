@@ -0,0 +1,28 @@
+"""Test the profiling hooks in NeuralModule and NeuralSystem update_system()."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+import synaptiflux.systems.system_print_sequence
+
+if __name__ == '__main__':
+    print("Testing the profiler:")
+
+    # profile a neural module loaded from a map file:
+    NM = sf.NeuralModule('Sam')
+    NM.load_from_map('machines/Sam.map')
+    NM.set_output_sink(sf.NullSink())
+    profiler = NM.enable_profiling()
+    NM.poke_neuron_sequence(list('Sam'))
+    NM.update_system(5)
+    NM.poke_neurons(['Sam', 'op: friends'])
+    NM.update_system(5)
+    print(profiler.report())
+
+    # profile a neural system, including its modules:
+    NS = sf.systems.system_print_sequence.system_symbol_sequence('print sequence', 'Hello World!', ['!'])
+    profiler = NS.enable_profiling(sf.Profiler(top_n=5), include_modules=True)
+    NS.update_system(20)
+    print()
+    print(profiler.report())
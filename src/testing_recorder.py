@@ -0,0 +1,114 @@
+"""Testing recording and replaying neural module and neural system runs."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import io
+import contextlib
+import synaptiflux as sf
+import synaptiflux.systems.system_print_sequence
+
+def build_sequence_system(seq):
+    """Build our example sequence system, which learns the stored sequences as it runs."""
+    return sf.systems.system_print_sequence.system_symbol_sequence('example sequence system', seq, ' ,.!?', verbose=False)
+
+def build_pattern_module(name):
+    """Build a small module that recognizes patterns of poked input neurons."""
+    NM = sf.NeuralModule(name)
+    NM.add_source('#OFF#', sf.source_off())
+    NM.set_default_trigger(sf.trigger_list_simm_threshold, {'threshold': 0.9})
+    NM.set_default_pooling(sf.pooling_or, {})
+    NM.set_default_synapse(sf.synapse_delayed_identity, {'sign': 1, 'delay': 0})
+    NM.set_default_action(sf.action_null, {})
+    for label in ['a', 'b', 'c']:
+        NM.add_default_neuron(f"{label} in", 0, [1], ['#OFF#'])
+        NM.add_default_synapse(label, f"{label} in")
+    NM.add_default_neuron('A', 1, [1], ['a'])
+    NM.add_default_neuron('AB', 1, [1, 1], ['a', 'b'])
+    NM.add_default_synapse('A', 'A')
+    NM.add_default_synapse('AB', 'AB')
+    return NM
+
+def same_axons(NM1, NM2, window):
+    """Check two modules have the same neurons, and the same recent axon values."""
+    if sorted(NM1.neurons) != sorted(NM2.neurons):
+        return False
+    return all(NM1.neurons[name].axon[-window:] == NM2.neurons[name].axon[-window:] for name in NM1.neurons)
+
+if __name__ == '__main__':
+    print('Testing record and replay ...')
+
+    # record a neural system that learns as it runs:
+    seq = 'Hello, Hello!'
+    NS = build_sequence_system(seq)
+    log = io.StringIO()
+    recorder = sf.Recorder(log, checkpoint_interval=5)
+    recorder.attach(NS)
+    with contextlib.redirect_stdout(io.StringIO()) as recorded_output:
+        NS.update_system(20)
+    recorder.detach()
+    print(recorder)
+    print(f"recorded output: {recorded_output.getvalue()!r}")
+
+    # replay it into a freshly built system:
+    log.seek(0)
+    NS2 = build_sequence_system(seq)
+    replayer = sf.Replayer(log, NS2)
+    with contextlib.redirect_stdout(io.StringIO()) as replayed_output:
+        replayer.run()
+    print(replayer)
+    print(f"replayed output: {replayed_output.getvalue()!r}")
+    print(f"same output: {recorded_output.getvalue() == replayed_output.getvalue()}")
+    for name in NS.modules:
+        print(f"{name}: same axons: {same_axons(NS.modules[name], NS2.modules[name], 20)}")
+
+    # seek to a time step from a checkpoint, then run to the end:
+    print("\n----------------------------------------")
+    log.seek(0)
+    NS3 = build_sequence_system(seq)
+    replayer = sf.Replayer(log, NS3)
+    with contextlib.redirect_stdout(io.StringIO()) as seek_output:
+        replayer.seek(12)
+        print(f"time step after seek: {replayer.get_time_step()}")
+        replayer.run()
+    print(seek_output.getvalue())
+    for name in NS.modules:
+        print(f"{name}: same axons: {same_axons(NS.modules[name], NS3.modules[name], 5)}")
+
+    # replay quietly, without printing:
+    print("\n----------------------------------------")
+    log.seek(0)
+    NS4 = build_sequence_system(seq)
+    replayer = sf.Replayer(log, NS4, quiet=True)
+    with contextlib.redirect_stdout(io.StringIO()) as quiet_output:
+        replayer.run()
+    print(f"quiet output: {quiet_output.getvalue()!r}, mismatches: {replayer.mismatches}")
+
+    # record a single module, with pokes, a poke sequence and a structure change made between runs:
+    print("\n----------------------------------------")
+    NM = build_pattern_module('pattern module')
+    log = io.StringIO()
+    recorder = sf.Recorder(log)
+    recorder.attach(NM)
+    NM.poke_neuron('a in')
+    NM.update_system(2)
+    NM.poke_neuron_sequence(['a in', ['a in', 'b in'], 'b in'])
+    NM.update_system(4)
+    NM.add_default_neuron('BC', 1, [1, 1], ['b', 'c'])
+    NM.add_default_synapse('BC', 'BC')
+    NM.poke_neuron_sequence([['b in', 'c in'], 'c in'])
+    NM.update_system(3)
+    recorder.detach()
+    print(f"records: {recorder.record_count}")
+    print(log.getvalue())
+
+    # replay into an empty module, restored from the first checkpoint:
+    log.seek(0)
+    NM2 = sf.NeuralModule('empty module')
+    replayer = sf.Replayer(log, NM2)
+    replayer.seek(0)
+    replayer.run()
+    print(replayer)
+    print(f"same axons: {same_axons(NM, NM2, 9)}")
+    for name in ['A', 'AB', 'BC']:
+        print(f"{name}: {NM.neurons[name].axon[-9:]} {NM2.neurons[name].axon[-9:]}")
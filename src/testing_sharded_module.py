@@ -0,0 +1,61 @@
+"""Test the sharded neural module gives the same results as the serial neural module."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import io
+import synaptiflux as sf
+
+def load_map(name, map_str=None, filename=None):
+    """Load a neural module from a map string or file, with its output going to a list sink."""
+    NM = sf.NeuralModule(name)
+    NM.set_output_sink(sf.ListSink())
+    if filename is not None:
+        NM.load_from_map(filename)
+    else:
+        NM.from_map(map_str)
+    return NM
+
+def compare_modules(NM1, NM2):
+    """Print whether the two neural modules have the same state and output."""
+    same_axons = all(NM1.neurons[name].axon == NM2.neurons[name].axon for name in NM1.neurons)
+    same_counts = all(NM1.neurons[name].activation_count == NM2.neurons[name].activation_count for name in NM1.neurons)
+    same_history = all(NM1.synapses[name].spike_history == NM2.synapses[name].spike_history for name in NM1.synapses)
+    same_output = NM1.get_output_sink().get_output() == NM2.get_output_sink().get_output()
+    print(f"    same axons: {same_axons}")
+    print(f"    same activation counts: {same_counts}")
+    print(f"    same spike history: {same_history}")
+    print(f"    same output: {same_output}")
+    print(f"    same time step: {NM1.get_time_step() == NM2.get_time_step()}")
+
+if __name__ == '__main__':
+    print('Testing the sharded neural module:')
+
+    # a synthetic layered module, with delayed synapses:
+    f = io.StringIO()
+    sf.write_workload_map(f, 60, patterns_per_neuron=2, fan_in=2, max_delay=3, layer_depth=4, alias_density=0.1, seed=3)
+    NM_serial = load_map('serial workload', f.getvalue())
+    NM_sharded = load_map('sharded workload', f.getvalue())
+    pokes = [['n0', 'n1'], 'n2', ['n0', 'n3'], [], 'n1', ['n1', 'n2', 'n3']] * 4
+    NM_serial.poke_neuron_sequence(pokes)
+    NM_serial.update_system(40)
+    with sf.ShardedModule(NM_sharded, shards=3) as SM:
+        NM_sharded.poke_neuron_sequence(pokes)
+        SM.update_system(25)
+        SM.update_system(15)
+        print(SM)
+    print('workload:')
+    compare_modules(NM_serial, NM_sharded)
+
+    # a machine with print actions:
+    filename = 'machines/greet-Fred.map'
+    NM_serial = load_map('serial greet Fred', filename=filename)
+    NM_sharded = load_map('sharded greet Fred', filename=filename)
+    NM_serial.poke_neuron_sequence(list('Hey Fred. Afternoon Robo'))
+    NM_serial.update_system(30)
+    with sf.ShardedModule(NM_sharded, shards=2) as SM:
+        NM_sharded.poke_neuron_sequence(list('Hey Fred. Afternoon Robo'))
+        SM.update_system(30)
+    print('greet Fred:')
+    compare_modules(NM_serial, NM_sharded)
+    print(NM_sharded.get_output_sink().get_output())
@@ -0,0 +1,48 @@
+"""Test top-k similarity queries over neuron patterns, and compare them to a brute force simm."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+
+def brute_force_simm(f, g):
+    """Compute the list simm of two label -> coefficient dictionaries, over the union of their labels."""
+    labels = sorted(set(f) | set(g))
+    f = [f.get(label, 0) for label in labels]
+    g = [g.get(label, 0) for label in labels]
+    s1 = sum(abs(x) for x in f)
+    s2 = sum(abs(x) for x in g)
+    if s1 == 0 or s2 == 0:
+        return 0
+    return (2 - sum(abs(x/s1 - y/s2) for x, y in zip(f, g))) / 2
+
+if __name__ == '__main__':
+    print('Testing the similarity index:')
+    NM = sf.NeuralModule('similarity index')
+    NM.from_map("""
+|a> + |b> + |c> => |abc>
+|a> + |b> => |ab>
+|b> + |c> + |d> => |bcd>
+|x> + |y> => |xy>
+|d> + 2|e> => |de>
+""")
+    queries = ['|a S0 D0> + |b S0 D0>', '|c S0 D0> + |d S0 D0>', '3|e S0 D0> + |d S0 D0> + |z S0 D0>', '|q S0 D0>']
+    for query in queries:
+        print(f"\nquery: {query}")
+        print(f"    top 3 simm: {NM.get_similar_neurons(query, k=3)}")
+        print(f"    dot product >= 2: {NM.get_similar_neurons(query, k=None, threshold=2, measure='dot_product')}")
+
+    # add a neuron, and erase another, to check the index stays in sync:
+    NM.from_map("|a> + |b> + |c> + |d> => |abcd>")
+    NM.erase_neuron('ab')
+    print(f"\nafter adding abcd and erasing ab: {NM.get_similar_neurons(queries[0], k=3)}")
+
+    # check the index scores are exact:
+    index = NM.similarity_index
+    query = sf.query_to_dict({'a S0 D0': 1, 'b S0 D0': 0.5, 'd S0 D0': -1})
+    exact = True
+    for key, score in index.pattern_scores(query).items():
+        if abs(score - brute_force_simm(index.patterns[key], query)) > 1e-12:
+            exact = False
+    print(f"\nindex scores match brute force simm: {exact}")
+    print(index)
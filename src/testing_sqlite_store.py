@@ -0,0 +1,81 @@
+"""Testing the SQLite module store."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import os
+import io
+import json
+import tempfile
+import contextlib
+import synaptiflux as sf
+
+def module_structure(NM):
+    """Return the structure of a module, for comparisons, ignoring its name and the order of its neurons and synapses."""
+    NM.patch_in_new_synapses()
+    state = sf.encode_module(NM, sf.ObjectTable())
+    del state['name']
+    state['neurons'] = sorted(state['neurons'], key=lambda x: x['name'])
+    state['synapses'] = sorted(state['synapses'], key=lambda x: x['name'])
+    return json.dumps(state, sort_keys=True)
+
+if __name__ == '__main__':
+    print('Testing the SQLite store ...')
+    directory = tempfile.mkdtemp()
+    filename = os.path.join(directory, 'family.db')
+
+    # ingest some maps, into both a module and the store:
+    NM = sf.NeuralModule('family')
+    store = sf.SQLiteStore(filename, cache_size=8)
+    for map_file in ['Sam.map', 'Sam-family-and-friends.map', 'dogs-are-mammals.map']:
+        with open(os.path.join('machines', map_file), 'r') as f:
+            s = f.read()
+        with contextlib.redirect_stdout(io.StringIO()): # from_map() prints the lines it can't parse
+            NM.from_map(s)
+            store.from_map(s)
+    print(store)
+    print(f"same structure: {module_structure(NM) == module_structure(store.export_module())}")
+
+    # queries only read the neurons that share a label with the query:
+    for pattern in [['op: mother S0 D0', 'Sam S0 D0'], ['op: father S0 D0', 'Sam S0 D0'], []]:
+        test_neurons = store.get_test_neurons(pattern)
+        print(f"test neurons for {pattern}: {test_neurons} same: {test_neurons == NM.get_test_neurons(pattern)}")
+    for query in ['|op: mother S0 D0> + |Sam S0 D0>', {'Sam S0 D0': 2, 'op: father S0 D0': 1}]:
+        similar = store.get_similar_neurons(query, 3)
+        print(f"similar neurons for {query}: {similar} same: {similar == NM.get_similar_neurons(query, 3)}")
+    print(store)
+    store.close()
+
+    # reopen the store, and load part of it into a module:
+    print("\n----------------------------------------")
+    store = sf.SQLiteStore(filename)
+    print(f"neurons: {len(store)}")
+    print(f"layer 1 neurons: {store.neuron_names(1)[:10]}")
+    NM2 = store.load_into_module(sf.NeuralModule('partial family'), ['Liz', 'Sam'])
+    print(f"loaded neurons: {sorted(NM2.neurons)}")
+    print(f"loaded synapses: {sorted(NM2.synapses)}")
+    print(f"NM parameter refers to the loaded module: {NM2.synapses['Liz S0'].action_params['NM'] is NM2}")
+    store.close()
+
+    # import and export the existing json and chunk formats:
+    print("\n----------------------------------------")
+    store = sf.SQLiteStore(':memory:')
+    with contextlib.redirect_stdout(io.StringIO()): # load_from_json() prints the json type
+        store.import_json(os.path.join('machines', 'greetings.json'))
+    print(store)
+    json_file = os.path.join(directory, 'greetings.json')
+    store.export_json(json_file)
+    NM3 = sf.NeuralModule('greetings')
+    with contextlib.redirect_stdout(io.StringIO()):
+        NM3.load_from_json(json_file)
+    print(f"json round trip, same structure: {module_structure(NM3) == module_structure(store.export_module())}")
+    store = sf.SQLiteStore(':memory:')
+    store.import_chunk(os.path.join('machines', 'Fred.chunk'))
+    NM4 = sf.NeuralModule('Fred')
+    NM4.load_from_chunk(os.path.join('machines', 'Fred.chunk'))
+    print(f"chunk import, same structure: {module_structure(NM4) == module_structure(store.export_module())}")
+    chunk_file = os.path.join(directory, 'Fred.chunk')
+    store.export_chunk(chunk_file)
+    with open(chunk_file, 'r') as f:
+        print(f"chunk export, same chunks: {f.read() == NM4.as_chunk()}")
+    print(store)
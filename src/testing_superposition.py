@@ -0,0 +1,39 @@
+"""Test the sparse superposition type, and applying operator chains to neuron patterns."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import synaptiflux as sf
+
+if __name__ == '__main__':
+    print('Testing the superposition type:')
+    sp1 = sf.parse_superposition('3|alpha> + 2|beta> + |gamma> + |alpha>')
+    sp2 = sf.Superposition([1, 5], ['beta', 'delta'])
+    print(f"sp1: {sp1}")
+    print(f"sp2: {sp2}")
+    print(f"sp1 + sp2: {sp1 + sp2}")
+    print(f"sp1 | sp2: {sp1 | sp2}")
+    print(f"normalize(sp1): {sp1.normalize()}")
+    print(f"rescale(sp1, 10): {sp1.rescale(10)}")
+    print(f"drop-below(sp1, 2): {sp1.drop_below(2)}")
+    print(f"clean(sp1): {sp1.clean()}")
+    print(f"dot(sp1, sp2): {sp1.dot(sp2)}")
+    print(f"simm(sp1, sp2): {sp1.simm(sp2)}")
+    print(f"simm(sp1, sp1): {sp1.simm(sp1)}")
+    print(f"as lists: {sp1.to_lists()}")
+
+    print('\nApplying an operator chain to a neuron pattern:')
+    operators = [
+        (sf.operator_normalize, {'t': 100}),
+        (sf.operator_add, {'coeffs1': [1, 1], 'labels1': ['alpha', 'gamma']}),
+        (sf.operator_rescale, {'t': 10}),
+        (sf.operator_drop_below, {'threshold': 2.5}),
+    ]
+    N1 = sf.Neuron('list operators', 0, [1, 2, 3, 4], ['alpha', 'beta', 'gamma', 'epsilon'], sf.trigger_list_min_simm_threshold, {'threshold': 0.98}, sf.pooling_or, {})
+    N2 = sf.Neuron('superposition operators', 0, [1, 2, 3, 4], ['alpha', 'beta', 'gamma', 'epsilon'], sf.trigger_list_min_simm_threshold, {'threshold': 0.98}, sf.pooling_or, {})
+    for operator, params in operators:
+        N1.apply_operator(0, operator, params)
+    N2.apply_operators(0, operators)
+    print(f"apply_operator(): {N1.pattern[0]} {N1.pattern_labels[0]}")
+    print(f"apply_operators(): {N2.pattern[0]} {N2.pattern_labels[0]}")
+    print(f"same result: {N1.pattern[0] == N2.pattern[0] and N1.pattern_labels[0] == N2.pattern_labels[0]}")
@@ -0,0 +1,38 @@
+"""Test the synthetic workload generator, in map, chunk and JSON formats."""
+# Author: Garry Morrison
+# Created: 2026-10-19
+# Updated: 2026-10-19
+
+import io
+import os
+import tempfile
+import synaptiflux as sf
+
+if __name__ == '__main__':
+    print('Testing the synthetic workload generator:')
+    params = {'neuron_count': 8, 'patterns_per_neuron': 2, 'fan_in': 2, 'max_delay': 2, 'layer_depth': 3, 'seed': 1}
+
+    f = io.StringIO()
+    sf.write_workload_map(f, alias_density=0.25, **params)
+    print(f"\nmap:\n{f.getvalue()}")
+    NM_map = sf.NeuralModule('workload map')
+    NM_map.from_map(f.getvalue())
+
+    f = io.StringIO()
+    sf.write_workload_chunk(f, **params)
+    NM_chunk = sf.NeuralModule('workload chunk')
+    NM_chunk.from_chunk(f.getvalue())
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'workload.json')
+        with open(filename, 'w') as f:
+            sf.write_workload_json(f, grouped=False, **params)
+        NM_json = sf.NeuralModule('workload json')
+        NM_json.load_from_json(filename)
+
+    # all three formats should describe the same neurons:
+    for NM in [NM_map, NM_chunk, NM_json]:
+        print(f"\n{NM.name}: {len(NM.neurons)} neurons, {len(NM.synapses)} synapses")
+        for name in ['n5', 'n7']:
+            neuron = NM.neurons[name]
+            print(f"    {name}: layer {neuron.get_layer()}, patterns {list(neuron.pattern_labels.values())}")